@@ -0,0 +1,96 @@
+import contextlib
+import tempfile
+import time
+import tracemalloc
+import typing
+from argparse import Namespace
+
+from benchmarks.utils import print_table
+from lib.config.parser import utils
+from lib.config.parser.utils import ProjectConfigParserUtils
+from lib.helpers.filesystem import join_path, write_file
+from lib.helpers.object import clone_array, clone_dict
+from lib.helpers.smart_merge import smart_merge
+from lib.helpers.yamls import YAML
+from lib.project import Project
+
+
+def _create_project(directory: str, depth: int, size: int):
+    # chain of configs extending the next layer and an extra variables file, each with variables, locals and a manifest
+    YAML.to_file(join_path(directory, "kubemize.yaml"), {"extends": ["layers/l1"], "variables": {"env": "prod"}})
+    for layer in range(1, depth + 1):
+        layer_dir = join_path(directory, "layers", "l{0}".format(layer))
+        YAML.to_file(join_path(layer_dir, "kubemize.yaml"), {
+            "extends": (["../l{0}".format(layer + 1)] if layer < depth else []) + ["extra.yaml"],
+            "kubectl": {"manifests": ["m{0}.yaml".format(layer)]},
+            "locals": {"l{0}".format(layer): "{{ vars.env }}"},
+            "variables": {
+                "name{0}".format(layer): "layer-{0}".format(layer),
+                "layer{0}".format(layer): {"k{0}".format(index): "v{0}-{1}".format(layer, index) for index in range(size)},
+            },
+        })
+        YAML.to_file(join_path(layer_dir, "extra.yaml"), {"variables": {"extra{0}".format(layer): {"x": layer}}})
+        write_file(join_path(layer_dir, "m{0}.yaml".format(layer)), "\n".join([
+            "apiVersion: v1",
+            "kind: ConfigMap",
+            "metadata:",
+            "  name: c{0}".format(layer),
+            "data:",
+            "  name: \"{{{{ vars.name{0} }}}}\"".format(layer),
+            "  env: \"{{ vars.env }}\"",
+            "",
+        ]))
+
+
+@contextlib.contextmanager
+def _copy_per_level():
+    # loader before copying the configs once (the collected configs are copied again at every extends level,
+    # the variables are copied before rendering and the render data is merged into full copies)
+    extract_configs, render_variables = ProjectConfigParserUtils.extract_configs, ProjectConfigParserUtils.render_variables
+    ProjectConfigParserUtils.extract_configs = lambda self, *args, **kwargs: clone_array(extract_configs(self, *args, **kwargs))
+    ProjectConfigParserUtils.render_variables = lambda self, config, variables=None, *args, **kwargs: render_variables(self, config, clone_dict(variables or {"vars": {}}), *args, **kwargs)
+    utils.smart_merge = lambda target, source, shared=False: smart_merge(target, source)
+    try:
+        yield
+    finally:
+        ProjectConfigParserUtils.extract_configs, ProjectConfigParserUtils.render_variables = extract_configs, render_variables
+        utils.smart_merge = smart_merge
+
+
+def _build(directory: str) -> int:
+    # load the configuration and render the manifests like the template command
+    arguments = Namespace(project=directory, config="kubemize.yaml", state=".kubemize-state.json", variables=[])
+    return Project(arguments).create_plan().count_expected_manifests()
+
+
+def _measure_build(directory: str, depth: int) -> typing.Tuple[float, int]:
+    # time and peak of the allocations of one build
+    tracemalloc.start()
+    start = time.perf_counter()
+    manifests = _build(directory)
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert manifests == depth, depth
+    return duration, peak
+
+
+def main():
+    rows = []
+    for depth in (10, 20, 40):
+        with tempfile.TemporaryDirectory() as directory:
+            _create_project(directory, depth, 50)
+            with _copy_per_level():
+                reference, reference_peak = _measure_build(directory, depth)
+            duration, peak = _measure_build(directory, depth)
+            rows.append([
+                depth,
+                "{0:.2f}".format(reference), "{0:.2f}".format(duration), "{0:.1f}x".format(reference / duration),
+                "{0:.1f}".format(reference_peak / 1024 / 1024), "{0:.1f}".format(peak / 1024 / 1024), "{0:.0f}".format(peak / 1024 / depth),
+            ])
+    print("Configuration with nested extends (50 variables per layer, traced with tracemalloc, times in seconds)")
+    print_table(["layers", "copy per level", "copy once", "speedup", "peak MB per level", "peak MB once", "peak KB per layer"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import typing
+
+from jsonpath_ng import parse as jsonpath_parse
+
+from benchmarks.utils import measure, print_table
+from lib.helpers.jsons import JSON
+
+_MANIFEST: dict = {
+    "apiVersion": "apps/v1",
+    "kind": "Deployment",
+    "metadata": {"name": "web", "namespace": "apps", "labels": {"app": "web"}},
+    "spec": {"template": {"spec": {"containers": [{"name": "web", "image": "nginx"}, {"name": "proxy", "image": "envoy"}]}}},
+}
+
+# lookups of the helpers (path, object)
+_LOOKUPS: typing.List[typing.Tuple[str, str, any]] = [
+    ("name", "metadata.name", _MANIFEST),
+    ("missing key", "metadata.annotations", _MANIFEST),
+    ("list index", "spec.template.spec.containers[1].image", _MANIFEST),
+    ("helm argument", "namespace.value", {"namespace": {"key": "--namespace", "value": "apps"}}),
+    ("expression", "$..image", _MANIFEST),
+]
+
+
+def _get_reference(path: str, obj: any, fallback: any = None) -> any:
+    # lookup before the compiled paths (expression parsed on every call)
+    if not isinstance(obj, dict) and not isinstance(obj, list):
+        return fallback
+    results = jsonpath_parse("$.{0}".format(path) if not path.startswith('$') else path).find(obj)
+    return results[0].value if len(results) > 0 else fallback
+
+
+def _repeat(function: typing.Callable[[str, any], any], path: str, obj: any, count: int) -> typing.Callable[[], None]:
+    def run():
+        for _ in range(count):
+            function(path, obj)
+    return run
+
+
+def main():
+    rows = []
+    for name, path, obj in _LOOKUPS:
+        # both lookups have to find the same value
+        assert JSON.get(path, obj) == _get_reference(path, obj), path
+        reference = measure(_repeat(_get_reference, path, obj, 20), repeat=3) / 20
+        compiled = measure(_repeat(JSON.get, path, obj, 20000)) / 20000
+        has_path = measure(_repeat(JSON.has_path, path, obj, 20000)) / 20000
+        rows.append([name, path, "{0:.2f}".format(reference * 1000000), "{0:.2f}".format(compiled * 1000000), "{0:.2f}".format(has_path * 1000000), "{0:.0f}x".format(reference / compiled)])
+    print("JSON path lookups (times in us per call)")
+    print_table(["lookup", "path", "parsed per call", "JSON.get", "JSON.has_path", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
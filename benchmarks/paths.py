@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+from benchmarks.utils import print_table
+from lib.helpers import filesystem
+
+_FILENAMES: typing.List[str] = ["kubemize.yaml", ".kubemize.yaml", "kubemize.yml", ".kubemize.yml"]
+
+
+def _resolve_path_reference(path: str, cwd: str = None) -> str:
+    # helpers before the normalized paths (every call resolves the path again)
+    path = os.path.join(cwd, path) if cwd and not os.path.isabs(path) else path
+    return os.path.abspath(path).replace('\\', '/')
+
+
+def _run_reference(files: typing.List[str], cwd: str):
+    for file in files:
+        _resolve_path_reference(file, cwd=cwd)
+        os.path.dirname(_resolve_path_reference(file, cwd=cwd))
+        os.path.splitext(_resolve_path_reference(file))[1]
+        os.path.relpath(_resolve_path_reference(file), _resolve_path_reference(cwd)).replace('\\', '/')
+        any(Path(file).name.strip().lower() == name.strip().lower() for name in _FILENAMES)
+
+
+def _run(files: typing.List[str], cwd: str):
+    for file in files:
+        filesystem.resolve_path(file, cwd=cwd)
+        filesystem.get_dirname(file, cwd=cwd)
+        filesystem.get_extension(file)
+        filesystem.get_relative_path(file, cwd)
+        filesystem.path_contains_filename(file, _FILENAMES)
+
+
+def _measure_pass(function: typing.Callable[[typing.List[str]], None], create_files: typing.Callable[[], typing.List[str]]) -> typing.Tuple[float, int, int]:
+    # time, calls of abspath and peak of the allocations of one pass over new lists of files
+    abspath, calls = os.path.abspath, [0]
+    def counted_abspath(path):
+        calls[0] += 1
+        return abspath(path)
+    files = create_files()
+    os.path.abspath = counted_abspath
+    try:
+        start = time.perf_counter()
+        function(files)
+        duration = time.perf_counter() - start
+    finally:
+        os.path.abspath = abspath
+    files = create_files()
+    tracemalloc.start()
+    function(files)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, calls[0], peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        # files of services with a few manifests each
+        for service in range(2000):
+            service_dir = os.path.join(directory, "services", "s{0}".format(service))
+            os.makedirs(service_dir)
+            for name in ("kubemize.yaml", "deployment.yaml", "service.yaml", "values.yml"):
+                Path(service_dir, name).touch()
+        cwd = filesystem.resolve_path(directory)
+        files = filesystem.resolve_files("services/**/*", cwd=cwd)
+        rows = []
+        for name, function, create_files in (
+            ("strings", lambda items: _run_reference(items, str(cwd)), lambda: [str(file) for file in files]),
+            # paths with their dirname, basename and extension not computed yet
+            ("normalized, first pass", lambda items: _run(items, cwd), lambda: [filesystem.NormalizedPath(file) for file in files]),
+            # paths with their cached parts computed by a previous pass
+            ("normalized, later passes", lambda items: _run(items, cwd), lambda: _run(files, cwd) or files),
+        ):
+            duration, calls, peak = _measure_pass(function, create_files)
+            rows.append([name, "{0:.1f}".format(duration * 1000), calls, "{0:.0f}".format(peak / 1024)])
+    print("Path helpers on {0} globbed files (resolve_path, get_dirname, get_extension, get_relative_path, path_contains_filename)".format(len(files)))
+    print_table(["paths", "ms per pass", "abspath calls", "peak KB"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import random
+import tempfile
+import typing
+from argparse import Namespace
+
+from benchmarks.utils import measure, print_table
+from lib.config.config import ProjectConfig
+from lib.plan.plan import ProjectPlan
+from lib.state.state import ProjectState
+
+# manifest accessors called by the apply command
+_ACCESSORS: typing.List[str] = [
+    "count_processable_manifests", "count_expected_manifests", "count_existing_manifests",
+    "get_added_manifests", "get_updated_manifests", "get_changed_manifests", "get_removed_manifests",
+    "get_unchanged_manifests", "get_expected_manifests", "get_existing_manifests",
+]
+
+
+class _Config:
+    def __init__(self, project: str):
+        self.arguments: Namespace = Namespace(project=project, state="state.json")
+
+    def get_kubectl(self) -> dict:
+        return {"order": ["customresourcedefinition", "serviceaccount", "role", "rolebinding"]}
+
+    def get_kubectl_order(self) -> typing.List[str]:
+        return ProjectConfig.get_kubectl_order(self)
+
+
+def _create_states(size: int) -> typing.Tuple[dict, dict]:
+    # current state with all manifests, new state with a quarter changed, added or removed
+    rand = random.Random(size)
+    kinds = [("v1", "ConfigMap"), ("v1", "Service"), ("v1", "ServiceAccount"), ("apps/v1", "Deployment"), ("rbac.authorization.k8s.io/v1", "Role")]
+    current, new = {}, {}
+    for index in range(size):
+        api_version, kind = rand.choice(kinds)
+        manifest = {"apiVersion": api_version, "kind": kind, "metadata": {"name": "item-{0}".format(index), "namespace": "apps"}, "data": {"index": index}}
+        key = "{0}/apps_item-{1}".format(kind, index).lower()
+        change = rand.random()
+        if change >= 0.05:
+            current[key] = manifest
+        if change >= 0.20:
+            new[key] = dict(manifest, data={"index": index + 1}) if change < 0.25 else manifest
+        elif change < 0.05:
+            new[key] = manifest
+    return {"charts": {}, "manifests": current}, {"charts": {}, "manifests": new}
+
+
+def _run_accessors(plan: ProjectPlan, recompute: bool = False):
+    for accessor in _ACCESSORS:
+        # drop the computed diff to compute it again for every accessor
+        if recompute:
+            plan.manifests = None
+        getattr(plan, accessor)()
+
+
+def main():
+    rows = []
+    with tempfile.TemporaryDirectory() as project:
+        config = _Config(project)
+        for size in (1000, 2000, 4000, 8000):
+            current, new = _create_states(size)
+            state_current = ProjectState(current, config.arguments, config)
+            state_new = ProjectState(new, config.arguments, config)
+            once = measure(lambda: _run_accessors(ProjectPlan(config, state_current, state_new)), repeat=3)
+            again = measure(lambda: _run_accessors(ProjectPlan(config, state_current, state_new), recompute=True), repeat=3)
+            rows.append([size, "{0:.1f}".format(once * 1000), "{0:.1f}".format(once * 1000000 / size), "{0:.1f}".format(again * 1000), "{0:.1f}x".format(again / once)])
+    print("Plan with {0} accessor calls (times in ms, best of 3)".format(len(_ACCESSORS)))
+    print_table(["manifests", "diff once", "us per manifest", "diff per accessor", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
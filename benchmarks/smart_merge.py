@@ -0,0 +1,57 @@
+import copy
+import tracemalloc
+import typing
+
+from benchmarks.utils import measure, print_table
+from lib.helpers.smart_merge import _smart_merge, _SmartMergeContext, smart_merge
+
+
+class _DeepCopyContext(_SmartMergeContext):
+    # merge before the copy-on-write context (the target is deep-copied again at every level)
+    def is_owned(self, obj: typing.Any) -> bool:
+        return False
+
+    def copy(self, obj: typing.Any) -> typing.Any:
+        return copy.deepcopy(obj)
+
+
+def _smart_merge_reference(target: typing.Any, source: typing.Any) -> typing.Any:
+    return _smart_merge(target, source, _DeepCopyContext())
+
+
+def _create_tree(depth: int, width: int, value: str) -> dict:
+    # values tree with objects down to the given depth, primitive and list leaves
+    if depth == 0:
+        return {"value": value, "enabled": True, "ports": [80, 443]}
+    return {"key{0}".format(index): _create_tree(depth - 1, width, value) for index in range(width)}
+
+
+def _measure_memory(function: typing.Callable[[], any]) -> int:
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    rows = []
+    for name, depth, width in (("deep", 7, 4), ("deeper", 10, 2), ("wide", 2, 100), ("flat", 1, 5000)):
+        target, source = _create_tree(depth, width, "a"), _create_tree(depth, width, "b")
+        # both merges have to return the same result
+        assert smart_merge(target, source) == _smart_merge_reference(target, source), name
+        reference = measure(lambda: _smart_merge_reference(target, source), repeat=3)
+        merged = measure(lambda: smart_merge(target, source), repeat=3)
+        reference_memory = _measure_memory(lambda: _smart_merge_reference(target, source))
+        merged_memory = _measure_memory(lambda: smart_merge(target, source))
+        rows.append([
+            "{0} ({1}x{2})".format(name, depth, width),
+            "{0:.1f}".format(reference * 1000), "{0:.1f}".format(merged * 1000), "{0:.1f}x".format(reference / merged),
+            "{0:.1f}".format(reference_memory / 1024 / 1024), "{0:.1f}".format(merged_memory / 1024 / 1024),
+        ])
+    print("smart_merge of two values trees (depth x width, times in ms, peak memory in MB)")
+    print_table(["tree", "copy per level", "copy once", "speedup", "memory per level", "memory once"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import tempfile
+from argparse import Namespace
+
+from benchmarks.utils import measure, print_table
+from lib.state.state import ProjectState
+from lib.state.validator import ProjectStateValidator
+
+
+def _create_state(count: int) -> dict:
+    # state with deployments and a few helm releases
+    manifests, charts = {}, {}
+    for index in range(count):
+        name = "app-{0}".format(index)
+        labels = {"app.kubernetes.io/name": name, "tier": "backend"}
+        manifests["deployment/shop_{0}".format(name)] = {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {"name": name, "namespace": "shop", "labels": labels},
+            "spec": {
+                "replicas": 3,
+                "selector": {"matchLabels": labels},
+                "template": {
+                    "metadata": {"labels": labels},
+                    "spec": {"containers": [{
+                        "name": name,
+                        "image": "registry.example.com/shop/{0}:1.0.0".format(name),
+                        "ports": [{"name": "http", "containerPort": 8080}],
+                        "env": [{"name": "ENV_{0}".format(item), "value": "value-{0}".format(item)} for item in range(8)],
+                        "resources": {"requests": {"cpu": "100m", "memory": "128Mi"}},
+                    }]},
+                },
+            },
+        }
+    for index in range(count // 100):
+        name = "release-{0}".format(index)
+        charts["shop/{0}".format(name)] = {"name": name, "namespace": "shop", "chart": "example/chart", "set": {"replicas": 2}, "values": {"image": {"tag": "1.0.0"}}}
+    return {"charts": charts, "manifests": manifests}
+
+
+def main():
+    rows = []
+    with tempfile.TemporaryDirectory() as project:
+        for count in (1000, 5000):
+            state = _create_state(count)
+            headers = measure(lambda: ProjectStateValidator().validate(state), repeat=3)
+            strict = measure(lambda: ProjectStateValidator(strict=True).validate(state), repeat=3)
+            rows.append(["validate", count, "{0:.1f}".format(headers * 1000), "{0:.1f}".format(strict * 1000), "{0:.0f}x".format(strict / headers)])
+            # state of the project (validated and converted into resources, which replaces the content of the dict)
+            loads = []
+            for strict_state in (False, True):
+                arguments = Namespace(project=project, state="state.json", strict_state=strict_state)
+                states = [_create_state(count) for _ in range(3)]
+                loads.append(measure(lambda: ProjectState(states.pop(), arguments, None), repeat=3))
+            rows.append(["load state", count, "{0:.1f}".format(loads[0] * 1000), "{0:.1f}".format(loads[1] * 1000), "{0:.0f}x".format(loads[1] / loads[0])])
+    print("State validation (times in ms, best of 3)")
+    print_table(["operation", "resources", "headers", "--strict-state", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
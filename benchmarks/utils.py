@@ -0,0 +1,21 @@
+import time
+import typing
+
+
+def measure(function: typing.Callable[[], any], repeat: int = 5) -> float:
+    # best time of the runs in seconds (least disturbed by other processes)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        best = duration if best is None or duration < best else best
+    return best
+
+
+def print_table(headers: typing.List[str], rows: typing.List[typing.List[any]]):
+    # right-aligned columns with the width of their longest cell
+    cells = [headers] + [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(row[index]) for row in cells) for index in range(len(headers))]
+    for row in cells:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,71 @@
+import yaml
+
+from benchmarks.utils import measure, print_table
+from lib.helpers.yamls import YAML, YAMLLoader
+
+
+def _create_manifests(count: int) -> list:
+    # deployments, services and config maps with multiline data
+    manifests = []
+    for index in range(count):
+        name = "app-{0}".format(index)
+        labels = {"app.kubernetes.io/name": name, "app.kubernetes.io/part-of": "shop", "tier": "backend"}
+        manifests.append({
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {"name": name, "namespace": "shop", "labels": labels},
+            "spec": {
+                "replicas": 3,
+                "selector": {"matchLabels": labels},
+                "template": {
+                    "metadata": {"labels": labels, "annotations": {"checksum/config": "{0:064x}".format(index)}},
+                    "spec": {"containers": [{
+                        "name": name,
+                        "image": "registry.example.com/shop/{0}:1.{1}.0".format(name, index % 10),
+                        "args": ["--port=8080", "--log-level=info"],
+                        "ports": [{"name": "http", "containerPort": 8080, "protocol": "TCP"}],
+                        "env": [{"name": "ENV_{0}".format(item), "value": "value-{0}".format(item)} for item in range(8)],
+                        "resources": {"requests": {"cpu": "100m", "memory": "128Mi"}, "limits": {"cpu": "1", "memory": "512Mi"}},
+                        "readinessProbe": {"httpGet": {"path": "/health", "port": "http"}, "periodSeconds": 10},
+                    }]},
+                },
+            },
+        })
+        manifests.append({
+            "apiVersion": "v1",
+            "kind": "Service",
+            "metadata": {"name": name, "namespace": "shop", "labels": labels},
+            "spec": {"selector": labels, "ports": [{"name": "http", "port": 80, "targetPort": "http"}]},
+        })
+        manifests.append({
+            "apiVersion": "v1",
+            "kind": "ConfigMap",
+            "metadata": {"name": name, "namespace": "shop"},
+            "data": {"config.yaml": "".join("key{0}: value{0}\n".format(item) for item in range(20)), "enabled": "true"},
+        })
+    return manifests
+
+
+def main():
+    # without the libyaml bindings, the helper falls back to the pure Python loader and dumper
+    if not yaml.__with_libyaml__:
+        print("PyYAML is installed without the libyaml bindings, both columns use the pure Python implementation")
+    print("YAML of generated manifests (times in ms, best of 3)")
+    rows = []
+    for count in (100, 500):
+        manifests = _create_manifests(count)
+        content = YAML.stringify(manifests)
+        # both loaders and dumpers have to create the same documents
+        assert list(yaml.load_all(content, Loader=yaml.SafeLoader)) == list(YAML.parse_all(content)) == manifests
+        assert list(YAML.parse_all(YAML.stringify(manifests, fast=True))) == manifests
+        for name, pure, fast in (
+            ("parse", lambda: list(yaml.load_all(content, Loader=yaml.SafeLoader)), lambda: list(yaml.load_all(content, Loader=YAMLLoader))),
+            ("stringify", lambda: YAML.stringify(manifests), lambda: YAML.stringify(manifests, fast=True)),
+        ):
+            pure_time, fast_time = measure(pure, repeat=3), measure(fast, repeat=3)
+            rows.append([name, len(manifests), "{0:.0f}".format(len(content) / 1024), "{0:.1f}".format(pure_time * 1000), "{0:.1f}".format(fast_time * 1000), "{0:.1f}x".format(pure_time / fast_time)])
+    print_table(["operation", "documents", "KB", "pure", "libyaml", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
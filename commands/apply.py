@@ -1,8 +1,10 @@
+import functools
 import os
 
 from lib.helpers.commander import Commander, CommanderCommandForProject
 from lib.helpers.filesystem import delete_dir
 from lib.helpers.logging import Logger
+from lib.helpers.worker_pool import WorkerPool
 from lib.plan.plan import ProjectPlan
 from lib.project import Project
 from lib.provisioner import ProjectProvisioner
@@ -24,12 +26,28 @@ class CommandApply(CommanderCommandForProject):
             action="store_true",
             default=os.environ.get("FM_FORCE", default=False)
         )
+        # batch
+        commander.add_argument(
+            "--batch",
+            dest="batch",
+            help="Applies the manifests of each kind in the order with a single kubectl command. Failed manifests are applied one by one.",
+            action="store_true",
+            default=os.environ.get("KM_BATCH", default=False)
+        )
+        # parallelism
+        commander.add_argument(
+            "--parallelism",
+            dest="parallelism",
+            help="Maximum number of helm releases that are installed, upgraded or uninstalled concurrently.",
+            type=int,
+            default=os.environ.get("KM_PARALLELISM", default=1)
+        )
 
     def run(self, project: Project):
         # create plan
         plan = project.create_plan()
         # skip if nothing to do
-        if not plan.get_processable_resources():
+        if not plan.count_processable_resources():
             return Logger.success("Nothing to change. Your infrastructure is up to date. If you want to re-apply everything, run the command with the --force argument.")
         # create provisioner to apply the plan
         provisioner = project.create_provisioner()
@@ -45,8 +63,8 @@ class CommandApply(CommanderCommandForProject):
 
     def provision_manifests(self, plan: ProjectPlan, provisioner: ProjectProvisioner) -> bool:
         # log information
-        if plan.get_processable_manifests():
-            Logger.info("Processing {0} manifests...".format(len(plan.get_processable_manifests())))
+        if plan.count_processable_manifests():
+            Logger.info("Processing {0} manifests...".format(plan.count_processable_manifests()))
         # add unchanged manifests to state
         for manifest in plan.get_unchanged_manifests():
             provisioner.state.set_manifest(manifest.get_manifest())
@@ -54,6 +72,12 @@ class CommandApply(CommanderCommandForProject):
         for manifest in plan.get_removed_manifests():
             if not provisioner.delete_manifest(manifest.get_manifest(), logger_indent=0):
                 return False
+        # create and update manifests in batches
+        if plan.config.batch_apply():
+            for wave in plan.get_manifest_waves(plan.get_changed_manifests()):
+                if not provisioner.apply_manifests(wave, logger_indent=0):
+                    return False
+            return True
         # create manifests
         for manifest in plan.get_added_manifests():
             if not provisioner.create_manifest(manifest.get_manifest(), logger_indent=0):
@@ -67,31 +91,37 @@ class CommandApply(CommanderCommandForProject):
 
     def provision_charts(self, plan: ProjectPlan, provisioner: ProjectProvisioner) -> bool:
         # log information
-        if plan.get_processable_charts():
-            Logger.info("Processing {0} charts...".format(len(plan.get_processable_charts())))
+        if plan.count_processable_charts():
+            Logger.info("Processing {0} charts...".format(plan.count_processable_charts()))
         # add unchanged charts to state
         for chart in plan.get_unchanged_charts():
             provisioner.state.set_chart(chart.get_chart())
+        # create worker pool
+        pool = WorkerPool(plan.config.get_parallelism())
         # delete charts
+        tasks = {}
         for chart in plan.get_removed_charts():
-            if not provisioner.uninstall_chart(chart.get_chart(), logger_indent=0):
-                return False
+            tasks[chart.get_chart().get_identifier()] = functools.partial(provisioner.uninstall_chart, chart.get_chart(), logger_indent=0)
+        if not pool.run(tasks, plan.get_chart_dependencies(plan.get_removed_charts(), reverse=True)):
+            return False
         # install charts
+        tasks = {}
         for chart in plan.get_added_charts():
-            if not provisioner.install_chart(chart.get_chart(), logger_indent=0):
-                return False
+            tasks[chart.get_chart().get_identifier()] = functools.partial(provisioner.install_chart, chart.get_chart(), logger_indent=0)
         # upgrade charts
         for chart in plan.get_updated_charts():
-            if not provisioner.upgrade_chart(
-                    chart=chart.get_chart(),
-                    old_chart=chart.get_current_chart(),
-                    logger_indent=0
-            ):
-                return False
+            tasks[chart.get_chart().get_identifier()] = functools.partial(
+                provisioner.upgrade_chart,
+                chart=chart.get_chart(),
+                old_chart=chart.get_current_chart(),
+                logger_indent=0
+            )
         # done
-        return True
+        return pool.run(tasks, plan.get_chart_dependencies(plan.get_changed_charts()))
 
     def finalize(self, project: Project, provisioner: ProjectProvisioner):
+        # close connections to the cluster
+        provisioner.close()
         # run hooks
         project.get_hooks_runner().run_hooks_post_all()
         project.get_hooks_runner().run_hooks_post_apply()
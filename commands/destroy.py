@@ -1,9 +1,11 @@
+import functools
 import os
 
 from lib.helpers.commander import Commander, CommanderCommandForProject
 from lib.helpers.filesystem import delete_dir
 from lib.helpers.logging import Logger
 from lib.helpers.object import reverse_array
+from lib.helpers.worker_pool import WorkerPool
 from lib.plan.plan import ProjectPlan
 from lib.project import Project
 from lib.provisioner import ProjectProvisioner
@@ -25,6 +27,14 @@ class CommandDestroy(CommanderCommandForProject):
             action="store_true",
             default=os.environ.get("FM_IGNORE_NOT_FOUND", default=False)
         )
+        # parallelism
+        commander.add_argument(
+            "--parallelism",
+            dest="parallelism",
+            help="Maximum number of helm releases that are uninstalled concurrently.",
+            type=int,
+            default=os.environ.get("KM_PARALLELISM", default=1)
+        )
 
     def run(self, project: Project):
         # create plan
@@ -43,10 +53,10 @@ class CommandDestroy(CommanderCommandForProject):
 
     def provision_manifests(self, plan: ProjectPlan, provisioner: ProjectProvisioner):
         # skip if no manifests to delete exists
-        if len(plan.get_existing_manifests()) == 0:
+        if plan.count_existing_manifests() == 0:
             return True
         # log information
-        Logger.info("Processing {0} manifests...".format(len(plan.get_existing_manifests())))
+        Logger.info("Processing {0} manifests...".format(plan.count_existing_manifests()))
         # delete manifests
         for manifest in plan.get_removed_manifests():
             if not provisioner.delete_manifest(manifest.get_manifest()):
@@ -59,21 +69,27 @@ class CommandDestroy(CommanderCommandForProject):
 
     def provision_charts(self, plan: ProjectPlan, provisioner: ProjectProvisioner):
         # skip if no charts to delete exists
-        if len(plan.get_existing_charts()) == 0:
+        if plan.count_existing_charts() == 0:
             return True
         # log information
-        Logger.info("Processing {0} charts...".format(len(plan.get_existing_charts())))
+        Logger.info("Processing {0} charts...".format(plan.count_existing_charts()))
+        # create worker pool
+        pool = WorkerPool(plan.config.get_parallelism())
         # uninstall charts
+        tasks = {}
         for chart in plan.get_removed_charts():
-            if not provisioner.uninstall_chart(chart.get_chart()):
-                return False
+            tasks[chart.get_chart().get_identifier()] = functools.partial(provisioner.uninstall_chart, chart.get_chart())
+        if not pool.run(tasks, plan.get_chart_dependencies(plan.get_removed_charts(), reverse=True)):
+            return False
+        tasks = {}
         for chart in reverse_array(plan.get_existing_charts()):
-            if not provisioner.uninstall_chart(chart.get_chart()):
-                return False
+            tasks[chart.get_chart().get_identifier()] = functools.partial(provisioner.uninstall_chart, chart.get_chart())
         # done
-        return True
+        return pool.run(tasks, plan.get_chart_dependencies(plan.get_existing_charts(), reverse=True))
 
     def finalize(self, project: Project, provisioner: ProjectProvisioner):
+        # close connections to the cluster
+        provisioner.close()
         # log information
         if not provisioner.get_resources_failed():
             Logger.success("Destroyed! {0} Deleted.".format(provisioner.resources_deleted))
@@ -34,12 +34,12 @@ class CommandStandalone(CommanderCommandForProject):
         manifests: list = []
         charts: list = []
         # render manifests
-        if len(plan.get_expected_manifests()):
-            Logger.info("Rendering {0} manifests...".format(len(plan.get_expected_manifests())))
+        if plan.count_expected_manifests():
+            Logger.info("Rendering {0} manifests...".format(plan.count_expected_manifests()))
             self._create_manifests(plan, manifests)
         # render charts
-        if len(plan.get_expected_charts()):
-            Logger.info("Rendering {0} charts...".format(len(plan.get_expected_charts())))
+        if plan.count_expected_charts():
+            Logger.info("Rendering {0} charts...".format(plan.count_expected_charts()))
             self._create_charts(plan, charts)
         # writing manifest files
         Logger.info("Creating {0} manifest files...".format(len(manifests)))
@@ -40,14 +40,14 @@ class CommandTemplate(CommanderCommandForProject):
         YAML.to_file(filename=project_file, obj=project.config.to_dict())
         Logger.success("- Created project file: {0}".format(project_file))
         # write manifests to filesystem
-        Logger.info("Rendering {0} manifests...".format(len(plan.get_expected_manifests())))
+        Logger.info("Rendering {0} manifests...".format(plan.count_expected_manifests()))
         for m in plan.get_expected_manifests():
             manifest = m.get_manifest()
             filename = resolve_path(manifest.get_identifier(include_namespace=False) + ".yaml", cwd=output_manifests)
             YAML.to_file(filename=filename, obj=manifest.get_content())
             Logger.success("- Created manifest: {0}".format(filename))
         # write chart values to filesystem
-        Logger.info("Rendering {0} charts...".format(len(plan.get_expected_charts())))
+        Logger.info("Rendering {0} charts...".format(plan.count_expected_charts()))
         for c in plan.get_expected_charts():
             chart = c.get_chart()
             chart_dir = create_dir(chart.get_identifier(), cwd=output_charts)
@@ -15,9 +15,9 @@ from ..helpers.smart_merge import smart_merge
 
 
 class ProjectConfig:
-    def __init__(self, project_dir: str, project_config: str, arguments: Namespace):
+    def __init__(self, project_dir: str, project_config: str, arguments: Namespace, state: dict = None):
         # create parser
-        self.parser: ProjectConfigParser = ProjectConfigParser(project_dir, project_config, arguments)
+        self.parser: ProjectConfigParser = ProjectConfigParser(project_dir, project_config, arguments, state=state)
         # parse config
         self.config: dict = self.parser.parse()
         # set arguments
@@ -117,12 +117,33 @@ class ProjectConfig:
     def get_variables(self) -> dict:
         return self.config["variables"] if "variables" in self.config else {}
 
+    def get_sources(self) -> typing.Dict[str, typing.Tuple[str, typing.List[dict]]]:
+        return self.parser.sources
+
     def get_output_dir(self) -> str:
         return self.arguments.output if "output" in self.arguments else resolve_path(".tmp", cwd=os.getcwd())
 
     def ignore_not_found(self) -> bool:
         return self.arguments.ignore_not_found if "ignore_not_found" in self.arguments else False
 
+    def batch_apply(self) -> bool:
+        return self.arguments.batch if "batch" in self.arguments else False
+
+    def get_parallelism(self) -> int:
+        return max(1, int(self.arguments.parallelism)) if "parallelism" in self.arguments and self.arguments.parallelism else 1
+
+    def use_shell(self) -> bool:
+        return self.arguments.shell if "shell" in self.arguments else False
+
+    def use_temp_files(self) -> bool:
+        return self.arguments.temp_files if "temp_files" in self.arguments else False
+
+    def use_server_side(self) -> bool:
+        return self.arguments.server_side if "server_side" in self.arguments else False
+
+    def get_api_url(self) -> str or None:
+        return self.arguments.api_url if "api_url" in self.arguments else None
+
     def get_helm_executable(self) -> str:
         return self.arguments.helm_executable if "helm_executable" in self.arguments else "helm"
 
@@ -1,15 +1,15 @@
 import typing
 
 from lib.config.parser.utils import ProjectConfigParserUtils
-from lib.helpers.filesystem import resolve_path, file_exists
+from lib.helpers.filesystem import resolve_path, file_exists, PathIndex
 from lib.helpers.jsons import JSON
 from lib.helpers.object import reverse_array, object_format_each_primitive
 from lib.helpers.smart_merge import smart_merge
 
 
 class ProjectConfigParserConfig:
-    def __init__(self):
-        self.utils: ProjectConfigParserUtils = ProjectConfigParserUtils()
+    def __init__(self, paths: PathIndex = None):
+        self.utils: ProjectConfigParserUtils = ProjectConfigParserUtils(paths)
 
     def parse(self, config: dict, config_file: str, cwd: str, variables: dict):
         # extract all configs from config
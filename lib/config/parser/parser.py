@@ -1,9 +1,14 @@
+import copy
+import typing
 from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
 
 from lib.config.parser.config import ProjectConfigParserConfig
 from lib.config.parser.variables import ProjectConfigParserVariables
 from lib.errors.project_not_found import ProjectNotFoundError
-from lib.helpers.filesystem import file_exists, resolve_path
+from lib.helpers.cache import Cache
+from lib.helpers.filesystem import file_exists, get_relative_path, resolve_path, PathIndex
+from lib.state.database import ProjectStateDatabaseEntry
 from .generators import ProjectConfigParserGenerators
 from .utils import ProjectConfigParserUtils
 from ...helpers.jsons import JSON
@@ -11,18 +16,38 @@ from ...helpers.smart_merge import smart_merge
 from ...helpers.template import Template
 
 
+# variables of the worker processes rendering manifest files
+_worker_variables: dict = {}
+
+def _init_render_worker(variables: dict, bytecode_cache_dir: str or None, render_cache: Cache or None):
+    global _worker_variables
+    _worker_variables = variables
+    Template.bytecode_cache_dir = bytecode_cache_dir
+    Template.render_cache = render_cache
+
+def _render_manifest_file(manifest_file: str) -> typing.List[dict]:
+    return Template.render_and_parse_all_yaml(manifest_file, data=_worker_variables)
+
+
 class ProjectConfigParser:
-    def __init__(self, project_dir: str, project_config: str, arguments: Namespace):
+    def __init__(self, project_dir: str, project_config: str, arguments: Namespace, state: dict = None):
         # throw error if project not exists
         if not file_exists(project_config, cwd=project_dir):
             raise ProjectNotFoundError(project_config, project_dir)
         # set global values
         self.project_dir: str = project_dir
         self.project_config: str = project_config
+        self.jobs: int = max(1, int(arguments.jobs)) if "jobs" in arguments and arguments.jobs else 1
+        # previous state (unchanged manifest files are taken from it instead of being rendered)
+        self.state: dict = state if isinstance(state, dict) else {}
+        # render key and manifests of each manifest file (by path relative to the project)
+        self.sources: typing.Dict[str, typing.Tuple[str, typing.List[dict]]] = {}
+        # index of the directories scanned by the path patterns of this run
+        self.paths: PathIndex = PathIndex()
         # create helper classes
-        self.utils: ProjectConfigParserUtils = ProjectConfigParserUtils()
-        self.vars: ProjectConfigParserVariables = ProjectConfigParserVariables(arguments)
-        self.config: ProjectConfigParserConfig = ProjectConfigParserConfig()
+        self.utils: ProjectConfigParserUtils = ProjectConfigParserUtils(self.paths)
+        self.vars: ProjectConfigParserVariables = ProjectConfigParserVariables(arguments, paths=self.paths)
+        self.config: ProjectConfigParserConfig = ProjectConfigParserConfig(paths=self.paths)
         self.generators: ProjectConfigParserGenerators = ProjectConfigParserGenerators()
 
     def parse(self) -> dict:
@@ -38,6 +63,9 @@ class ProjectConfigParser:
         config = self.utils.validate_config(config, False)
         # parse config files
         config = self._render_config(config, variables=variables)
+        # remove least recently used renders if the cache exceeds its size
+        if Template.render_cache:
+            Template.render_cache.prune()
         # return config
         return config
 
@@ -67,13 +95,58 @@ class ProjectConfigParser:
     def _validate_config_chart_values(self, values: dict, values_file: str):
         pass
 
+    def _render_manifest_files(self, manifest_files: typing.List[str], variables: dict) -> typing.Iterator[typing.List[dict]]:
+        # render files sequentially
+        if self.jobs == 1 or len(manifest_files) < 2:
+            for manifest_file in manifest_files:
+                yield Template.render_and_parse_all_yaml(manifest_file, data=variables)
+            return
+        # render files in worker processes (results and errors are returned in the order of the files)
+        jobs = min(self.jobs, len(manifest_files))
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_render_worker, initargs=(variables, Template.bytecode_cache_dir, Template.render_cache))
+        try:
+            yield from executor.map(_render_manifest_file, manifest_files, chunksize=max(1, len(manifest_files) // (jobs * 4)))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_source_name(self, manifest_file: str) -> str:
+        return get_relative_path(manifest_file, self.project_dir)
+
+    def _get_source_manifests(self, manifest_file: str, key: str or None) -> typing.List[dict] or None:
+        # skip files without key (e.g. using random values)
+        if not key:
+            return None
+        # find source of the previous render with the same key
+        sources = self.state.get("sources")
+        source = sources.get(self._get_source_name(manifest_file)) if isinstance(sources, dict) else None
+        if not isinstance(source, dict) or source.get("key") != key or not isinstance(source.get("manifests"), list):
+            return None
+        # return copies of the manifests, if all of them are still in the state
+        manifests = self.state.get("manifests")
+        if not isinstance(manifests, dict) or not all(isinstance(name, str) and isinstance(manifests.get(name), (dict, ProjectStateDatabaseEntry)) for name in source["manifests"]):
+            return None
+        # content of the state database is loaded and therefore already a copy
+        return [manifests[name].load() if isinstance(manifests[name], ProjectStateDatabaseEntry) else copy.deepcopy(manifests[name]) for name in source["manifests"]]
+
     def _render_config_manifests(self, config: dict, variables: dict):
         manifests = []
-        for manifest_file in config["kubectl"]["manifests"]:
-            for manifest_collection in Template.render_and_parse_all_yaml(manifest_file, data=variables):
-                for manifest in self.utils.normalize_manifests(manifest_collection):
-                    self._validate_config_manifest(manifest, manifest_file)
-                    manifests.append(manifest)
+        manifest_files = config["kubectl"]["manifests"]
+        # reuse manifests of files, whose content and referenced variables have not been changed since the previous state
+        keys = [Template.create_file_key(manifest_file, data=variables) for manifest_file in manifest_files]
+        sources = [self._get_source_manifests(manifest_file, key) for manifest_file, key in zip(manifest_files, keys)]
+        # render changed files
+        rendered = self._render_manifest_files([manifest_file for manifest_file, source in zip(manifest_files, sources) if source is None], variables)
+        for manifest_file, key, source in zip(manifest_files, keys, sources):
+            if source is None:
+                source = []
+                for manifest_collection in next(rendered):
+                    source.extend(self.utils.normalize_manifests(manifest_collection))
+            for manifest in source:
+                self._validate_config_manifest(manifest, manifest_file)
+                manifests.append(manifest)
+            if key:
+                self.sources[self._get_source_name(manifest_file)] = (key, source)
+        rendered.close()
         config["kubectl"]["manifests"] = manifests
 
     def _validate_config_manifest(self, manifest: dict, manifest_file: str):
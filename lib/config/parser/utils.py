@@ -5,16 +5,20 @@ from schema import SchemaUnexpectedTypeError
 
 from lib.config.validator import ProjectConfigValidator
 from lib.helpers.filesystem import resolve_files, get_dirname, resolve_path, resolve_dirs, resolve_paths, join_path, \
-    path_contains_filename
+    path_contains_filename, PathIndex
 from lib.helpers.jsons import JSON
 from lib.helpers.logging import Logger
-from lib.helpers.object import clone_dict, clone_array
+from lib.helpers.object import clone_dict
 from lib.helpers.smart_merge import smart_merge
 from lib.helpers.template import Template, TemplateUndefinedException
 from lib.helpers.yamls import YAML
 
 
 class ProjectConfigParserUtils:
+    def __init__(self, paths: PathIndex = None):
+        # index of the scanned directories of the run (directories are read again for each pattern if None)
+        self.paths: PathIndex or None = paths
+
     def get_base_config_names(self) -> typing.List[str]:
         return [
             "kubemize.yaml", ".kubemize.yaml",
@@ -44,7 +48,7 @@ class ProjectConfigParserUtils:
         # resolve paths in pattern
         for pattern in patterns:
             if isinstance(pattern, str):
-                resolved_paths = resolve_paths(pattern, cwd=cwd)
+                resolved_paths = resolve_paths(pattern, cwd=cwd, index=self.paths)
                 if len(resolved_paths) > 0:
                     for path in resolved_paths:
                         paths.append(path)
@@ -61,7 +65,7 @@ class ProjectConfigParserUtils:
         # resolve files in pattern
         for pattern in patterns:
             if isinstance(pattern, str):
-                resolved_paths = resolve_files(pattern, cwd=cwd)
+                resolved_paths = resolve_files(pattern, cwd=cwd, index=self.paths)
                 if len(resolved_paths) > 0:
                     for path in resolved_paths:
                         files.append(path)
@@ -78,7 +82,7 @@ class ProjectConfigParserUtils:
         # resolve files in pattern
         for pattern in patterns:
             if isinstance(pattern, str):
-                resolved_paths = resolve_dirs(pattern, cwd=cwd)
+                resolved_paths = resolve_dirs(pattern, cwd=cwd, index=self.paths)
                 if len(resolved_paths) > 0:
                     for path in resolved_paths:
                         dirs.append(path)
@@ -176,18 +180,19 @@ class ProjectConfigParserUtils:
 
     def render_variables(self, config: dict, variables: dict = None, global_variables: dict = None, source_file: str or None = None) -> dict:
         global_variables = clone_dict(global_variables or {})
-        variables = clone_dict(variables or {})
+        # copy the variables object only (merges below create new variables)
+        variables = dict(variables or {"vars": {}})
         if "variables" in config and isinstance(config["variables"], dict):
-            # merge variables with global variables
+            # merge variables with global variables (only read by the templates, so unchanged variables are not copied)
             variables_config = self.render_str_or_dict(
                 obj=config["variables"],
-                variables=smart_merge(variables, {"vars": global_variables}),
+                variables=smart_merge(variables, {"vars": global_variables}, shared=True),
                 source_file=source_file,
             )
             # merge variables with config variables
             variables_config = self.render_str_or_dict(
                 obj=variables_config,
-                variables=smart_merge(variables, {"vars": smart_merge(variables_config, global_variables)}),
+                variables=smart_merge(variables, {"vars": smart_merge(variables_config, global_variables)}, shared=True),
                 source_file=source_file,
             )
             # merge config variables into variables
@@ -205,11 +210,11 @@ class ProjectConfigParserUtils:
             variables["vars"] = smart_merge(variables["vars"], clone_dict(config["variables"]))
             # set global config
             global_config = config
-            # add config to configs
+            # add copy of config to configs (the config is parsed again by the next pass)
             configs.append({
                 "path": config_path,
                 "cwd": cwd,
-                "content": config,
+                "content": clone_dict(config),
             })
         # resolve all extends in config
         if JSON.isinstance("extends", list, config):
@@ -251,9 +256,7 @@ class ProjectConfigParserUtils:
                 # add nested config to array
                 for child_config in self.extract_configs(config=config_base, config_path=config_file, cwd=config_cwd, variables=variables, global_config_path=global_config_path, global_config=global_config, global_variables=global_variables):
                     configs.append(child_config)
-        # clone configs
-        configs = clone_array(configs)
-        # remove extends keys from configs
+        # remove extends keys from configs (extended configs are loaded as copies)
         for config in configs:
             if "extends" in config["content"]:
                 del config["content"]["extends"]
@@ -2,14 +2,15 @@ import typing
 from argparse import Namespace
 
 from lib.config.parser.utils import ProjectConfigParserUtils
+from lib.helpers.filesystem import PathIndex
 from lib.helpers.jsons import JSON
 from lib.helpers.object import reverse_array
 from lib.helpers.smart_merge import smart_merge
 
 
 class ProjectConfigParserVariables:
-    def __init__(self, arguments: Namespace):
-        self.utils: ProjectConfigParserUtils = ProjectConfigParserUtils()
+    def __init__(self, arguments: Namespace, paths: PathIndex = None):
+        self.utils: ProjectConfigParserUtils = ProjectConfigParserUtils(paths)
         self.global_variables: dict = self.utils.parse_variables_from_arguments(arguments.variables if "variables" in arguments else [])
 
     def parse(self, config: dict, config_file: str, cwd: str) -> dict:
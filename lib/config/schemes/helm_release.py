@@ -69,6 +69,28 @@ class ProjectConfigHelmRelease:
     def get_repository_verify(self) -> str or None:
         return JSON.get("verify", self.chart)
 
+    def get_depends_on(self) -> typing.List[str]:
+        return JSON.get("dependsOn", self.chart, [])
+
+    def get_dependencies(self, releases: typing.List["ProjectConfigHelmRelease"], strict: bool = True) -> typing.List[str]:
+        # identifiers of the releases this release depends on (by <namespace>/<name>, or by <name> if only one release has it)
+        # strict: raise errors for unresolvable dependencies instead of skipping them
+        dependencies = []
+        for entry in self.get_depends_on():
+            dependency = entry.strip().lower()
+            if "/" in dependency:
+                matches = [release.get_identifier() for release in releases if release.get_identifier() == dependency]
+            else:
+                matches = [release.get_identifier() for release in releases if release.get_name().strip().lower() == dependency]
+            if len(matches) != 1 and not strict:
+                continue
+            if not matches:
+                raise Exception("Release '{0}' depends on '{1}', which is no release of the project.".format(self.get_identifier(), entry))
+            if len(matches) > 1:
+                raise Exception("Release '{0}' depends on '{1}', which matches the releases '{2}'. Use <namespace>/<name> instead.".format(self.get_identifier(), entry, "', '".join(matches)))
+            dependencies.append(matches[0])
+        return dependencies
+
     def get_arguments(self) -> ProjectConfigHelmArguments:
         return self.config.get_helm_arguments(self.chart)
 
@@ -86,13 +108,17 @@ class ProjectConfigHelmRelease:
         return self.chart
 
     def to_state(self) -> dict:
-        return {
+        state = {
             "name": self.get_name(),
             "namespace": self.get_namespace(),
             "chart": self.get_chart(),
             "set": self.get_set(),
             "values": self.get_values()
         }
+        # keep dependencies, so removed releases are uninstalled in order (only if set, which keeps the checksums of other releases)
+        if self.get_depends_on():
+            state["dependsOn"] = self.get_depends_on()
+        return state
 
     def to_info(self) -> dict:
         return {
@@ -65,6 +65,7 @@ class ProjectConfigValidator:
             Optional("arguments"): self._create_arguments_schema(partial),
             Optional("version"): str,
             Optional("namespace"): str,
+            Optional("dependsOn"): [str],
             Optional("values"): Schema(self._create_file_patterns_schema(partial)),
             Optional("set"): {
                 Optional(str): Or(
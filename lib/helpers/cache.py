@@ -0,0 +1,81 @@
+import json
+import os
+import typing
+
+from lib.helpers.filesystem import create_dir, create_random_id, dir_exists, join_path, write_file
+
+
+class Cache:
+    # extension of the cache entries (files written by other versions are never read, only removed by prune)
+    extension: str = ".json"
+
+    def __init__(self, directory: str, max_size: int):
+        # directory of the cache entries
+        self.directory: str = directory
+        # maximum size of all entries in bytes (least recently used entries are removed first)
+        self.max_size: int = max_size
+
+    def _get_path(self, name: str) -> str:
+        return join_path(self.directory, name + self.extension)
+
+    def _create_directory(self):
+        if not dir_exists(self.directory):
+            create_dir(self.directory)
+            # keep the entries out of version control of the project
+            write_file(join_path(self.directory, ".gitignore"), "*\n")
+
+    def get(self, name: str) -> typing.Tuple[typing.Any] or None:
+        # return None if the entry does not exist, is not readable or belongs to another name
+        try:
+            with open(self._get_path(name), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("name") != name or "value" not in entry:
+            return None
+        # mark entry as recently used
+        try:
+            os.utime(self._get_path(name))
+        except OSError:
+            pass
+        # return tuple with the value (distinguishes cached None values from missing entries)
+        return entry["value"],
+
+    def set(self, name: str, value: typing.Any):
+        # skip values which can not be stored as json
+        try:
+            content = json.dumps({"name": name, "value": value}, separators=(",", ":"), allow_nan=False)
+        except (TypeError, ValueError):
+            return
+        # write to a temporary file and move it, so other processes never read a partial entry
+        self._create_directory()
+        temp_path = "{0}.tmp-{1}".format(self._get_path(name), create_random_id())
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(temp_path, self._get_path(name))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def prune(self):
+        # collect entries with their size and time of last use
+        entries = []
+        try:
+            with os.scandir(self.directory) as items:
+                for item in items:
+                    if item.is_file() and item.name != ".gitignore":
+                        stat = item.stat()
+                        entries.append((stat.st_mtime, stat.st_size, item.path))
+        except OSError:
+            return
+        # remove least recently used entries until the cache fits into the maximum size
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                pass
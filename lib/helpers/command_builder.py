@@ -1,17 +1,33 @@
+import queue
+import shlex
 import subprocess
+import threading
+import time
 import typing
 
 from lib.helpers.jsons import JSON
 
 
 class CommandBuilder:
-    def __init__(self, command: str, cwd: str = None):
+    def __init__(self, command: str, cwd: str = None, shell: bool = False):
         self.command: str = command
         self.cwd = cwd if cwd is not None else None
+        self.shell: bool = shell
         self.sub_commands: list = []
         self.arguments: dict = {}
 
     def _format_value(self, value: any) -> str or None:
+        if isinstance(value, bool):
+            return "" if value else "false"
+        elif isinstance(value, str):
+            return value
+        elif isinstance(value, int) or isinstance(value, float):
+            return "{0}".format(value)
+        elif isinstance(value, dict) or isinstance(value, list):
+            return JSON.stringify(value)
+        return None
+
+    def _format_shell_value(self, value: any) -> str or None:
         if isinstance(value, bool):
             return "" if value else "false"
         elif isinstance(value, str):
@@ -19,12 +35,11 @@ class CommandBuilder:
         elif isinstance(value, int) or isinstance(value, float):
             return "{0}".format(value)
         elif isinstance(value, dict) or isinstance(value, list):
-            return self._format_value(JSON.stringify(value).replace('"', '\\"'))
+            return self._format_shell_value(JSON.stringify(value).replace('"', '\\"'))
         return None
 
     def add_argument(self, name: str, value: any, allow_multi: bool = None) -> typing.Self:
-        value = self._format_value(value)
-        if value is not None:
+        if self._format_value(value) is not None:
             if allow_multi:
                 self.arguments[name] = self.arguments[name] if name in self.arguments and isinstance(self.arguments[name], list) else []
                 self.arguments[name].append(value)
@@ -37,35 +52,84 @@ class CommandBuilder:
             self.sub_commands.append(name)
         return self
 
-    def execute(self):
+    def _read_stream(self, stream: typing.IO, event_type: str, events: queue.Queue):
+        # forward each line of the stream as event and signal the end of the stream with None
+        for line in iter(stream.readline, ""):
+            events.put({ "type": event_type, "data": line.strip() })
+        stream.close()
+        events.put(None)
+
+    def _write_stream(self, stream: typing.IO, data: str):
+        # write the input and close the stream (the process may exit without reading all of it)
+        try:
+            stream.write(data)
+        except OSError:
+            pass
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def execute(self, timeout: float = None, input: str = None):
         yield { "type": "command", "data": self.to_string() }
         process = subprocess.Popen(
-            self.to_string(),
+            self.to_string() if self.shell else self.to_argv(),
             cwd=self.cwd,
+            stdin=subprocess.PIPE if input is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            shell=True,
+            shell=self.shell,
         )
-        while True:
-            stdout_line = process.stdout.readline()
-            if stdout_line: yield { "type": "data", "data": stdout_line.strip() }
-            stderr_line = process.stderr.readline()
-            if stderr_line: yield { "type": "error", "data": stderr_line.strip() }
-            if process.poll() is not None and not stdout_line and not stderr_line: break
-        process.wait()
+        # write stdin and drain stdout and stderr concurrently, so the process never blocks on a full pipe
+        if input is not None:
+            threading.Thread(target=self._write_stream, args=(process.stdin, input), daemon=True).start()
+        events: queue.Queue = queue.Queue()
+        readers = [
+            threading.Thread(target=self._read_stream, args=(process.stdout, "data", events), daemon=True),
+            threading.Thread(target=self._read_stream, args=(process.stderr, "error", events), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            open_streams = len(readers)
+            while open_streams > 0:
+                try:
+                    event = events.get(timeout=max(0.0, deadline - time.monotonic()) if deadline is not None else None)
+                except queue.Empty:
+                    process.kill()
+                    yield { "type": "error", "data": "Command timed out after {0} seconds.".format(timeout) }
+                    break
+                if event is None:
+                    open_streams = open_streams - 1
+                    continue
+                yield event
+            process.wait()
+        finally:
+            # kill the process if the consumer stopped reading or an error occurred
+            if process.poll() is None:
+                process.kill()
+                process.wait()
         yield { "type": "code", "data": process.returncode }
 
-
-
-    def get_args(self) -> typing.List[str]:
+    def _get_args(self, formatter: typing.Callable[[any], str or None]) -> typing.List[str]:
         args: typing.List[str] = []
-        for item in self.sub_commands:
-            args.append(item)
         for key in self.arguments:
             for item in (self.arguments[key] if isinstance(self.arguments[key], list) else [self.arguments[key]]):
-                args.append(("{0}={1}" if item else "{0}").format(key, item))
+                # only true values are passed as bare flags (empty strings are passed as empty values)
+                args.append("{0}".format(key) if item is True else "{0}={1}".format(key, formatter(item)))
         return args
 
+    def get_args(self) -> typing.List[str]:
+        return list(self.sub_commands) + self._get_args(self._format_value)
+
+    def to_argv(self) -> typing.List[str]:
+        return [self.command] + self.get_args()
+
     def to_string(self) -> str:
-        return "{0} {1}".format(self.command, " ".join(self.get_args()))
\ No newline at end of file
+        if not self.shell:
+            return shlex.join(self.to_argv())
+        args = [shlex.quote(item) for item in self.sub_commands] + self._get_args(self._format_shell_value)
+        return "{0} {1}".format(self.command, " ".join(args))
@@ -19,6 +19,11 @@ def to_md5(o: str or dict or list) -> str:
     return hashlib.md5(data.encode('utf-8')).hexdigest()
 
 
+def to_checksum(o: str or dict or list) -> str:
+    data: str = o if isinstance(o, str) else JSON.stringify_canonical(o)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
 def join_array(separator: str, *array: str or None) -> str:
     items = []
     for item in array:
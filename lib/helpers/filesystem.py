@@ -1,3 +1,5 @@
+import functools
+import inspect
 import os
 import shutil
 import typing
@@ -9,6 +11,22 @@ from wcmatch import glob
 from lib.helpers.object import flatten_array
 
 
+class NormalizedPath(str):
+    # absolute path with forward slashes (returned as is by the helpers instead of being resolved again)
+
+    @functools.cached_property
+    def dirname(self) -> "NormalizedPath":
+        return NormalizedPath(os.path.dirname(self))
+
+    @functools.cached_property
+    def basename(self) -> str:
+        return os.path.basename(self)
+
+    @functools.cached_property
+    def extension(self) -> str or None:
+        return os.path.splitext(self)[1] or None
+
+
 def create_random_id(length=8):
     return uuid.uuid4().hex[:length]
 
@@ -37,16 +55,39 @@ def write_file(path: str, content: str or bytes, cwd: str = None) -> None:
         f.write(content)
 
 
-def join_path(base: str, *paths: str) -> str:
+def write_file_atomic(path: str, content: str or bytes, cwd: str = None) -> None:
+    # write to a temporary file and move it, so the file is either replaced completely or not at all
+    path = resolve_path(path, cwd=cwd)
+    temp_path = "{0}.tmp-{1}".format(path, create_random_id())
+    create_parent_of_file(path)
+    try:
+        with open(temp_path, 'wb' if isinstance(content, bytes) else 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def join_path(base: str, *paths: str) -> NormalizedPath:
     return to_unix_path(os.path.join(base, *paths))
 
 
-def resolve_path(*paths: str) -> str:
-    return to_unix_path(os.path.abspath(join_path(*paths)))
+def to_unix_path(path: str) -> NormalizedPath:
+    if isinstance(path, NormalizedPath):
+        return path
+    return NormalizedPath(os.path.abspath(path).replace('\\', '/'))
 
 
-def to_unix_path(path: str) -> str:
-    return os.path.abspath(path).replace('\\', '/')
+def get_relative_path(path: str, cwd: str) -> str:
+    path, cwd = resolve_path(path), resolve_path(cwd)
+    # paths in the directory are relative by their remaining part
+    parent = cwd if cwd.endswith('/') else cwd + '/'
+    if path.startswith(parent):
+        return path[len(parent):]
+    return os.path.relpath(path, cwd).replace('\\', '/')
 
 
 def is_absolute_path(path: str) -> bool:
@@ -73,36 +114,105 @@ def get_dir_content(path: str) -> list:
     return []
 
 
-def resolve_path(path: str, cwd: str = None) -> str:
+def resolve_path(path: str, cwd: str = None) -> NormalizedPath:
+    if isinstance(path, NormalizedPath):
+        return path
     return to_unix_path(os.path.join(cwd, path) if cwd and not is_absolute_path(path) else path)
 
-def resolve_paths(paths: str or list, cwd: str = None) -> list:
-    items = []
+class PathIndex:
+    def __init__(self):
+        # entries of the scanned directories (name -> is dir, is file, is link), each directory is read once per index
+        self.dir_entries: typing.Dict[str, typing.Dict[str, typing.Tuple[bool, bool, bool]]] = {}
+        # resolved paths by patterns and cwd
+        self.resolved_paths: typing.Dict[typing.Tuple[typing.Tuple[str, ...], str], typing.List[str]] = {}
+
+    def scan_dir(self, path: str) -> typing.Dict[str, typing.Tuple[bool, bool, bool]]:
+        if path not in self.dir_entries:
+            entries = {}
+            try:
+                with os.scandir(path) as items:
+                    for item in items:
+                        try:
+                            is_dir = item.is_dir()
+                            entries[item.name] = (is_dir, not is_dir and item.is_file(), is_dir and item.is_symlink())
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+            self.dir_entries[path] = entries
+        return self.dir_entries[path]
+
+    def get_entry(self, path: str) -> typing.Tuple[bool, bool] or None:
+        # type of a path found in a scanned directory (is dir, is file)
+        entry = self.dir_entries.get(os.path.dirname(path), {}).get(os.path.basename(path))
+        return entry[:2] if entry else None
+
+
+class _ScannedGlob(glob.Glob):
+    def __init__(self, index: PathIndex, *args, **kwargs):
+        self.index: PathIndex = index
+        super().__init__(*args, **kwargs)
+
+    def _iter(self, curdir: str or None, dir_only: bool, deep: bool) -> typing.Iterator[typing.Tuple[str, bool, bool, bool]]:
+        # same entries as the directory walk of wcmatch, but read from the index
+        path = curdir if self.is_abs_pattern and curdir else (os.path.join(self.root_dir, curdir) if curdir else self.root_dir)
+        for special in self.specials:
+            yield special, True, True, False
+        for name, (is_dir, is_file, is_link) in self.index.scan_dir(path).items():
+            if not dir_only or is_dir:
+                yield name, is_dir, self._is_hidden(name), is_link
+
+
+def _supports_scanned_glob() -> bool:
+    # the directory walk is replaced through private methods of wcmatch (same as in wcmatch 10.0), so check they still exist
+    try:
+        return list(inspect.signature(glob.Glob._iter).parameters) == ["self", "curdir", "dir_only", "deep"] and callable(glob.Glob._is_hidden)
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+_scanned_glob_supported: bool = _supports_scanned_glob()
+_glob_flags: int = glob.BRACE | glob.GLOBSTAR | glob.NEGATE | glob.IGNORECASE | glob.DOTGLOB | glob.MATCHBASE | glob.GLOBTILDE
+
+def resolve_paths(paths: str or list, cwd: str = None, index: PathIndex = None) -> list:
     patterns = []
     cwd = cwd if cwd else os.getcwd()
     for pattern in ([paths] if isinstance(paths, str) else paths):
         patterns.append(pattern.strip().lstrip("./") if not pattern.startswith('../') else pattern)
-    for item in glob.glob(patterns, root_dir=cwd, flags=glob.BRACE | glob.GLOBSTAR | glob.NEGATE | glob.IGNORECASE | glob.DOTGLOB | glob.MATCHBASE | glob.GLOBTILDE):
-        items.append(resolve_path(item, cwd))
-    return items
-
-def resolve_files(paths: str or list, cwd: str = None) -> list:
+    # walk the directories without an index
+    if index is None or not _scanned_glob_supported:
+        items = []
+        for item in glob.glob(patterns, root_dir=cwd, flags=_glob_flags):
+            items.append(resolve_path(item, cwd))
+        return items
+    # match patterns against the directories of the index (results are cached, as the same patterns are resolved by several passes)
+    key = (tuple(patterns), cwd)
+    if key not in index.resolved_paths:
+        items = []
+        for item in _ScannedGlob(index, patterns, root_dir=cwd, flags=_glob_flags).glob():
+            items.append(resolve_path(item, cwd))
+        index.resolved_paths[key] = items
+    return list(index.resolved_paths[key])
+
+def resolve_files(paths: str or list, cwd: str = None, index: PathIndex = None) -> list:
     files = []
-    for item in resolve_paths(paths, cwd):
-        if os.path.isfile(item):
+    for item in resolve_paths(paths, cwd, index=index):
+        entry = index.get_entry(item) if index is not None else None
+        if entry[1] if entry else os.path.isfile(item):
             files.append(item)
     return files
 
-def resolve_dirs(paths: str or list, cwd: str = None) -> list:
+def resolve_dirs(paths: str or list, cwd: str = None, index: PathIndex = None) -> list:
     dirs = []
-    for item in resolve_paths(paths, cwd):
-        if os.path.isdir(item):
+    for item in resolve_paths(paths, cwd, index=index):
+        entry = index.get_entry(item) if index is not None else None
+        if entry[0] if entry else os.path.isdir(item):
             dirs.append(item)
     return dirs
 
 def path_contains_filename(path: str, *filenames: str or typing.List[str]) -> bool:
+    path_name = (path.basename if isinstance(path, NormalizedPath) else Path(path).name).strip().lower()
     for name in flatten_array(*filenames):
-        if Path(path).name.strip().lower() == name.strip().lower():
+        if path_name == name.strip().lower():
             return True
     return False
 
@@ -120,13 +230,13 @@ def create_parent_of_file(path: str, cwd: str = None) -> None:
         os.makedirs(dir_path, exist_ok=True)
 
 def get_extension(path: str, cwd: str = None) -> str or None:
-    return os.path.splitext(resolve_path(path, cwd=cwd))[1] or None
+    return resolve_path(path, cwd=cwd).extension
 
-def get_dirname(path: str, cwd: str = None) -> str:
-    return os.path.dirname(resolve_path(path, cwd=cwd))
+def get_dirname(path: str, cwd: str = None) -> NormalizedPath:
+    return resolve_path(path, cwd=cwd).dirname
 
 def get_basename(path: str, cwd: str = None) -> str:
-    return os.path.basename(resolve_path(path, cwd=cwd))
+    return resolve_path(path, cwd=cwd).basename
 
 def randomize_file_name(path: str, cwd: str = None) -> str:
     parts = resolve_path(to_unix_path(path), cwd=cwd).split('/')
@@ -7,12 +7,15 @@ from lib.state.schemes.chart import ProjectStateChart
 
 
 class Helm:
-    def __init__(self, executable: str = None, cwd: str = None):
+    def __init__(self, executable: str = None, cwd: str = None, shell: bool = False, temp_files: bool = False):
         self.executable: str = executable if executable is not None else "helm"
         self.cwd: str = cwd
+        self.shell: bool = shell
+        # write values to temporary files instead of passing them through stdin ("-f -")
+        self.temp_files: bool = temp_files
 
     def _get_command_builder(self) -> CommandBuilder:
-        builder = CommandBuilder(command=self.executable, cwd=self.cwd)
+        builder = CommandBuilder(command=self.executable, cwd=self.cwd, shell=self.shell)
         return builder
 
     def update_repositories(self, silence: bool = False):
@@ -67,10 +70,15 @@ class Helm:
         return builder
 
     def apply(self, release: ProjectStateChart, values_file: str = None):
+        # pass values through stdin
+        if values_file is None and not self.temp_files:
+            for line in self.create_apply_command(release, "-").execute(input=YAML.stringify(release.get_values(), fast=True)):
+                yield line
+            return
         # create temporary values filename
         values_file = self._create_values_file(release, values_file)
         # create temporary values file
-        YAML.to_file(filename=values_file, obj=release.get_values())
+        YAML.to_file(filename=values_file, obj=release.get_values(), fast=True)
         # execute command
         for line in self.create_apply_command(release, values_file).execute():
             yield line
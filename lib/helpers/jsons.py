@@ -1,11 +1,66 @@
+import functools
 import json
+import re
 import typing
 
-from jsonpath_ng import parse as jsonpath_parse
+from jsonpath_ng import parse as jsonpath_parse, JSONPath
 
-from lib.helpers.filesystem import resolve_path, file_exists, write_file
+from lib.helpers.filesystem import resolve_path, file_exists, write_file, write_file_atomic
 from lib.helpers.object import to_dict, is_primitive
 
+_SIMPLE_PATH_PART = re.compile(r"^([a-zA-Z_@][a-zA-Z0-9_@\-]*)((?:\[\d+\])*)$")
+_SIMPLE_PATH_INDEX = re.compile(r"\[(\d+)\]")
+_RESERVED_PATH_WORDS = ("where", "wherenot")
+
+_NOT_FOUND = object()
+_UNSUPPORTED = object()
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_path(path: str) -> JSONPath:
+    return jsonpath_parse("$.{0}".format(path) if not path.startswith('$') else path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_path(path: str) -> typing.Tuple[str or int, ...] or None:
+    # compile simple paths like "a.b[0].c" into a tuple of keys and indexes
+    expression = path[2:] if path.startswith("$.") else (path if not path.startswith("$") else "")
+    segments = []
+    for part in expression.split(".") if expression else []:
+        match = _SIMPLE_PATH_PART.match(part)
+        if not match or match.group(1) in _RESERVED_PATH_WORDS:
+            return None
+        segments.append(match.group(1))
+        for index in _SIMPLE_PATH_INDEX.findall(match.group(2)):
+            segments.append(int(index))
+    return tuple(segments) if segments else None
+
+
+def _to_json_default(value: any) -> any:
+    # serialize objects like to_dict, but only for the values json can not serialize itself
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "to_json"):
+        return value.to_json()
+    raise TypeError("Object of type '{0}' is not JSON serializable".format(type(value).__name__))
+
+
+def _find_simple_path(segments: typing.Tuple[str or int, ...], obj: any) -> any:
+    for segment in segments:
+        if isinstance(segment, int):
+            # indexes on anything else than lists are resolved by jsonpath
+            if not isinstance(obj, list):
+                return _UNSUPPORTED
+            if segment >= len(obj):
+                return _NOT_FOUND
+        elif not isinstance(obj, dict):
+            # mappings other than dicts are resolved by jsonpath
+            return _UNSUPPORTED if hasattr(obj, "get") else _NOT_FOUND
+        elif segment not in obj:
+            return _NOT_FOUND
+        obj = obj[segment]
+    return obj
+
 
 class JSON:
     @staticmethod
@@ -15,13 +70,22 @@ class JSON:
             indent=indent if indent is not None and indent > 0 else None,
         )
 
+    @staticmethod
+    def stringify_canonical(obj: any) -> str:
+        # sorted keys without whitespace, so equal objects are always serialized the same way
+        try:
+            return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=_to_json_default)
+        except TypeError:
+            # keys of different types can not be sorted, so compare them as strings like in the json output
+            return json.dumps(json.loads(JSON.stringify(obj)), sort_keys=True, separators=(",", ":"))
+
     @staticmethod
     def parse(json_string: str) -> any:
         return json.loads(json_string)
 
     @staticmethod
-    def to_file(filename: str, obj: any, indent: int = 0, cwd: str = None) -> any:
-        write_file(
+    def to_file(filename: str, obj: any, indent: int = 0, cwd: str = None, atomic: bool = False) -> any:
+        (write_file_atomic if atomic else write_file)(
             path=filename,
             content=JSON.stringify(obj, indent),
             cwd=cwd,
@@ -40,13 +104,24 @@ class JSON:
     def get_all(path: str, obj: any) -> typing.List[any]:
         if not isinstance(obj, dict) and not isinstance(obj, list):
             return []
-        path = "$.{0}".format(path) if not path.startswith('$') else path
-        expr = jsonpath_parse(path)
-        return expr.find(obj)
+        return _parse_path(path).find(obj)
+
+    @staticmethod
+    def _find(path: str, obj: any) -> typing.List[any]:
+        if not isinstance(obj, dict) and not isinstance(obj, list):
+            return []
+        segments = _compile_path(path)
+        if segments is not None:
+            value = _find_simple_path(segments, obj)
+            if value is _NOT_FOUND:
+                return []
+            if value is not _UNSUPPORTED:
+                return [value]
+        return [item.value for item in JSON.get_all(path, obj)]
 
     @staticmethod
     def has_path(path: str, obj: any) -> bool:
-        return len(JSON.get_all(path, obj)) > 0
+        return len(JSON._find(path, obj)) > 0
 
     @staticmethod
     def has_path_all(paths: typing.List[str], obj: any) -> bool:
@@ -71,8 +146,8 @@ class JSON:
 
     @staticmethod
     def get(path: str, obj: any, fallback: any or None = None) -> any or None:
-        results = JSON.get_all(path, obj)
-        return results[0].value if len(results) > 0 else fallback
+        results = JSON._find(path, obj)
+        return results[0] if len(results) > 0 else fallback
 
     @staticmethod
     def get_first(paths: typing.List[str], obj: any, fallback: any or None = None) -> any or None:
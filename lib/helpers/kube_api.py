@@ -0,0 +1,239 @@
+import atexit
+import http.client
+import json
+import queue
+import re
+import subprocess
+import threading
+import typing
+import urllib.parse
+
+from lib.helpers.command_builder import CommandBuilder
+from lib.helpers.kubectl import Kubectl
+from lib.state.schemes.manifest import ProjectStateManifest
+
+
+class KubeApi(Kubectl):
+    # field manager of the applied fields (shown in the managed fields of the objects)
+    field_manager: str = "kubemize"
+    # maximum number of idle connections kept open to the api
+    pool_size: int = 8
+    # seconds until a request to the api times out
+    timeout: float = 60.0
+    _proxy_started_re: re.Pattern = re.compile(r"Starting to serve on (\S+)")
+
+    def __init__(self, executable: str = None, cwd: str = None, shell: bool = False, url: str = None):
+        super().__init__(executable, cwd=cwd, shell=shell)
+        # url of a running proxy or api server (a "kubectl proxy" is started on first use if None)
+        self.url: str or None = url
+        self.proxy: subprocess.Popen or None = None
+        self.connections: queue.LifoQueue = queue.LifoQueue(maxsize=self.pool_size)
+        # resources of each api version by kind, e.g. {"apps/v1": {"Deployment": ("deployments", True)}}
+        self.resources: typing.Dict[str, typing.Dict[str, typing.Tuple[str, bool]]] = {}
+        self.default_namespace: str or None = None
+        self.lock: threading.RLock = threading.RLock()
+
+    def _add_global_arguments(self, builder: CommandBuilder, manifest: ProjectStateManifest) -> CommandBuilder:
+        for item in manifest.get_arguments().globally().get_arguments():
+            if isinstance(item["value"], list):
+                for value in item["value"]:
+                    builder.add_argument(item["key"], value, True)
+            else:
+                builder.add_argument(item["key"], item["value"])
+        return builder
+
+    def _drain_proxy_output(self, stream: typing.IO):
+        # read the log output of the proxy, so it never blocks on a full pipe
+        for _ in iter(stream.readline, ""):
+            pass
+        stream.close()
+
+    def _start_proxy(self, manifest: ProjectStateManifest) -> str:
+        # start proxy on a random port with the global arguments (e.g. kubeconfig and context)
+        builder = self._add_global_arguments(self._get_command_builder().add_command("proxy"), manifest)
+        builder.add_argument("--port", 0)
+        self.proxy = subprocess.Popen(
+            builder.to_string() if self.shell else builder.to_argv(),
+            cwd=self.cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            shell=self.shell,
+        )
+        atexit.register(self.close)
+        # wait until the proxy is serving
+        output = []
+        for line in iter(self.proxy.stdout.readline, ""):
+            match = self._proxy_started_re.search(line)
+            if match:
+                threading.Thread(target=self._drain_proxy_output, args=(self.proxy.stdout,), daemon=True).start()
+                return "http://{0}".format(match.group(1))
+            output.append(line.strip())
+        self.close()
+        raise Exception("Could not start '{0}': {1}".format(builder.to_string(), "\n".join(output)))
+
+    def _get_url(self, manifest: ProjectStateManifest) -> urllib.parse.SplitResult:
+        with self.lock:
+            if self.url is None:
+                self.url = self._start_proxy(manifest)
+            return urllib.parse.urlsplit(self.url)
+
+    def _get_connection(self, manifest: ProjectStateManifest) -> http.client.HTTPConnection:
+        try:
+            return self.connections.get_nowait()
+        except queue.Empty:
+            url = self._get_url(manifest)
+            connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            return connection_class(url.hostname, url.port, timeout=self.timeout)
+
+    def _release_connection(self, connection: http.client.HTTPConnection):
+        try:
+            self.connections.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _request(self, manifest: ProjectStateManifest, method: str, path: str, body: dict = None, content_type: str = None) -> typing.Tuple[int, dict]:
+        headers = {"Accept": "application/json"}
+        data = None
+        if body is not None:
+            data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+            headers["Content-Type"] = content_type if content_type is not None else "application/json"
+        # retry once with a new connection, if a pooled connection has been closed by the server in the meantime
+        for attempt in range(2):
+            connection = self._get_connection(manifest)
+            try:
+                connection.request(method, self._get_url(manifest).path.rstrip("/") + path, body=data, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if attempt > 0:
+                    raise
+                continue
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release_connection(connection)
+            try:
+                return response.status, json.loads(content) if content else {}
+            except ValueError:
+                return response.status, {"message": content.decode("utf-8", errors="replace").strip()}
+        raise http.client.HTTPException("No response from '{0}'.".format(path))
+
+    def _get_api_path(self, api_version: str) -> str:
+        return "/api/{0}".format(api_version) if "/" not in api_version else "/apis/{0}".format(api_version)
+
+    def _discover(self, manifest: ProjectStateManifest, api_version: str) -> typing.Dict[str, typing.Tuple[str, bool]]:
+        status, content = self._request(manifest, "GET", self._get_api_path(api_version))
+        if status != 200:
+            raise Exception("Could not discover the resources of '{0}': {1}".format(api_version, content.get("message", status)))
+        # skip subresources (e.g. "deployments/status")
+        return {item["kind"]: (item["name"], item.get("namespaced", False)) for item in content.get("resources", []) if "/" not in item["name"]}
+
+    def _get_resource(self, manifest: ProjectStateManifest) -> typing.Tuple[str, bool]:
+        api_version, kind = manifest.get_api_version(), manifest.get_kind()
+        with self.lock:
+            # discover resources of each api version once, but again for unknown kinds (e.g. custom resources created in this run)
+            if kind not in self.resources.get(api_version, {}):
+                self.resources[api_version] = self._discover(manifest, api_version)
+            if kind not in self.resources[api_version]:
+                raise Exception("Resource '{0}' of '{1}' not found in the api.".format(kind, api_version))
+            return self.resources[api_version][kind]
+
+    def _get_default_namespace(self, manifest: ProjectStateManifest) -> str:
+        with self.lock:
+            if self.default_namespace is None:
+                # namespace of the global arguments or the current context of kubectl
+                arguments = self._add_global_arguments(self._get_command_builder(), manifest).arguments
+                namespace = arguments.get("--namespace", arguments.get("-n"))
+                if not isinstance(namespace, str) or not namespace:
+                    namespace = None
+                    builder = self._add_global_arguments(self._get_command_builder().add_command("config", "view"), manifest)
+                    builder.add_argument("--minify", True)
+                    builder.add_argument("-o", "jsonpath={..namespace}")
+                    for line in builder.execute():
+                        if line["type"] == "data" and line["data"]:
+                            namespace = line["data"]
+                        elif line["type"] == "code" and line["data"] != 0:
+                            namespace = None
+                self.default_namespace = namespace or "default"
+            return self.default_namespace
+
+    def _get_object_path(self, manifest: ProjectStateManifest) -> str:
+        plural, namespaced = self._get_resource(manifest)
+        path = self._get_api_path(manifest.get_api_version())
+        if namespaced:
+            path = "{0}/namespaces/{1}".format(path, urllib.parse.quote(manifest.get_namespace() or self._get_default_namespace(manifest), safe=""))
+        return "{0}/{1}/{2}".format(path, plural, urllib.parse.quote(manifest.get_name(), safe=""))
+
+    def _format_error(self, status: int, content: dict) -> str:
+        # same format as the errors printed by kubectl
+        return "Error from server ({0}): {1}".format(content.get("reason", status), content.get("message", status))
+
+    def _apply_manifest(self, manifest: ProjectStateManifest):
+        # server-side apply the manifest (fields of other managers are taken over, like "kubectl apply" does)
+        try:
+            path = self._get_object_path(manifest)
+            query = urllib.parse.urlencode({"fieldManager": self.field_manager, "force": "true"})
+            yield {"type": "command", "data": "PATCH {0}?{1}".format(path, query)}
+            content = dict(manifest.get_content())
+            if manifest.get_namespace() is None and self._get_resource(manifest)[1]:
+                content["metadata"] = dict(content["metadata"], namespace=self._get_default_namespace(manifest))
+            status, result = self._request(manifest, "PATCH", "{0}?{1}".format(path, query), body=content, content_type="application/apply-patch+yaml")
+        except Exception as ex:
+            yield {"type": "error", "data": str(ex)}
+            return False
+        if status not in (200, 201):
+            yield {"type": "error", "data": self._format_error(status, result)}
+            return False
+        return True
+
+    def apply(self, manifest: ProjectStateManifest, manifest_file: str = None):
+        applied = yield from self._apply_manifest(manifest)
+        if applied:
+            yield {"type": "data", "data": "{0} serverside-applied".format(self.get_object_name(manifest))}
+        yield {"type": "code", "data": 0 if applied else 1}
+
+    def apply_all(self, manifests: typing.List[ProjectStateManifest], manifests_file: str = None):
+        # print the name of each applied object like "kubectl apply -o name"
+        failed = False
+        for manifest in manifests:
+            applied = yield from self._apply_manifest(manifest)
+            if applied:
+                yield {"type": "data", "data": self.get_object_name(manifest)}
+            failed = failed or not applied
+        yield {"type": "code", "data": 1 if failed else 0}
+
+    def delete(self, manifest: ProjectStateManifest, manifest_file: str = None):
+        try:
+            path = self._get_object_path(manifest)
+            query = urllib.parse.urlencode({"propagationPolicy": "Background"})
+            yield {"type": "command", "data": "DELETE {0}?{1}".format(path, query)}
+            status, result = self._request(manifest, "DELETE", "{0}?{1}".format(path, query))
+        except Exception as ex:
+            yield {"type": "error", "data": str(ex)}
+            yield {"type": "code", "data": 1}
+            return
+        if status == 404 and manifest.config.ignore_not_found():
+            yield {"type": "code", "data": 0}
+        elif status not in (200, 202):
+            yield {"type": "error", "data": self._format_error(status, result)}
+            yield {"type": "code", "data": 1}
+        else:
+            yield {"type": "data", "data": "{0} deleted".format(self.get_object_name(manifest))}
+            yield {"type": "code", "data": 0}
+
+    def close(self):
+        # close pooled connections and stop the proxy
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+        with self.lock:
+            if self.proxy is not None:
+                if self.proxy.poll() is None:
+                    self.proxy.terminate()
+                    self.proxy.wait()
+                self.proxy = None
+                self.url = None
@@ -1,18 +1,22 @@
 import os
+import typing
 
 from lib.helpers.command_builder import CommandBuilder
-from lib.helpers.filesystem import resolve_path
+from lib.helpers.filesystem import resolve_path, create_random_id
 from lib.helpers.yamls import YAML
 from lib.state.schemes.manifest import ProjectStateManifest
 
 
 class Kubectl:
-    def __init__(self, executable: str = None, cwd: str = None):
+    def __init__(self, executable: str = None, cwd: str = None, shell: bool = False, temp_files: bool = False):
         self.executable: str = executable if executable is not None else "kubectl"
         self.cwd: str = cwd
+        self.shell: bool = shell
+        # write manifests to temporary files instead of passing them through stdin ("-f -")
+        self.temp_files: bool = temp_files
 
     def _get_command_builder(self) -> CommandBuilder:
-        builder = CommandBuilder(command=self.executable, cwd=self.cwd)
+        builder = CommandBuilder(command=self.executable, cwd=self.cwd, shell=self.shell)
         return builder
 
     def _create_manifests_file(self, manifest: ProjectStateManifest, manifest_file: str) -> str:
@@ -44,16 +48,55 @@ class Kubectl:
 
 
     def apply(self, manifest: ProjectStateManifest, manifest_file: str = None):
+        # pass manifest through stdin
+        if manifest_file is None and not self.temp_files:
+            for line in self.create_apply_command(manifest, "-").execute(input=YAML.stringify(manifest.get_content(), fast=True)):
+                yield line
+            return
         # create temporary manifest filename
         manifest_file = self._create_manifests_file(manifest, manifest_file)
         # create temporary manifest file
-        YAML.to_file(filename=manifest_file, obj=manifest.get_content())
+        YAML.to_file(filename=manifest_file, obj=manifest.get_content(), fast=True)
         # execute command
         for line in self.create_apply_command(manifest, manifest_file).execute():
             yield line
         # delete temporary manifest file
         os.remove(manifest_file)
 
+    def _create_batch_file(self, manifests: typing.List[ProjectStateManifest], manifests_file: str) -> str:
+        return manifests_file if manifests_file is not None else resolve_path("manifests/batch-{0}".format(create_random_id()), cwd=manifests[0].config.get_output_dir())
+
+    def get_object_name(self, manifest: ProjectStateManifest) -> str:
+        # name of the object as printed by "kubectl apply -o name" (e.g. "deployment.apps/foo")
+        api_version = manifest.get_api_version().split("/")
+        kind = manifest.get_kind().strip().lower()
+        kind = "{0}.{1}".format(kind, api_version[0]) if len(api_version) > 1 else kind
+        return "{0}/{1}".format(kind, manifest.get_name())
+
+    def create_apply_all_command(self, manifests: typing.List[ProjectStateManifest], manifests_file: str) -> CommandBuilder:
+        # create builder with the arguments of the first manifest (the kubectl arguments are shared by all manifests)
+        builder = self.create_apply_command(manifests[0], manifests_file)
+        # print the name of each applied object
+        builder.add_argument("-o", "name")
+        # return builder
+        return builder
+
+    def apply_all(self, manifests: typing.List[ProjectStateManifest], manifests_file: str = None):
+        # pass manifests through stdin with one document per manifest
+        if manifests_file is None and not self.temp_files:
+            for line in self.create_apply_all_command(manifests, "-").execute(input=YAML.stringify([manifest.get_content() for manifest in manifests], fast=True)):
+                yield line
+            return
+        # create temporary manifests filename
+        manifests_file = self._create_batch_file(manifests, manifests_file)
+        # create temporary manifests file with one document per manifest
+        YAML.to_file(filename=manifests_file, obj=[manifest.get_content() for manifest in manifests], fast=True)
+        # execute command
+        for line in self.create_apply_all_command(manifests, manifests_file).execute():
+            yield line
+        # delete temporary manifests file
+        os.remove(manifests_file)
+
     def create_delete_command(self, manifest: ProjectStateManifest, manifest_file: str) -> CommandBuilder:
         # create builder
         builder = self._get_command_builder()
@@ -80,12 +123,21 @@ class Kubectl:
         return builder
 
     def delete(self, manifest: ProjectStateManifest, manifest_file: str = None):
+        # pass manifest through stdin
+        if manifest_file is None and not self.temp_files:
+            for line in self.create_delete_command(manifest, "-").execute(input=YAML.stringify(manifest.get_content(), fast=True)):
+                yield line
+            return
         # create temporary manifest filename
         manifest_file = self._create_manifests_file(manifest, manifest_file)
         # create temporary manifest file
-        YAML.to_file(filename=manifest_file, obj=manifest.get_content())
+        YAML.to_file(filename=manifest_file, obj=manifest.get_content(), fast=True)
         # execute command
         for line in self.create_delete_command(manifest, manifest_file).execute():
             yield line
         # delete temporary manifest file
-        os.remove(manifest_file)
\ No newline at end of file
+        os.remove(manifest_file)
+
+    def close(self):
+        # nothing to release, as every command runs in its own process
+        pass
@@ -1,3 +1,5 @@
+import contextlib
+import threading
 import typing
 
 from colors1 import colors
@@ -7,6 +9,31 @@ from lib.helpers.jsons import JSON
 
 class Logger:
     debug_enabled: bool = False
+    _lock: threading.Lock = threading.Lock()
+    _local: threading.local = threading.local()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def buffered():
+        # collect all messages of the current thread and print them at once
+        Logger._local.buffer = []
+        try:
+            yield
+        finally:
+            buffer = Logger._local.buffer
+            Logger._local.buffer = None
+            with Logger._lock:
+                for msg in buffer:
+                    print(msg)
+
+    @staticmethod
+    def _write(msg: str):
+        buffer = getattr(Logger._local, "buffer", None)
+        if buffer is not None:
+            buffer.append(msg)
+        else:
+            with Logger._lock:
+                print(msg)
 
     @staticmethod
     def colors():
@@ -44,7 +71,7 @@ class Logger:
                 for color in colors_list:
                     msg = color("") + msg + colors.end("")
             # print message
-            print(msg)
+            Logger._write(msg)
 
     @staticmethod
     def _print_dict(obj: dict, level: str = None, colors_list: typing.List[any] = None, indent: int = 0):
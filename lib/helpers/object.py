@@ -66,4 +66,5 @@ def clone_array(obj: list) -> list:
     return copy.deepcopy(obj)
 
 def reverse_array(obj: list) -> list:
-    return clone_array(obj)[::-1]
\ No newline at end of file
+    # items are not copied
+    return obj[::-1]
\ No newline at end of file
@@ -42,17 +42,17 @@ def _compare_keys(keys: typing.List[str], object_a: typing.Any, object_b: typing
         return True
     return False
 
-def _find_similar_key(object_a: typing.Any, object_b: typing.Any):
-    # prioritized keys
-    # prioritized_keys = ["name", "path", "metadata.name"]
-    prioritized_keys = [
-        ["name", "namespace"],
-        ["kind", "metadata.name", "metadata.namespace"],
-        ["name"], ["path"],
-    ]
+# prioritized keys
+# prioritized_keys = ["name", "path", "metadata.name"]
+_PRIORITIZED_KEYS = [
+    ["name", "namespace"],
+    ["kind", "metadata.name", "metadata.namespace"],
+    ["name"], ["path"],
+]
 
+def _find_similar_key(object_a: typing.Any, object_b: typing.Any):
     # check for prioritized keys
-    for keys in prioritized_keys:
+    for keys in _PRIORITIZED_KEYS:
         if _has_all_keys(keys, object_a, object_b):
             return _compare_keys(keys, object_a, object_b)
 
@@ -74,9 +74,41 @@ def _find_similar_key(object_a: typing.Any, object_b: typing.Any):
     return False
 
 
-def _smart_merge_object(target: typing.Any, source: typing.Any):
-    # create a deep copy of the target
-    output = copy.deepcopy(target)
+class _SmartMergeContext:
+    def __init__(self, shared: bool = False):
+        # nodes created by the merge (by id), which can be modified in place
+        self.owned: typing.Dict[int, typing.Any] = {}
+        # copy only the changed nodes of the target (unchanged nodes are shared with the output)
+        self.shared: bool = shared
+
+    def is_owned(self, obj: typing.Any) -> bool:
+        return id(obj) in self.owned
+
+    def copy(self, obj: typing.Any) -> typing.Any:
+        # copy objects and lists recursively and mark every copied node as owned
+        if type(obj) is dict:
+            output = {key: self.copy(value) for key, value in obj.items()}
+        elif type(obj) is list:
+            output = [self.copy(item) for item in obj]
+        elif is_primitive(obj) or obj is None:
+            return obj
+        else:
+            return copy.deepcopy(obj)
+        self.owned[id(output)] = output
+        return output
+
+    def own(self, obj: dict) -> dict:
+        # copy object to modify it (recursively, unless unchanged nodes are shared)
+        if not self.shared:
+            return self.copy(obj)
+        output = dict(obj)
+        self.owned[id(output)] = output
+        return output
+
+
+def _smart_merge_object(target: typing.Any, source: typing.Any, context: _SmartMergeContext):
+    # copy the target once (nodes copied by an outer merge are modified in place)
+    output = target if context.is_owned(target) else context.own(target)
 
     # merge source into target
     for key, value in source.items():
@@ -87,12 +119,12 @@ def _smart_merge_object(target: typing.Any, source: typing.Any):
 
         # merge arrays
         if isinstance(output.get(key), list):
-            output[key] = smart_merge(output[key], value)
+            output[key] = _smart_merge(output[key], value, context)
             continue
 
         # merge objects
         if isinstance(output.get(key), dict):
-            output[key] = smart_merge(output[key], value)
+            output[key] = _smart_merge(output[key], value, context)
             continue
 
         # merge primitive value into output
@@ -101,8 +133,95 @@ def _smart_merge_object(target: typing.Any, source: typing.Any):
     return output
 
 
-def _smart_merge_array(*items):
-    output = []
+class _SmartMergeArrayIndex:
+    def __init__(self, context: _SmartMergeContext):
+        self.context: _SmartMergeContext = context
+        self.output: list = []
+        # primitive items of the output
+        self.primitives: set = set()
+        # identity keys (prioritized keys and their values) of each item in the output
+        self.identities: typing.List[typing.Dict[int, tuple] or None] = []
+        # indexes of the output items by prioritized key and values
+        self.buckets: typing.Dict[tuple, typing.Set[int]] = {}
+        # indexes of the output items by the prioritized keys they have
+        self.signatures: typing.Dict[typing.FrozenSet[int], typing.Set[int]] = {}
+        # indexes of the output items with unhashable identities
+        self.unhashable: typing.Set[int] = set()
+
+    def _create_identity(self, item: typing.Any) -> typing.Dict[int, tuple] or None:
+        identity = {}
+        if isinstance(item, dict):
+            for group in range(len(_PRIORITIZED_KEYS)):
+                keys = _PRIORITIZED_KEYS[group]
+                if JSON.has_path_all_and_not_empty(keys, item):
+                    identity[group] = tuple(JSON.get(key, item) for key in keys)
+        try:
+            hash(tuple(identity.values()))
+            return identity
+        except TypeError:
+            return None
+
+    def _add_index(self, index: int):
+        identity = self._create_identity(self.output[index])
+        self.identities[index] = identity
+        if identity is None:
+            self.unhashable.add(index)
+            return
+        for group in identity:
+            self.buckets.setdefault((group, identity[group]), set()).add(index)
+        self.signatures.setdefault(frozenset(identity), set()).add(index)
+
+    def _remove_index(self, index: int):
+        identity = self.identities[index]
+        if identity is None:
+            self.unhashable.discard(index)
+            return
+        for group in identity:
+            self.buckets[(group, identity[group])].discard(index)
+        self.signatures[frozenset(identity)].discard(index)
+
+    def _find_linear(self, item: typing.Any, indexes: typing.Iterable[int]) -> int:
+        return next((i for i in indexes if _find_similar_key(self.output[i], item)), -1)
+
+    def find_similar(self, item: typing.Any) -> int:
+        identity = self._create_identity(item)
+        if not identity:
+            return self._find_linear(item, range(len(self.output)))
+        # items sharing a prioritized key with equal values (the check decides, which keys take priority)
+        candidates = set()
+        for group in identity:
+            candidates.update(self.buckets.get((group, identity[group]), ()))
+        match = self._find_linear(item, sorted(candidates))
+        # items without a shared prioritized key are compared by the fallback heuristics
+        others = set(self.unhashable)
+        for signature in self.signatures:
+            if signature.isdisjoint(identity):
+                others.update(self.signatures[signature])
+        others = sorted(i for i in others if match == -1 or i < match)
+        other_match = self._find_linear(item, others)
+        return other_match if other_match != -1 else match
+
+    def append(self, item: typing.Any):
+        if not isinstance(item, (dict, list)):
+            try:
+                if item in self.primitives:
+                    return
+                self.primitives.add(item)
+            except TypeError:
+                if item in self.output:
+                    return
+        self.output.append(item)
+        self.identities.append(None)
+        self._add_index(len(self.output) - 1)
+
+    def merge(self, index: int, item: typing.Any):
+        self._remove_index(index)
+        self.output[index] = _smart_merge(self.output[index], item, self.context)
+        self._add_index(index)
+
+
+def _smart_merge_array(context: _SmartMergeContext, *items):
+    index = _SmartMergeArrayIndex(context)
 
     # process items
     for item_list in items:
@@ -110,23 +229,22 @@ def _smart_merge_array(*items):
 
             # add to array if not an object nor array
             if not isinstance(item, (dict, list)):
-                if item not in output:
-                    output.append(item)
+                index.append(item)
                 continue
 
             # find similar item in the output
-            similar_item_index = next((i for i, out_item in enumerate(output) if _find_similar_key(out_item, item)), -1)
+            similar_item_index = index.find_similar(item)
 
             # merge item if similar item exists
             if similar_item_index != -1:
-                output[similar_item_index] = smart_merge(output[similar_item_index], item)
+                index.merge(similar_item_index, item)
             else:
-                output.append(item)
+                index.append(item)
 
-    return output
+    return index.output
 
 
-def smart_merge(target: typing.Any, source: typing.Any):
+def _smart_merge(target: typing.Any, source: typing.Any, context: _SmartMergeContext):
     # return source if neither target nor source are objects or lists
     if not isinstance(target, (dict, list)) or not isinstance(source, (dict, list)):
         return source if target is None else target
@@ -137,7 +255,12 @@ def smart_merge(target: typing.Any, source: typing.Any):
 
     # merge lists
     if isinstance(target, list):
-        return _smart_merge_array(target, source)
+        return _smart_merge_array(context, target, source)
 
     # merge objects (dictionaries in Python)
-    return _smart_merge_object(target, source)
\ No newline at end of file
+    return _smart_merge_object(target, source, context)
+
+
+def smart_merge(target: typing.Any, source: typing.Any, shared: bool = False):
+    # shared: unchanged nodes of the target are not copied, so the output must not be modified in place
+    return _smart_merge(target, source, _SmartMergeContext(shared))
@@ -1,11 +1,17 @@
+import functools
+import hashlib
+import threading
 import typing
 
-from jinja2 import Template as JinjaTemplate, Undefined, StrictUndefined, UndefinedError, TemplateSyntaxError
-from jinja2.utils import missing, object_type_repr
+import jinja2
+from jinja2 import Environment, FileSystemBytecodeCache, Template as JinjaTemplate, Undefined, StrictUndefined, UndefinedError, TemplateSyntaxError, nodes
+from jinja2.lexer import newline_re
+from jinja2.utils import LRUCache, missing, object_type_repr
 
 from jinja2_ansible_filters import AnsibleCoreFiltersExtension
 
-from lib.helpers.filesystem import file_exists
+from lib.helpers.cache import Cache
+from lib.helpers.filesystem import create_dir, file_exists
 from lib.helpers.object import object_format_each_primitive
 from lib.helpers.yamls import YAML
 
@@ -13,12 +19,14 @@ from lib.helpers.yamls import YAML
 class ExtendedUndefined(StrictUndefined):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # raise errors referencing this object, so its path can be resolved from the variables
+        self._undefined_exception = functools.partial(ExtendedUndefinedError, undefined=self)
 
-    @property
-    def _undefined_message(self) -> str:
-        if self._undefined_hint or self._undefined_obj is missing or not self._get_vars_info_path(self._undefined_obj):
-            return super()._undefined_message
-        path = self._get_vars_info_path(self._undefined_obj)
+    def get_message(self, data: dict) -> str:
+        # find path of the object in the variables (only searched when an error occurs)
+        path = None if self._undefined_hint or self._undefined_obj is missing else _find_vars_path(data, self._undefined_obj)
+        if not path:
+            return self._undefined_message
         return "'{0}' of type '{1}' has no {2} '{3}'".format(
             path,  # path of the object
             object_type_repr(self._undefined_obj),  # type of the object
@@ -26,15 +34,10 @@ class ExtendedUndefined(StrictUndefined):
             self._undefined_name,
         )
 
-    def _get_vars_info_path(self, obj: any) -> str or None:
-        for key in self._get_vars_info:
-            if self._get_vars_info[key] == obj:
-                return key
-        return None
-
-    @property
-    def _get_vars_info(self) -> dict:
-        return globals()['TemplateVarsInfo'] if "TemplateVarsInfo" in globals() else {}
+class ExtendedUndefinedError(UndefinedError):
+    def __init__(self, message: str, undefined: ExtendedUndefined):
+        self.undefined: ExtendedUndefined = undefined
+        super().__init__(message)
 
 class TemplateSyntaxException(Exception):
     def __init__(self, message: str, file: str = None):
@@ -46,46 +49,149 @@ class TemplateUndefinedException(Exception):
         self.message = " ".join([message, f"in '{file}'"]) if file and file not in message else message
         super().__init__(self.message)
 
-def _create_vars_info(obj: any, info: dict = None, parent: str = None) -> dict:
-    if info is None:
-        info = {}
-    if not isinstance(obj, dict) and not isinstance(obj, list):
-        return info
-    elif isinstance(obj, dict):
+def _iterate_vars(obj: any, parent: str = None) -> typing.Iterator[typing.Tuple[str, any]]:
+    # iterate variables with their dot-notation paths (parents before children)
+    if isinstance(obj, dict):
         for key in obj:
             path = "{0}.{1}".format(parent, key) if parent else key
-            info[path] = obj[key]
-            _create_vars_info(obj[key], info, path)
+            yield path, obj[key]
+            yield from _iterate_vars(obj[key], path)
     elif isinstance(obj, list):
         for index in range(len(obj)):
             path = "{0}[{1}]".format(parent, index) if parent else "[{0}]".format(index)
-            info[path] = obj[index]
-            _create_vars_info(obj[index], info, path)
-    # return info
-    return info
+            yield path, obj[index]
+            yield from _iterate_vars(obj[index], path)
+
+def _find_vars_path(data: any, obj: any) -> str or None:
+    return next((path for path, value in _iterate_vars(data) if value == obj), None)
+
+# filters and functions with results depending on more than the variables (e.g. randomness, time, filesystem)
+_VOLATILE_NAMES = {"random", "ans_random", "random_mac", "shuffle", "strftime", "expanduser", "expandvars", "fileglob", "realpath", "relpath", "lipsum"}
+
+def _get_reference_path(node: nodes.Node) -> tuple or None:
+    # path of a variable accessed with constant attributes and items, e.g. (("name", "vars"), ("attr", "a"), ("item", 0))
+    if isinstance(node, nodes.Name) and node.ctx == "load":
+        return ("name", node.name),
+    if isinstance(node, nodes.Getattr):
+        path = _get_reference_path(node.node)
+        return path + (("attr", node.attr),) if path else None
+    if isinstance(node, nodes.Getitem) and isinstance(node.arg, nodes.Const):
+        path = _get_reference_path(node.node)
+        return path + (("item", node.arg.value),) if path else None
+    return None
+
+def _find_references(node: nodes.Node, references: set) -> bool:
+    # collect paths of the referenced variables, return False if the result does not only depend on them
+    # (names assigned in the template are collected as well, which only makes the key more specific)
+    if isinstance(node, (nodes.Filter, nodes.Name)) and node.name in _VOLATILE_NAMES:
+        return False
+    path = _get_reference_path(node)
+    if path is not None:
+        references.add(path)
+        return True
+    return all(_find_references(child, references) for child in node.iter_child_nodes())
+
+def _resolve_reference(data: dict, path: tuple) -> tuple:
+    # resolve path like jinja (attributes of objects take precedence over their keys)
+    obj = data
+    for depth in range(len(path)):
+        kind, key = path[depth]
+        if isinstance(obj, dict) and not (kind == "attr" and hasattr(obj, key)):
+            if key not in obj:
+                return depth, "missing", type(obj).__name__
+            obj = obj[key]
+        elif isinstance(obj, list) and kind == "item" and isinstance(key, int) and -len(obj) <= key < len(obj):
+            obj = obj[key]
+        else:
+            # result depends on the whole object (e.g. methods or attributes of values)
+            return depth, "value", repr(obj)
+    return len(path), "value", repr(obj)
+
 
 class Template:
+    # maximum number of compiled templates kept in memory
+    cache_size: int = 4096
+    # directory to store the compiled templates across runs (disabled if None)
+    bytecode_cache_dir: str or None = None
+    # cache of rendered files across runs (disabled if None)
+    render_cache: Cache or None = None
+    # version of the cached renders and render keys (changes invalidate all entries)
+    render_cache_version: str = "2"
+    # markers of template syntax
+    _markers: typing.Tuple[str, ...] = ("{{", "{%", "{#")
+    _lock: threading.Lock = threading.Lock()
+    _environments: typing.Dict[typing.Type[Undefined], Environment] = {}
+    _templates: LRUCache or None = None
+    _references: LRUCache or None = None
+
+    @staticmethod
+    def _get_environment(undefined: typing.Type[Undefined]) -> Environment:
+        if undefined not in Template._environments:
+            Template._environments[undefined] = Environment(
+                undefined=undefined,
+                extensions=[
+                    AnsibleCoreFiltersExtension,
+                ],
+                bytecode_cache=FileSystemBytecodeCache(create_dir(Template.bytecode_cache_dir)) if Template.bytecode_cache_dir else None,
+            )
+        return Template._environments[undefined]
+
+    @staticmethod
+    def _compile_template(content: str, undefined: typing.Type[Undefined]) -> JinjaTemplate:
+        environment = Template._get_environment(undefined)
+        bytecode_cache = environment.bytecode_cache
+        # load compiled template from the bytecode cache (keyed by the content, as templates have no name)
+        bucket = None
+        if bytecode_cache is not None:
+            key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+            bucket = bytecode_cache.get_bucket(environment, key, None, content)
+        code = bucket.code if bucket is not None else None
+        # compile template and store it in the bytecode cache
+        if code is None:
+            code = environment.compile(content)
+            if bucket is not None:
+                bucket.code = code
+                bytecode_cache.set_bucket(bucket)
+        return environment.template_class.from_code(environment, code, environment.globals, None)
+
     @staticmethod
     def _get_template(content: str, undefined: typing.Type[Undefined] = ExtendedUndefined) -> JinjaTemplate:
-        return JinjaTemplate(
-            source=content,
-            undefined=undefined,
-            extensions=[
-                AnsibleCoreFiltersExtension,
-            ]
-        )
+        with Template._lock:
+            if Template._templates is None:
+                Template._templates = LRUCache(Template.cache_size)
+            template = Template._templates.get((undefined, content))
+        if template is None:
+            template = Template._compile_template(content, undefined)
+            with Template._lock:
+                Template._templates[(undefined, content)] = template
+        return template
+
+    @staticmethod
+    def _is_template(content: str) -> bool:
+        return any(marker in content for marker in Template._markers)
+
+    @staticmethod
+    def _render_text(content: str) -> str:
+        # same output as rendering by jinja (normalized newlines, without trailing newline)
+        lines = newline_re.split(content)[::2]
+        if lines[-1] == "":
+            del lines[-1]
+        return "\n".join(lines)
 
     @staticmethod
     def render(content: str, data: dict = None) -> str:
+        # skip jinja if the content has no template syntax
+        if not Template._is_template(content):
+            return Template._render_text(content)
         try:
             # create variables
             data = data or {}
-            # convert variables to dot-notation
-            globals()['TemplateVarsInfo'] = _create_vars_info(data)
             # render template
             return Template._get_template(content).render(data)
         except TemplateSyntaxError as ex:
             raise TemplateSyntaxException(message=ex.message)
+        except ExtendedUndefinedError as ex:
+            raise TemplateUndefinedException(message=ex.undefined.get_message(data))
         except UndefinedError as ex:
             raise TemplateUndefinedException(message=ex.message)
 
@@ -102,25 +208,94 @@ class Template:
 
     @staticmethod
     def render_file(file: str, data: dict = None) -> str or None:
+        if file_exists(file):
+            with open(file, "r") as f:
+                return Template._render_file_content(f.read(), file, data)
+        return None
+
+    @staticmethod
+    def _render_file_content(content: str, file: str, data: dict = None) -> str:
         try:
-            if file_exists(file):
-                with open(file, "r") as f:
-                    return Template.render(f.read(), data)
-            return None
+            return Template.render(content, data)
         except TemplateSyntaxException as ex:
             raise TemplateSyntaxException(message=ex.message, file=file)
         except TemplateUndefinedException as ex:
             raise TemplateUndefinedException(message=ex.message, file=file)
 
+    @staticmethod
+    def _get_references(content_key: str, content: str) -> typing.List[tuple] or None:
+        # content without template syntax does not reference any variables
+        if not Template._is_template(content):
+            return []
+        # find variables referenced by the template (cached by content)
+        with Template._lock:
+            if Template._references is None:
+                Template._references = LRUCache(Template.cache_size)
+            cached_references = Template._references.get(content_key)
+        if cached_references is None and Template.render_cache:
+            cached_references = Template.render_cache.get("{0}.refs".format(content_key))
+            # paths are stored as lists of [kind, key] pairs
+            if cached_references is not None and cached_references[0] is not None:
+                cached_references = [tuple(tuple(step) for step in path) for path in cached_references[0]],
+        if cached_references is not None:
+            return cached_references[0]
+        references = None
+        try:
+            ast = Template._get_environment(ExtendedUndefined).parse(content)
+            found = set()
+            if _find_references(ast, found):
+                references = sorted(found, key=repr)
+        except TemplateSyntaxError:
+            pass
+        # store only paths with keys which are restored unchanged from json
+        if Template.render_cache and all(isinstance(key, (str, int, float, bool, type(None))) for path in references or [] for kind, key in path):
+            Template.render_cache.set("{0}.refs".format(content_key), references)
+        with Template._lock:
+            Template._references[content_key] = (references,)
+        return references
+
+    @staticmethod
+    def _create_render_key(content: str, data: dict, kind: str) -> str or None:
+        content_key = hashlib.blake2b("\0".join([Template.render_cache_version, jinja2.__version__, kind, content]).encode("utf-8"), digest_size=32).hexdigest()
+        # skip key if the result does not only depend on the variables
+        references = Template._get_references(content_key, content)
+        if references is None:
+            return None
+        # create key of content and values of the referenced variables
+        values = [_resolve_reference(data, path) for path in references]
+        return "{0}-{1}".format(content_key, hashlib.blake2b(repr(values).encode("utf-8"), digest_size=32).hexdigest())
+
+    @staticmethod
+    def create_file_key(file: str, data: dict = None, parse_all: bool = True) -> str or None:
+        # key of the file content and the referenced variables (None if the result can not be reused)
+        if not file_exists(file):
+            return None
+        with open(file, "r") as f:
+            return Template._create_render_key(f.read(), data or {}, "all" if parse_all else "one")
+
+    @staticmethod
+    def _render_and_parse_file(file: str, data: dict, parse_all: bool) -> any:
+        if not file_exists(file):
+            return None
+        with open(file, "r") as f:
+            content = f.read()
+        # use cached rendered content
+        key = Template._create_render_key(content, data or {}, "all" if parse_all else "one") if Template.render_cache else None
+        cached = Template.render_cache.get(key) if key else None
+        if cached is not None and isinstance(cached[0], str):
+            rendered = cached[0]
+        else:
+            rendered = Template._render_file_content(content, file, data)
+            if key:
+                Template.render_cache.set(key, rendered)
+        # parse content
+        return list(YAML.parse_all(rendered)) if parse_all else YAML.parse(rendered)
+
     @staticmethod
     def render_and_parse_yaml(file: str, data: dict = None) -> dict or None:
-        content = Template.render_file(file, data)
-        return YAML.parse(content) if content is not None else None
+        return Template._render_and_parse_file(file, data, parse_all=False)
 
     @staticmethod
     def render_and_parse_all_yaml(file: str, data: dict = None) -> typing.List[dict]:
-        content = Template.render_file(file, data)
-        items = []
-        for item in (YAML.parse_all(content) if content is not None else []):
-            items.append(item)
-        return items
+        items = Template._render_and_parse_file(file, data, parse_all=True)
+        return items if items is not None else []
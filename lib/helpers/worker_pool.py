@@ -0,0 +1,63 @@
+import typing
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+
+from lib.helpers.logging import Logger
+
+
+class WorkerPool:
+    def __init__(self, workers: int = 1):
+        self.workers: int = max(1, workers or 1)
+
+    def _get_ready_tasks(self, pending: typing.List[str], dependencies: typing.Dict[str, typing.List[str]], done: typing.Set[str]) -> typing.List[str]:
+        return [key for key in pending if all(dependency in done for dependency in dependencies.get(key, []))]
+
+    def _validate_dependencies(self, tasks: typing.List[str], dependencies: typing.Dict[str, typing.List[str]]):
+        # resolve tasks until no task is ready anymore
+        pending = list(tasks)
+        done: typing.Set[str] = set()
+        ready = self._get_ready_tasks(pending, dependencies, done)
+        while ready:
+            for key in ready:
+                pending.remove(key)
+                done.add(key)
+            ready = self._get_ready_tasks(pending, dependencies, done)
+        # all remaining tasks are part of a cycle or depend on one
+        if pending:
+            raise Exception("Circular dependency between '{0}' detected.".format("', '".join(pending)))
+
+    def _run_task(self, task: typing.Callable[[], bool]) -> bool:
+        # keep the log output of a task together, if tasks are running concurrently
+        if self.workers <= 1:
+            return task()
+        with Logger.buffered():
+            return task()
+
+    def run(self, tasks: typing.Dict[str, typing.Callable[[], bool]], dependencies: typing.Dict[str, typing.List[str]] = None) -> bool:
+        # only dependencies on tasks of this run have to be awaited
+        dependencies = {key: [dependency for dependency in (dependencies or {}).get(key, []) if dependency in tasks and dependency != key] for key in tasks}
+        self._validate_dependencies(list(tasks.keys()), dependencies)
+        pending: typing.List[str] = list(tasks.keys())
+        done: typing.Set[str] = set()
+        running: typing.Dict[Future, str] = {}
+        success: bool = True
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="worker") as executor:
+            while pending or running:
+                # dispatch ready tasks in their original order until all workers are busy
+                if success:
+                    for key in self._get_ready_tasks(pending, dependencies, done):
+                        if len(running) >= self.workers:
+                            break
+                        pending.remove(key)
+                        running[executor.submit(self._run_task, tasks[key])] = key
+                # stop if nothing can be dispatched anymore
+                if not running:
+                    break
+                # wait for the next finished task
+                finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = running.pop(future)
+                    if future.result():
+                        done.add(key)
+                    else:
+                        success = False
+        return success
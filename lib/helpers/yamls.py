@@ -1,61 +1,110 @@
 import yaml
 
-from lib.helpers.filesystem import resolve_path, file_exists, write_file
-from lib.helpers.object import is_primitive, object_format_each_primitive
+# use the libyaml bindings if available
+try:
+    from yaml import CSafeLoader as YAMLLoader, CSafeDumper as YAMLBaseFastDumper
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader, SafeDumper as YAMLBaseFastDumper
+
+from lib.helpers.filesystem import NormalizedPath, resolve_path, file_exists, write_file
 
 
 class YAMLQuoted(str): pass
 class YAMLMultiline(str): pass
 
-def YAMLQuotedRepresenter(dumper, data): return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='"')
-def YAMLMultilineRepresenter(dumper, data): return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
+def YAMLQuotedRepresenter(dumper, data): return dumper.represent_scalar('tag:yaml.org,2002:str', str(data), style='"')
+def YAMLMultilineRepresenter(dumper, data): return dumper.represent_scalar('tag:yaml.org,2002:str', str(data), style='|')
+def YAMLPathRepresenter(dumper, data): return dumper.represent_str(str(data))
+
+
+class YAMLQuotingRepresenter:
+    # strings in objects and lists are written quoted (or as literal block if multiline), keys keep the default style
+
+    def represent_quoted_value(self, data: any) -> yaml.Node:
+        if isinstance(data, YAMLMultiline) or (isinstance(data, str) and not isinstance(data, YAMLQuoted) and "\n" in data):
+            return YAMLMultilineRepresenter(self, data)
+        if isinstance(data, str):
+            return YAMLQuotedRepresenter(self, data)
+        return self.represent_data(data)
+
+    def represent_quoted_dict(self, data: dict) -> yaml.Node:
+        value = []
+        node = yaml.MappingNode('tag:yaml.org,2002:map', value, flow_style=self.default_flow_style)
+        if self.alias_key is not None:
+            self.represented_objects[self.alias_key] = node
+        for item_key in data:
+            value.append((self.represent_data(item_key), self.represent_quoted_value(data[item_key])))
+        if node.flow_style is None:
+            node.flow_style = all(isinstance(item, yaml.ScalarNode) and not item.style for pair in value for item in pair)
+        return node
 
-yaml.add_representer(YAMLQuoted, YAMLQuotedRepresenter)
-yaml.add_representer(YAMLMultiline, YAMLMultilineRepresenter)
+    def represent_quoted_list(self, data: list) -> yaml.Node:
+        value = []
+        node = yaml.SequenceNode('tag:yaml.org,2002:seq', value, flow_style=self.default_flow_style)
+        if self.alias_key is not None:
+            self.represented_objects[self.alias_key] = node
+        for item in data:
+            value.append(self.represent_quoted_value(item))
+        if node.flow_style is None:
+            node.flow_style = all(isinstance(item, yaml.ScalarNode) and not item.style for item in value)
+        return node
+
+class YAMLDumper(YAMLQuotingRepresenter, yaml.Dumper): pass
+class YAMLFastDumper(YAMLQuotingRepresenter, YAMLBaseFastDumper): pass
+
+for dumper in (YAMLDumper, YAMLFastDumper):
+    dumper.add_representer(dict, dumper.represent_quoted_dict)
+    dumper.add_representer(list, dumper.represent_quoted_list)
+    dumper.add_representer(YAMLQuoted, YAMLQuotedRepresenter)
+    dumper.add_representer(YAMLMultiline, YAMLMultilineRepresenter)
+    dumper.add_representer(NormalizedPath, YAMLPathRepresenter)
 
 
 class YAML:
     @staticmethod
-    def stringify(obj: any) -> str:
+    def stringify(obj: any, fast: bool = False) -> str:
         if isinstance(obj, list):
             return yaml.dump_all(
-                documents=YAML._pre_stringify(obj),
+                documents=[YAML._create_document(document) for document in obj],
+                Dumper=YAML._get_dumper(obj, fast),
                 sort_keys=False,
                 default_flow_style=False,
             )
         return yaml.dump(
-            data=YAML._pre_stringify(obj),
+            data=obj,
+            Dumper=YAML._get_dumper([obj], fast),
             sort_keys=False,
             default_flow_style=False,
         )
 
     @staticmethod
-    def _pre_stringify(obj: any) -> any:
-        if is_primitive(obj):
-           return obj
-        def _formatter(value: any):
-            if isinstance(value, str) and not isinstance(value, YAMLQuoted) and not isinstance(value, YAMLMultiline):
-                if len(value.split('\n')) > 1:
-                    return YAMLMultiline(value)
-                return YAMLQuoted(value)
-            return value
-
-        return object_format_each_primitive(obj, _formatter)
+    def _get_dumper(documents: list, fast: bool) -> type:
+        # the libyaml emitter folds long scalars differently and omits the end marker after documents with a
+        # scalar root, so it is only used for files read by kubectl and helm (other output stays the same on every system)
+        if not fast or any(not isinstance(document, (dict, list)) for document in documents):
+            return YAMLDumper
+        return YAMLFastDumper
 
+    @staticmethod
+    def _create_document(document: any) -> any:
+        # strings as documents are quoted like the strings in objects and lists
+        if isinstance(document, str) and not isinstance(document, (YAMLQuoted, YAMLMultiline)):
+            return YAMLMultiline(document) if "\n" in document else YAMLQuoted(document)
+        return document
 
     @staticmethod
     def parse(yaml_string: str) -> any:
-        return yaml.safe_load(yaml_string)
+        return yaml.load(yaml_string, Loader=YAMLLoader)
 
     @staticmethod
     def parse_all(yaml_string: str) -> any:
-        return yaml.safe_load_all(yaml_string)
+        return yaml.load_all(yaml_string, Loader=YAMLLoader)
 
     @staticmethod
-    def to_file(filename: str, obj: any, cwd: str = None) -> any:
+    def to_file(filename: str, obj: any, cwd: str = None, fast: bool = False) -> any:
         write_file(
             path=filename,
-            content=YAML.stringify(obj),
+            content=YAML.stringify(obj, fast),
             cwd=cwd,
         )
         return obj
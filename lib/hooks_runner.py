@@ -31,10 +31,10 @@ class ProjectHooksRunner:
         # get executable
         executable = self._get_executable_from_script(script)
         # create command builder
-        builder = CommandBuilder(executable if executable else script, cwd=self.project.get_project_dir())
+        builder = CommandBuilder(executable if executable else script, cwd=self.project.get_project_dir(), shell=self.project.config.use_shell())
         # add script as command
         if executable:
-            builder.add_command('"{0}"'.format(script))
+            builder.add_command(script)
         # log information
         Logger.info("Running {0} hook '{1}'...".format(type, script))
         # run hook
@@ -2,9 +2,11 @@ import typing
 
 from lib.builder.state import ProjectBuilderState
 from lib.config.config import ProjectConfig
-from lib.helpers.object import flatten_array, reverse_array
+from lib.helpers.object import flatten_array
+from lib.plan.result import ProjectPlanResult
 from lib.plan.schemes.chart import ProjectPlanChart
 from lib.plan.schemes.manifest import ProjectPlanManifest
+from lib.state.schemes.manifest import ProjectStateManifest
 from lib.state.state import ProjectState
 
 
@@ -13,14 +15,35 @@ class ProjectPlan:
         self.config: ProjectConfig = config
         self.state_current: ProjectState = state_current
         self.state_new: ProjectState = state_new
+        self.manifests: ProjectPlanResult or None = None
+        self.charts: ProjectPlanResult or None = None
+        self.manifest_ranks: typing.Dict[str, int] or None = None
+        self.manifest_unranked: int = 0
+        self.chart_dependencies: typing.Dict[str, typing.List[str]] = {}
+
+    def _is_forced(self) -> bool:
+        return "force" in self.config.arguments and self.config.arguments.force
+
+    def _get_manifests_result(self) -> ProjectPlanResult:
+        if self.manifests is None:
+            self.manifests = ProjectPlanResult(self._create_manifests())
+        return self.manifests
+
+    def _get_charts_result(self) -> ProjectPlanResult:
+        if self.charts is None:
+            self.charts = ProjectPlanResult(self._create_charts())
+        return self.charts
 
     def get_manifests(self) -> typing.List[ProjectPlanManifest]:
+        return self._get_manifests_result().get("total")
+
+    def _create_manifests(self) -> typing.List[ProjectPlanManifest]:
         manifests = []
         for new_manifest in self.state_new.get_manifests():
             if self.state_current.has_manifest(new_manifest):
                 current_manifest = self.state_current.get_manifest(new_manifest)
                 manifests.append(ProjectPlanManifest(
-                    action="update" if ("force" in self.config.arguments and self.config.arguments.force) or current_manifest.get_checksum() != new_manifest.get_checksum() else "nothing",
+                    action="update" if self._is_forced() or current_manifest.get_checksum() != new_manifest.get_checksum() else "nothing",
                     manifest=new_manifest,
                     manifest_current=current_manifest,
                 ))
@@ -37,30 +60,50 @@ class ProjectPlan:
                 ))
         return self._sort_manifests(manifests)
 
+    def _get_manifest_ranks(self) -> typing.Dict[str, int]:
+        # create rank lookup table once (first occurrence of a kind or type wins)
+        if self.manifest_ranks is None:
+            orders = self.config.get_kubectl_order()
+            self.manifest_ranks = {}
+            for index, order in enumerate(orders):
+                self.manifest_ranks.setdefault(order, index)
+            # all other manifests are placed behind the ordered ones
+            self.manifest_unranked = len(orders)
+        return self.manifest_ranks
+
+    def get_manifest_rank(self, manifest: ProjectStateManifest) -> int:
+        ranks = self._get_manifest_ranks()
+        return min(
+            ranks.get(manifest.get_kind().strip().lower(), self.manifest_unranked),
+            ranks.get(manifest.get_type().strip().lower(), self.manifest_unranked),
+        )
+
     def _sort_manifests(self, manifests: typing.List[ProjectPlanManifest]) -> typing.List[ProjectPlanManifest]:
-        # create array for items
-        items: typing.List[ProjectPlanManifest] = []
-        # sort items based on the order
-        for order in self.config.get_kubectl_order():
-            for item in manifests:
-                manifest = item.get_manifest()
-                if order == manifest.get_kind().strip().lower() or order == manifest.get_type().strip().lower():
-                    if item not in items:
-                        items.append(item)
-        # sort all other items
+        # sort items based on the order (stable, so items of the same rank keep their order)
+        return sorted(manifests, key=lambda item: self.get_manifest_rank(item.get_manifest()))
+
+    def get_manifest_waves(self, manifests: typing.List[ProjectPlanManifest]) -> typing.List[typing.List[ProjectPlanManifest]]:
+        # group sorted items by their rank
+        waves: typing.List[typing.List[ProjectPlanManifest]] = []
+        wave_rank: int or None = None
         for item in manifests:
-            if item not in items:
-                items.append(item)
-        # return items
-        return items
+            rank = self.get_manifest_rank(item.get_manifest())
+            if not waves or rank != wave_rank:
+                waves.append([])
+                wave_rank = rank
+            waves[-1].append(item)
+        return waves
 
     def get_charts(self) -> typing.List[ProjectPlanChart]:
+        return self._get_charts_result().get("total")
+
+    def _create_charts(self) -> typing.List[ProjectPlanChart]:
         charts = []
         for new_chart in self.state_new.get_charts():
             if self.state_current.has_chart(new_chart):
                 current_chart = self.state_current.get_chart(new_chart)
                 charts.append(ProjectPlanChart(
-                    action="update" if ("force" in self.config.arguments and self.config.arguments.force) or current_chart.get_checksum() != new_chart.get_checksum() else "nothing",
+                    action="update" if self._is_forced() or current_chart.get_checksum() != new_chart.get_checksum() else "nothing",
                     chart=new_chart,
                     chart_current=current_chart,
                 ))
@@ -75,10 +118,28 @@ class ProjectPlan:
                     action="delete",
                     chart=current_chart,
                 ))
+        # resolve dependencies between all charts (unresolvable dependencies fail before anything is applied,
+        # removed charts use the dependencies of the state and skip the ones which do not exist anymore)
+        releases = [item.get_chart() for item in charts]
+        self.chart_dependencies = {item.get_chart().get_identifier(): item.get_chart().get_dependencies(releases, strict=not item.is_action("delete")) for item in charts}
         return self._sort_charts(charts)
+
     def _sort_charts(self, charts: typing.List[ProjectPlanChart]) -> typing.List[ProjectPlanChart]:
         return charts
 
+    def get_chart_dependencies(self, charts: typing.List[ProjectPlanChart], reverse: bool = False) -> typing.Dict[str, typing.List[str]]:
+        # map each chart to the charts it has to wait for (reversed: the charts depending on it)
+        self._get_charts_result()
+        dependencies: typing.Dict[str, typing.List[str]] = {item.get_chart().get_identifier(): [] for item in charts}
+        for identifier in dependencies:
+            for dependency in self.chart_dependencies.get(identifier, []):
+                if dependency in dependencies:
+                    if reverse:
+                        dependencies[dependency].append(identifier)
+                    else:
+                        dependencies[identifier].append(dependency)
+        return dependencies
+
     def get_total_resources(self) -> typing.List[ProjectPlanManifest or ProjectPlanChart]:
         return flatten_array(self.get_total_manifests(), self.get_total_charts())
 
@@ -103,50 +164,83 @@ class ProjectPlan:
     def get_removed_resources(self) -> typing.List[ProjectPlanManifest or ProjectPlanChart]:
         return flatten_array(self.get_removed_manifests(), self.get_removed_charts())
 
+    def count_processable_resources(self) -> int:
+        return self.count_processable_manifests() + self.count_processable_charts()
+
+    def count_expected_resources(self) -> int:
+        return self.count_expected_manifests() + self.count_expected_charts()
+
+    def count_existing_resources(self) -> int:
+        return self.count_existing_manifests() + self.count_existing_charts()
+
     def get_total_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return [item for item in self.get_manifests()]
+        return self._get_manifests_result().get("total")
 
     def get_processable_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return [item for item in self.get_manifests() if item.is_action("create", "update", "delete")]
+        return self._get_manifests_result().get("processable")
 
     def get_expected_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return [item for item in self.get_manifests() if item.is_action("nothing", "create", "update")]
+        return self._get_manifests_result().get("expected")
 
     def get_existing_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return [item for item in self.get_manifests() if item.is_action("nothing", "update")]
+        return self._get_manifests_result().get("existing")
 
     def get_unchanged_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return [item for item in self.get_manifests() if item.is_action("nothing")]
+        return self._get_manifests_result().get("unchanged")
 
     def get_added_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return [item for item in self.get_manifests() if item.is_action("create")]
+        return self._get_manifests_result().get("added")
 
     def get_updated_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return [item for item in self.get_manifests() if item.is_action("update")]
+        return self._get_manifests_result().get("updated")
+
+    def get_changed_manifests(self) -> typing.List[ProjectPlanManifest]:
+        return self._get_manifests_result().get("changed")
 
     def get_removed_manifests(self) -> typing.List[ProjectPlanManifest]:
-        return reverse_array([item for item in self.get_manifests() if item.is_action("delete")])
+        return self._get_manifests_result().get("removed")
+
+    def count_processable_manifests(self) -> int:
+        return self._get_manifests_result().count("processable")
+
+    def count_expected_manifests(self) -> int:
+        return self._get_manifests_result().count("expected")
+
+    def count_existing_manifests(self) -> int:
+        return self._get_manifests_result().count("existing")
 
     def get_total_charts(self) -> typing.List[ProjectPlanChart]:
-        return [item for item in self.get_charts()]
+        return self._get_charts_result().get("total")
 
     def get_processable_charts(self) -> typing.List[ProjectPlanChart]:
-        return [item for item in self.get_charts() if item.is_action("create", "update", "delete")]
+        return self._get_charts_result().get("processable")
 
     def get_expected_charts(self) -> typing.List[ProjectPlanChart]:
-        return [item for item in self.get_charts() if item.is_action("nothing", "create", "update")]
+        return self._get_charts_result().get("expected")
 
     def get_existing_charts(self) -> typing.List[ProjectPlanChart]:
-        return [item for item in self.get_charts() if item.is_action("nothing", "update")]
+        return self._get_charts_result().get("existing")
 
     def get_unchanged_charts(self) -> typing.List[ProjectPlanChart]:
-        return [item for item in self.get_charts() if item.is_action("nothing")]
+        return self._get_charts_result().get("unchanged")
 
     def get_added_charts(self) -> typing.List[ProjectPlanChart]:
-        return [item for item in self.get_charts() if item.is_action("create")]
+        return self._get_charts_result().get("added")
 
     def get_updated_charts(self) -> typing.List[ProjectPlanChart]:
-        return [item for item in self.get_charts() if item.is_action("update")]
+        return self._get_charts_result().get("updated")
+
+    def get_changed_charts(self) -> typing.List[ProjectPlanChart]:
+        return self._get_charts_result().get("changed")
 
     def get_removed_charts(self) -> typing.List[ProjectPlanChart]:
-        return reverse_array([item for item in self.get_charts() if item.is_action("delete")])
+        return self._get_charts_result().get("removed")
+
+    def count_processable_charts(self) -> int:
+        return self._get_charts_result().count("processable")
+
+    def count_expected_charts(self) -> int:
+        return self._get_charts_result().count("expected")
+
+    def count_existing_charts(self) -> int:
+        return self._get_charts_result().count("existing")
@@ -0,0 +1,38 @@
+import typing
+
+from lib.plan.schemes.chart import ProjectPlanChart
+from lib.plan.schemes.manifest import ProjectPlanManifest
+
+
+class ProjectPlanResult:
+    groups: typing.Dict[str, typing.Tuple[str, ...]] = {
+        "total": ("nothing", "create", "update", "delete"),
+        "processable": ("create", "update", "delete"),
+        "expected": ("nothing", "create", "update"),
+        "existing": ("nothing", "update"),
+        "unchanged": ("nothing",),
+        "added": ("create",),
+        "updated": ("update",),
+        "changed": ("create", "update"),
+        "removed": ("delete",),
+    }
+
+    def __init__(self, items: typing.List[ProjectPlanManifest or ProjectPlanChart]):
+        # create buckets for every group
+        buckets: typing.Dict[str, list] = {group: [] for group in self.groups}
+        # add each item to the groups matching its action (keeps the order of the items)
+        for item in items:
+            action = item.get_action()
+            for group in self.groups:
+                if action in self.groups[group]:
+                    buckets[group].append(item)
+        # removed items are processed in reverse order
+        buckets["removed"].reverse()
+        # freeze buckets
+        self._buckets: typing.Dict[str, tuple] = {group: tuple(buckets[group]) for group in buckets}
+
+    def get(self, group: str) -> typing.List[ProjectPlanManifest or ProjectPlanChart]:
+        return list(self._buckets[group])
+
+    def count(self, group: str) -> int:
+        return len(self._buckets[group])
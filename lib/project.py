@@ -5,6 +5,7 @@ from lib.builder.state import ProjectBuilderState
 from lib.config.config import ProjectConfig
 from lib.helpers.filesystem import resolve_path, file_exists, dir_exists
 from lib.helpers.helm import Helm
+from lib.helpers.kube_api import KubeApi
 from lib.helpers.kubectl import Kubectl
 from lib.hooks_runner import ProjectHooksRunner
 from lib.plan.plan import ProjectPlan
@@ -14,9 +15,10 @@ from lib.state.state import ProjectState
 
 class Project:
     def __init__(self, arguments: Namespace):
-        self.config: ProjectConfig = ProjectConfig(arguments.project, arguments.config, arguments)
+        state = ProjectState.read_file(arguments.state, cwd=arguments.project)
+        self.config: ProjectConfig = ProjectConfig(arguments.project, arguments.config, arguments, state=state)
         self.arguments: Namespace = arguments
-        self.state_current: ProjectState = ProjectState.from_file(arguments.state, cwd=arguments.project, arguments=self.arguments, config=self.config)
+        self.state_current: ProjectState = ProjectState.from_dict(state, arguments=self.arguments, config=self.config)
         self.state_new: ProjectState = ProjectState.from_empty(arguments=arguments, config=self.config)
 
     def get_project_dir(self) -> str:
@@ -50,10 +52,12 @@ class Project:
         return ProjectHooksRunner(project=self)
 
     def get_helm(self) -> Helm:
-        return Helm(self.config.get_helm_executable())
+        return Helm(self.config.get_helm_executable(), shell=self.config.use_shell(), temp_files=self.config.use_temp_files())
 
     def get_kubectl(self) -> Kubectl:
-        return Kubectl(self.config.get_kubectl_executable())
+        if self.config.use_server_side():
+            return KubeApi(self.config.get_kubectl_executable(), shell=self.config.use_shell(), url=self.config.get_api_url())
+        return Kubectl(self.config.get_kubectl_executable(), shell=self.config.use_shell(), temp_files=self.config.use_temp_files())
 
     def build(self) -> ProjectBuilderState:
         return ProjectBuilder(self.config, arguments=self.arguments).build()
\ No newline at end of file
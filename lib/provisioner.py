@@ -1,9 +1,11 @@
+import threading
 import typing
 from typing import TYPE_CHECKING
 
 from lib.helpers.helm import Helm
 from lib.helpers.kubectl import Kubectl
 from lib.helpers.logging import Logger
+from lib.plan.schemes.manifest import ProjectPlanManifest
 from lib.state.schemes.chart import ProjectStateChart
 from lib.state.schemes.manifest import ProjectStateManifest
 from lib.state.state import ProjectState
@@ -20,14 +22,17 @@ class ProjectProvisioner:
         self.resources_updated: int = 0
         self.resources_deleted: int = 0
         self.resources_failed: int = 0
+        self.lock: threading.RLock = threading.RLock()
 
-    def _run_command(self, command_func: typing.Callable, logger_indent: int = 0, **command_args) -> bool:
+    def _run_command(self, command_func: typing.Callable, logger_indent: int = 0, output: typing.List[str] = None, **command_args) -> bool:
         for line in command_func(**command_args):
             if line["type"] == "command":
                 Logger.debug("$ {0}".format(line["data"]), indent=logger_indent+1)
                 Logger.debug("-----", indent=logger_indent+1)
             elif line["type"] == "data":
                 Logger.debug(line["data"], indent=logger_indent+1)
+                if output is not None:
+                    output.append(line["data"])
             elif line["type"] == "error":
                 Logger.error(line["data"], indent=logger_indent+1)
             elif line["type"] == "code":
@@ -40,12 +45,14 @@ class ProjectProvisioner:
         Logger.info("- Installing chart '{0}' in namespace '{1}'...".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
         # install chart
         if not self._run_command(self.helm.apply, logger_indent=logger_indent, release=chart, values_file=values_file):
-            self.resources_failed = self.resources_failed + 1
+            with self.lock:
+                self.resources_failed = self.resources_failed + 1
             Logger.fatal("- Could not install chart '{0}' in namespace '{1}'.".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
             return False
         # chart has been installed
-        self.state.set_chart(chart)
-        self.resources_created = self.resources_created + 1
+        with self.lock:
+            self.state.set_chart(chart, checkpoint=True)
+            self.resources_created = self.resources_created + 1
         Logger.success("- Chart '{0}' in namespace '{1}' has been installed.".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
         return True
 
@@ -54,13 +61,15 @@ class ProjectProvisioner:
         Logger.info("- Upgrading chart '{0}' in namespace '{1}'...".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
         # upgrade chart
         if not self._run_command(self.helm.apply, logger_indent=logger_indent, release=chart, values_file=values_file):
-            self.resources_failed = self.resources_failed + 1
+            with self.lock:
+                self.resources_failed = self.resources_failed + 1
+                self.state.set_chart(old_chart)
             Logger.fatal("- Could not upgrade chart '{0}' in namespace '{1}'.".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
-            self.state.set_chart(old_chart)
             return False
         # chart has been upgraded
-        self.state.set_chart(chart)
-        self.resources_updated = self.resources_updated + 1
+        with self.lock:
+            self.state.set_chart(chart, checkpoint=True)
+            self.resources_updated = self.resources_updated + 1
         Logger.success("- Chart '{0}' in namespace '{1}' has been upgraded.".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
         return True
 
@@ -69,13 +78,15 @@ class ProjectProvisioner:
         Logger.info("- Uninstalling chart '{0}' in namespace '{1}'...".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
         # uninstall chart
         if not self._run_command(self.helm.uninstall, logger_indent=logger_indent, release=chart):
-            self.resources_failed = self.resources_failed + 1
+            with self.lock:
+                self.resources_failed = self.resources_failed + 1
+                self.state.set_chart(chart)
             Logger.fatal("- Could not uninstall chart '{0}' in namespace '{1}'.".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
-            self.state.set_chart(chart)
             return False
         # chart has been uninstalled
-        self.state.remove_chart(chart)
-        self.resources_deleted = self.resources_deleted + 1
+        with self.lock:
+            self.state.remove_chart(chart, checkpoint=True)
+            self.resources_deleted = self.resources_deleted + 1
         Logger.success("- Chart '{0}' in namespace '{1}' has been uninstalled.".format(chart.get_name(), chart.get_namespace()), indent=logger_indent)
         return True
 
@@ -96,7 +107,7 @@ class ProjectProvisioner:
             )
             return False
         # manifest has been created
-        self.state.set_manifest(manifest)
+        self.state.set_manifest(manifest, checkpoint=True)
         self.resources_created = self.resources_created + 1
         Logger.success(
             ("- {0} '{1}' in namespace '{2}' has been created." if manifest.get_namespace() else "- {0} '{1}' has been created.")
@@ -123,7 +134,7 @@ class ProjectProvisioner:
             self.state.set_manifest(old_manifest)
             return False
         # manifest has been updated
-        self.state.set_manifest(manifest)
+        self.state.set_manifest(manifest, checkpoint=True)
         self.resources_updated = self.resources_updated + 1
         Logger.success(
             ("- {0} '{1}' in namespace '{2}' has been updated." if manifest.get_namespace() else "- {0} '{1}' has been updated.")
@@ -150,7 +161,7 @@ class ProjectProvisioner:
             self.state.set_manifest(manifest)
             return False
         # manifest has been deleted
-        self.state.remove_manifest(manifest)
+        self.state.remove_manifest(manifest, checkpoint=True)
         self.resources_deleted = self.resources_deleted + 1
         Logger.success(
             ("- {0} '{1}' in namespace '{2}' has been deleted." if manifest.get_namespace() else "- {0} '{1}' has been deleted.")
@@ -159,6 +170,57 @@ class ProjectProvisioner:
         )
         return True
 
+    def _split_batch(self, items: typing.List[ProjectPlanManifest]) -> typing.List[typing.List[ProjectPlanManifest]]:
+        # split items into batches with unique object names, because "kubectl apply -o name" does not print the namespace
+        batches: typing.List[typing.List[ProjectPlanManifest]] = []
+        names: typing.List[typing.Set[str]] = []
+        for item in items:
+            name = self.kubectl.get_object_name(item.get_manifest())
+            index = next((i for i in range(len(names)) if name not in names[i]), len(names))
+            if index == len(names):
+                batches.append([])
+                names.append(set())
+            batches[index].append(item)
+            names[index].add(name)
+        return batches
+
+    def apply_manifests(self, items: typing.List[ProjectPlanManifest], logger_indent: int = 0) -> bool:
+        for batch in self._split_batch(items):
+            # log information
+            Logger.info("- Applying {0} manifests...".format(len(batch)), indent=logger_indent)
+            # apply all manifests of the batch with one command
+            output: typing.List[str] = []
+            self._run_command(self.kubectl.apply_all, logger_indent=logger_indent, output=output, manifests=[item.get_manifest() for item in batch])
+            applied = set([line.strip() for line in output])
+            # update state for every applied manifest
+            failed: typing.List[ProjectPlanManifest] = []
+            for item in batch:
+                manifest = item.get_manifest()
+                if self.kubectl.get_object_name(manifest) not in applied:
+                    failed.append(item)
+                    continue
+                self.state.set_manifest(manifest, checkpoint=True)
+                if item.is_action("create"):
+                    self.resources_created = self.resources_created + 1
+                else:
+                    self.resources_updated = self.resources_updated + 1
+                Logger.success(
+                    ("- {0} '{1}' in namespace '{2}' has been {3}." if manifest.get_namespace() else "- {0} '{1}' has been {3}.")
+                    .format(manifest.get_kind(), manifest.get_name(), manifest.get_namespace(), "created" if item.is_action("create") else "updated"),
+                    indent=logger_indent
+                )
+            # apply failed manifests one by one
+            for item in failed:
+                if item.is_action("create"):
+                    if not self.create_manifest(item.get_manifest(), logger_indent=logger_indent):
+                        return False
+                elif not self.update_manifest(item.get_manifest(), item.get_current_manifest(), logger_indent=logger_indent):
+                    return False
+        return True
+
+    def close(self):
+        self.kubectl.close()
+
     def get_resources_total(self) -> int:
         return self.resources_created + self.resources_updated + self.resources_deleted + self.resources_failed
 
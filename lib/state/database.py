@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+import typing
+import zlib
+
+from lib.helpers.filesystem import create_parent_of_file, file_exists, resolve_path
+
+if typing.TYPE_CHECKING:
+    from lib.state.schemes.chart import ProjectStateChart
+    from lib.state.schemes.manifest import ProjectStateManifest
+
+
+class ProjectStateDatabaseEntry:
+    def __init__(self, database: "ProjectStateDatabase", kind: str, key: str, header: dict):
+        self.database: "ProjectStateDatabase" = database
+        self.kind: str = kind
+        self.key: str = key
+        # fields needed without the content (e.g. name and namespace)
+        self.header: dict = header
+
+    def __deepcopy__(self, memo: dict) -> "ProjectStateDatabaseEntry":
+        # entries only reference stored content, which is never changed
+        return self
+
+    def get_header(self) -> dict:
+        return self.header
+
+    def load(self) -> dict:
+        return self.database.read_content(self.kind, self.key)
+
+
+class ProjectStateDatabase:
+    # file extensions of state files stored in a database
+    extensions: typing.Tuple[str, ...] = (".db", ".sqlite", ".sqlite3")
+
+    def __init__(self, file: str, cwd: str = None):
+        self.file: str = resolve_path(file, cwd=cwd)
+        self.connection: sqlite3.Connection or None = None
+
+    @staticmethod
+    def is_database(file: str) -> bool:
+        return file.strip().lower().endswith(ProjectStateDatabase.extensions)
+
+    def get_json_file(self) -> str:
+        # state file with the same name, which is migrated into the database on the first write
+        return os.path.splitext(self.file)[0] + ".json"
+
+    def exists(self) -> bool:
+        return file_exists(self.file)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            create_parent_of_file(self.file)
+            self.connection = sqlite3.connect(self.file)
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS resources (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    checksum TEXT NOT NULL,
+                    header TEXT NOT NULL,
+                    content BLOB NOT NULL,
+                    PRIMARY KEY (kind, key)
+                );
+                CREATE TABLE IF NOT EXISTS sources (
+                    name TEXT NOT NULL PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    manifests TEXT NOT NULL
+                );
+            """)
+        return self.connection
+
+    def read(self) -> dict:
+        state = {
+            "charts": {},
+            "manifests": {},
+            "sources": {},
+            "checksums": {
+                "charts": {},
+                "manifests": {},
+            },
+        }
+        connection = self._connect()
+        # read checksum and header of each resource (the content is loaded on first use)
+        for kind, key, checksum, header in connection.execute("SELECT kind, key, checksum, header FROM resources ORDER BY kind, position"):
+            if kind in ("charts", "manifests"):
+                state[kind][key] = ProjectStateDatabaseEntry(self, kind, key, json.loads(header))
+                state["checksums"][kind][key] = checksum
+        # read sources of the manifests
+        for name, key, manifests in connection.execute("SELECT name, key, manifests FROM sources"):
+            state["sources"][name] = {
+                "key": key,
+                "manifests": json.loads(manifests),
+            }
+        return state
+
+    def read_content(self, kind: str, key: str) -> dict:
+        row = self._connect().execute("SELECT content FROM resources WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        if row is None:
+            raise KeyError("No {0} '{1}' found in state '{2}'.".format(kind, key, self.file))
+        return json.loads(zlib.decompress(row[0]))
+
+    def _create_rows(self, kind: str, resources: typing.Dict[str, "ProjectStateChart" or "ProjectStateManifest"], checksums: typing.Dict[str, str]) -> list:
+        rows = []
+        for position, key in enumerate(resources):
+            resource = resources[key]
+            checksum = resource.get_checksum()
+            # content is only written for new and changed resources
+            content = None
+            if checksums.get(key) != checksum:
+                content = zlib.compress(json.dumps(resource.to_state(), separators=(",", ":")).encode("utf-8"))
+            rows.append((kind, key, position, checksum, json.dumps(resource.to_header(), separators=(",", ":")), content))
+        return rows
+
+    def write(self, charts: typing.Dict[str, "ProjectStateChart"], manifests: typing.Dict[str, "ProjectStateManifest"], sources: dict):
+        connection = self._connect()
+        # find stored checksums
+        checksums = {"charts": {}, "manifests": {}}
+        for kind, key, checksum in connection.execute("SELECT kind, key, checksum FROM resources"):
+            checksums.setdefault(kind, {})[key] = checksum
+        # serialize resources before writing (lazily loaded content is read from the database)
+        rows = self._create_rows("charts", charts, checksums["charts"]) + self._create_rows("manifests", manifests, checksums["manifests"])
+        # replace state in a single transaction
+        with connection:
+            connection.execute("CREATE TEMPORARY TABLE IF NOT EXISTS current_resources (kind TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (kind, key))")
+            connection.execute("DELETE FROM current_resources")
+            connection.executemany("INSERT INTO current_resources (kind, key) VALUES (?, ?)", [(row[0], row[1]) for row in rows])
+            connection.execute("DELETE FROM resources WHERE (kind, key) NOT IN (SELECT kind, key FROM current_resources)")
+            connection.executemany(
+                "UPDATE resources SET position = ?, header = ? WHERE kind = ? AND key = ?",
+                [(row[2], row[4], row[0], row[1]) for row in rows if row[5] is None]
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO resources (kind, key, position, checksum, header, content) VALUES (?, ?, ?, ?, ?, ?)",
+                [row for row in rows if row[5] is not None]
+            )
+            connection.execute("DELETE FROM sources")
+            connection.executemany(
+                "INSERT INTO sources (name, key, manifests) VALUES (?, ?, ?)",
+                [(name, sources[name]["key"], json.dumps(sources[name]["manifests"])) for name in sources]
+            )
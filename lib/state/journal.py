@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import time
+import typing
+
+from lib.helpers.filesystem import create_parent_of_file, delete_file, file_exists, resolve_path
+
+
+class ProjectStateJournal:
+    # maximum number of entries and seconds until written entries are synced to the disk
+    sync_count: int = 64
+    sync_interval: float = 1.0
+
+    def __init__(self, state_file: str, cwd: str = None):
+        self.file: str = ProjectStateJournal.get_file(state_file, cwd=cwd)
+        self.handle: typing.TextIO or None = None
+        self.pending: int = 0
+        self.synced_at: float = 0.0
+        self.lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def get_file(state_file: str, cwd: str = None) -> str:
+        return resolve_path(state_file, cwd=cwd) + ".journal"
+
+    def _sync(self):
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+        self.pending = 0
+        self.synced_at = time.monotonic()
+
+    def _append(self, entry: dict):
+        with self.lock:
+            if self.handle is None:
+                create_parent_of_file(self.file)
+                self.handle = open(self.file, "a", encoding="utf-8")
+                self.synced_at = time.monotonic()
+            # write entry immediately, but sync it to the disk with the following entries
+            self.handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self.handle.flush()
+            self.pending = self.pending + 1
+            if self.pending >= self.sync_count or time.monotonic() - self.synced_at >= self.sync_interval:
+                self._sync()
+
+    def set(self, kind: str, key: str, content: dict, checksum: str):
+        self._append({"action": "set", "kind": kind, "key": key, "content": content, "checksum": checksum})
+
+    def remove(self, kind: str, key: str):
+        self._append({"action": "remove", "kind": kind, "key": key})
+
+    def close(self):
+        with self.lock:
+            if self.handle is not None:
+                self._sync()
+                self.handle.close()
+                self.handle = None
+
+    def delete(self):
+        self.close()
+        delete_file(self.file)
+
+    @staticmethod
+    def replay(state: dict or None, state_file: str, cwd: str = None) -> dict or None:
+        # return state unchanged if no changes have been journaled (e.g. the last run has been completed)
+        file = ProjectStateJournal.get_file(state_file, cwd=cwd)
+        if not file_exists(file):
+            return state
+        state = state if state is not None else {"charts": {}, "manifests": {}}
+        changed_manifests = set()
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                # skip incomplete entries (e.g. the last entry before a crash)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict) or entry.get("kind") not in ("charts", "manifests") or not isinstance(entry.get("key"), str):
+                    continue
+                kind, key = entry["kind"], entry["key"]
+                checksums = state.setdefault("checksums", {}).setdefault(kind, {})
+                if entry.get("action") == "set":
+                    state.setdefault(kind, {})[key] = entry["content"]
+                    checksums[key] = entry["checksum"]
+                elif entry.get("action") == "remove":
+                    state.setdefault(kind, {}).pop(key, None)
+                    checksums.pop(key, None)
+                if kind == "manifests":
+                    changed_manifests.add(key)
+        # sources of changed manifests can not be reused
+        sources = state.get("sources", {})
+        for name in [name for name in sources if not changed_manifests.isdisjoint(sources[name].get("manifests", []))]:
+            del sources[name]
+        return state
@@ -1,7 +1,63 @@
+import typing
+
 from lib.config.schemes.helm_release import ProjectConfigHelmRelease
-from lib.helpers.common import to_md5
+from lib.helpers.common import to_checksum
+from lib.state.database import ProjectStateDatabaseEntry
 
+if typing.TYPE_CHECKING:
+    from lib.config.config import ProjectConfig
 
 class ProjectStateChart(ProjectConfigHelmRelease):
+    def __init__(self, data: dict or ProjectStateDatabaseEntry, config: "ProjectConfig", checksum: str = None):
+        # entry of the state database (the content is loaded on first use)
+        self.entry: ProjectStateDatabaseEntry or None = data if isinstance(data, ProjectStateDatabaseEntry) else None
+        super().__init__(data if self.entry is None else None, config)
+        # checksum of the state (computed on first use, if not stored in the state file)
+        self.checksum: str or None = checksum
+
+    @property
+    def chart(self) -> dict:
+        if self._chart is None and self.entry is not None:
+            self._chart = self.entry.load()
+        return self._chart
+
+    @chart.setter
+    def chart(self, chart: dict or None):
+        self._chart = chart
+
+    def _get_header(self) -> dict:
+        return self.entry.get_header() if self._chart is None and self.entry is not None else self.chart
+
+    def get_name(self) -> str:
+        return self._get_header()["name"]
+
+    def get_namespace(self) -> str:
+        if self._chart is None and self.entry is not None:
+            return self.entry.get_header()["namespace"]
+        return super().get_namespace()
+
+    def get_chart(self) -> str:
+        return self._get_header()["chart"]
+
+    def get_depends_on(self) -> typing.List[str]:
+        return self._get_header().get("dependsOn", [])
+
+    def set_values(self, values: dict) -> dict:
+        self.checksum = None
+        return super().set_values(values)
+
     def get_checksum(self) -> str:
-        return to_md5(self.to_state())
+        if self.checksum is None:
+            self.checksum = to_checksum(self.to_state())
+        return self.checksum
+
+    def to_header(self) -> dict:
+        header = {
+            "name": self.get_name(),
+            "namespace": self.get_namespace(),
+            "chart": self.get_chart(),
+        }
+        # dependencies are needed to uninstall removed releases without loading their content
+        if self.get_depends_on():
+            header["dependsOn"] = self.get_depends_on()
+        return header
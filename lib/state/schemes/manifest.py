@@ -1,7 +1,57 @@
+import typing
+
 from lib.config.schemes.kubectl_manifest import ProjectConfigKubectlManifest
-from lib.helpers.common import to_md5
+from lib.helpers.common import to_checksum
+from lib.helpers.jsons import JSON
+from lib.state.database import ProjectStateDatabaseEntry
 
+if typing.TYPE_CHECKING:
+    from lib.config.config import ProjectConfig
 
 class ProjectStateManifest(ProjectConfigKubectlManifest):
+    def __init__(self, manifest: dict or ProjectStateDatabaseEntry, config: "ProjectConfig", checksum: str = None):
+        # entry of the state database (the content is loaded on first use)
+        self.entry: ProjectStateDatabaseEntry or None = manifest if isinstance(manifest, ProjectStateDatabaseEntry) else None
+        super().__init__(manifest if self.entry is None else None, config)
+        # checksum of the content (computed on first use, if not stored in the state file)
+        self.checksum: str or None = checksum
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None and self.entry is not None:
+            self._manifest = self.entry.load()
+        return self._manifest
+
+    @manifest.setter
+    def manifest(self, manifest: dict or None):
+        self._manifest = manifest
+
+    def _get_header(self) -> dict:
+        return self.entry.get_header() if self._manifest is None and self.entry is not None else self.manifest
+
+    def get_api_version(self) -> str:
+        return JSON.get("apiVersion", self._get_header())
+
+    def get_kind(self) -> str:
+        return JSON.get("kind", self._get_header())
+
+    def get_name(self) -> str:
+        return JSON.get("metadata.name", self._get_header())
+
+    def get_namespace(self) -> str or None:
+        return JSON.get("metadata.namespace", self._get_header())
+
     def get_checksum(self) -> str:
-        return to_md5(self.to_state())
\ No newline at end of file
+        if self.checksum is None:
+            self.checksum = to_checksum(self.to_state())
+        return self.checksum
+
+    def to_header(self) -> dict:
+        metadata = {"name": self.get_name()}
+        if self.get_namespace() is not None:
+            metadata["namespace"] = self.get_namespace()
+        return {
+            "apiVersion": self.get_api_version(),
+            "kind": self.get_kind(),
+            "metadata": metadata,
+        }
@@ -7,6 +7,8 @@ from lib.config.schemes.helm_release import ProjectConfigHelmRelease
 from lib.config.schemes.kubectl_manifest import ProjectConfigKubectlManifest
 from lib.helpers.filesystem import file_exists
 from lib.helpers.jsons import JSON
+from lib.state.database import ProjectStateDatabase
+from lib.state.journal import ProjectStateJournal
 from lib.state.schemes.chart import ProjectStateChart
 from lib.state.schemes.manifest import ProjectStateManifest
 from lib.state.validator import ProjectStateValidator
@@ -19,20 +21,40 @@ class ProjectState:
         self.state: dict = state
         self.arguments: Namespace = arguments
         self.config: "ProjectConfig" = config
-        ProjectStateValidator().validate(self.state)
+        # journal of the changes since the state file has been written
+        self.journal: ProjectStateJournal = ProjectStateJournal(arguments.state, cwd=arguments.project)
+        ProjectStateValidator(self._is_strict()).validate(self.state)
         self._build()
 
+    def _is_strict(self) -> bool:
+        return self.arguments.strict_state if "strict_state" in self.arguments else False
+
     def _build(self):
+        # stored checksums of the resources (the current state is not hashed again)
+        checksums = self.state.get("checksums", {})
         for path in self.state["charts"]:
-            self.state["charts"][path] = ProjectStateChart(self.state["charts"][path], config=self.config)
+            self.state["charts"][path] = ProjectStateChart(self.state["charts"][path], config=self.config, checksum=checksums.get("charts", {}).get(path))
         for path in self.state["manifests"]:
-            self.state["manifests"][path] = ProjectStateManifest(self.state["manifests"][path], config=self.config)
+            self.state["manifests"][path] = ProjectStateManifest(self.state["manifests"][path], config=self.config, checksum=checksums.get("manifests", {}).get(path))
 
     @staticmethod
-    def from_file(file: str, arguments: Namespace, config, cwd: str = None):
+    def read_file(file: str, cwd: str = None) -> dict or None:
+        if ProjectStateDatabase.is_database(file):
+            database = ProjectStateDatabase(file, cwd=cwd)
+            if database.exists():
+                state = database.read()
+            else:
+                # migrate from the json state file with the same name
+                state = JSON.from_file(database.get_json_file(), fallback={}) if file_exists(database.get_json_file()) else None
+        else:
+            state = JSON.from_file(file, cwd=cwd, fallback={}) if file_exists(file, cwd=cwd) else None
+        # apply changes of an interrupted run
+        return ProjectStateJournal.replay(state, file, cwd=cwd)
+
+    @staticmethod
+    def from_dict(state: dict or None, arguments: Namespace, config):
         try:
-            if file_exists(file, cwd=cwd):
-                state = JSON.from_file(file, cwd=cwd, fallback={})
+            if state is not None:
                 return ProjectState(state=state, arguments=arguments, config=config)
             return ProjectState.from_empty(arguments=arguments, config=config)
         except SchemaError as ex:
@@ -41,6 +63,10 @@ class ProjectState:
         except Exception as ex:
             raise ex
 
+    @staticmethod
+    def from_file(file: str, arguments: Namespace, config, cwd: str = None):
+        return ProjectState.from_dict(ProjectState.read_file(file, cwd=cwd), arguments=arguments, config=config)
+
     @staticmethod
     def from_empty(arguments: Namespace, config):
         return ProjectState({
@@ -49,12 +75,22 @@ class ProjectState:
         }, arguments=arguments, config=config)
 
     def to_file(self):
-        JSON.to_file(
-            filename=self.arguments.state,
-            obj=self.to_state(),
-            cwd=self.arguments.project,
-            indent=2
-        )
+        if ProjectStateDatabase.is_database(self.arguments.state):
+            ProjectStateDatabase(self.arguments.state, cwd=self.arguments.project).write(
+                charts={self._create_chart_key(chart): chart for chart in self.get_charts()},
+                manifests={self._create_manifest_key(manifest): manifest for manifest in self.get_manifests()},
+                sources=self._create_sources(),
+            )
+        else:
+            JSON.to_file(
+                filename=self.arguments.state,
+                obj=self.to_state(),
+                cwd=self.arguments.project,
+                indent=2,
+                atomic=True
+            )
+        # journaled changes are part of the state file now
+        self.journal.delete()
 
     def _create_key(self, *parts) -> str:
         parts_filtered = []
@@ -79,15 +115,21 @@ class ProjectState:
         key = self._create_manifest_key(manifest)
         return self.state["manifests"][key] if self.has_manifest(manifest) else None
 
-    def set_manifest(self, manifest: ProjectStateManifest or ProjectConfigKubectlManifest) -> ProjectStateManifest:
+    def set_manifest(self, manifest: ProjectStateManifest or ProjectConfigKubectlManifest, checkpoint: bool = False) -> ProjectStateManifest:
         key = self._create_manifest_key(manifest)
-        self.state["manifests"][key] = ProjectStateManifest(manifest.get_content(), config=self.config)
+        self.state["manifests"][key] = ProjectStateManifest(manifest.get_content(), config=self.config, checksum=manifest.checksum if isinstance(manifest, ProjectStateManifest) else None)
+        # record applied changes immediately
+        if checkpoint:
+            self.journal.set("manifests", key, self.state["manifests"][key].to_state(), self.state["manifests"][key].get_checksum())
         return self.get_manifest(manifest)
 
-    def remove_manifest(self, manifest: ProjectStateManifest or ProjectConfigKubectlManifest) -> bool:
+    def remove_manifest(self, manifest: ProjectStateManifest or ProjectConfigKubectlManifest, checkpoint: bool = False) -> bool:
         key = self._create_manifest_key(manifest)
         if self.has_manifest(manifest):
             del self.state["manifests"][key]
+        # record applied changes immediately
+        if checkpoint:
+            self.journal.remove("manifests", key)
         return False
 
     def has_chart(self, chart: ProjectStateChart or ProjectConfigHelmRelease) -> bool:
@@ -100,32 +142,61 @@ class ProjectState:
         key = self._create_chart_key(chart)
         return self.state["charts"][key] if self.has_chart(chart) else None
 
-    def set_chart(self, chart: ProjectStateChart or ProjectConfigHelmRelease) -> ProjectStateChart:
+    def set_chart(self, chart: ProjectStateChart or ProjectConfigHelmRelease, checkpoint: bool = False) -> ProjectStateChart:
         key = self._create_chart_key(chart)
-        self.state["charts"][key] = ProjectStateChart(data=chart.to_dict(), config=self.config)
+        self.state["charts"][key] = ProjectStateChart(data=chart.to_dict(), config=self.config, checksum=chart.checksum if isinstance(chart, ProjectStateChart) else None)
+        # record applied changes immediately
+        if checkpoint:
+            self.journal.set("charts", key, self.state["charts"][key].to_state(), self.state["charts"][key].get_checksum())
         return self.get_chart(chart)
 
-    def remove_chart(self, chart: ProjectStateChart or ProjectConfigHelmRelease) -> bool:
+    def remove_chart(self, chart: ProjectStateChart or ProjectConfigHelmRelease, checkpoint: bool = False) -> bool:
         key = self._create_chart_key(chart)
-        if self.has_manifest(chart):
+        if self.has_chart(chart):
             del self.state["charts"][key]
-            self.to_file()
+        # record applied changes immediately
+        if checkpoint:
+            self.journal.remove("charts", key)
         return False
 
     def to_dict(self) -> dict:
         return self.state
 
+    def _create_sources(self) -> dict:
+        sources = {}
+        # add sources of the manifests (only if the stored manifests are the rendered ones)
+        for name, (key, manifests) in self.config.get_sources().items():
+            manifest_keys = [self._create_manifest_key(ProjectConfigKubectlManifest(manifest, self.config)) for manifest in manifests]
+            stored_manifests = [self.state["manifests"][manifest_key].get_content() if manifest_key in self.state["manifests"] else None for manifest_key in manifest_keys]
+            if stored_manifests == manifests and JSON.parse(JSON.stringify(manifests)) == manifests:
+                sources[name] = {
+                    "key": key,
+                    "manifests": manifest_keys,
+                }
+        return sources
+
     def to_state(self) -> dict:
         # create empty state
         state = {
             "charts": {},
             "manifests": {},
+            "sources": {},
+            "checksums": {
+                "charts": {},
+                "manifests": {},
+            },
         }
         # add charts to state
         for chart in self.get_charts():
-            state["charts"][self._create_chart_key(chart)] = chart.to_state()
+            key = self._create_chart_key(chart)
+            state["charts"][key] = chart.to_state()
+            state["checksums"]["charts"][key] = chart.get_checksum()
         # add manifests to state
         for manifest in self.get_manifests():
-            state["manifests"][self._create_manifest_key(manifest)] = manifest.to_state()
+            key = self._create_manifest_key(manifest)
+            state["manifests"][key] = manifest.to_state()
+            state["checksums"]["manifests"][key] = manifest.get_checksum()
+        # add sources of the manifests to state
+        state["sources"] = self._create_sources()
         # return state
         return state
\ No newline at end of file
@@ -1,43 +1,98 @@
-from schema import Schema, SchemaError, Optional, Or
+import typing
+
+from schema import And, Schema, SchemaError, Optional, Or, Use
+
+from lib.state.database import ProjectStateDatabaseEntry
 
 
 class ProjectStateValidator:
-    def __init__(self):
+    def __init__(self, strict: bool = False):
+        # validate the whole content of the resources instead of their headers only
+        self.strict: bool = strict
         self.schema: Schema = self.__create_schema__()
 
     def __create_schema__(self) -> Schema:
         return Schema({
             Optional("charts", default={}): self.__create_charts_schema__(),
             Optional("manifests", default={}): self.__create_manifests_schema__(),
+            Optional("sources", default={}): self.__create_sources_schema__(),
+            Optional("checksums", default={}): self.__create_checksums_schema__(),
         })
 
+    @staticmethod
+    def __validate_chart_header__(chart: any) -> bool:
+        # checked without schema, which is slow on large states
+        if not isinstance(chart, dict) or not all(isinstance(chart.get(key), str) for key in ("name", "namespace", "chart")):
+            raise SchemaError("Invalid chart in state: name, namespace and chart have to be strings")
+        return True
+
+    @staticmethod
+    def __validate_manifest_header__(manifest: any) -> bool:
+        # checked without schema, which is slow on large states
+        metadata = manifest.get("metadata") if isinstance(manifest, dict) else None
+        if not isinstance(metadata, dict) or not all(isinstance(manifest.get(key), str) for key in ("apiVersion", "kind")) \
+                or not isinstance(metadata.get("name"), str) or not isinstance(metadata.get("namespace", ""), str):
+            raise SchemaError("Invalid manifest in state: apiVersion, kind, metadata.name and metadata.namespace have to be strings")
+        return True
+
+    def __create_entry_schema__(self, header: typing.Callable[[any], bool], content: Schema) -> Schema:
+        # entries of the state database are validated by their header or loaded content
+        if self.strict:
+            return Or(content, And(ProjectStateDatabaseEntry, Use(lambda entry: entry.load()), content))
+        return Use(lambda value: header(value.get_header() if isinstance(value, ProjectStateDatabaseEntry) else value))
+
     def __create_charts_schema__(self) -> Schema:
         return Schema({
-            Optional(str): Schema({
-                "name": str,
-                "namespace": str,
-                "chart": str,
-                "set": {
-                    Optional(str): Or(str, int, float, bool, dict, list)
-                },
-                "values": dict,
-            })
+            Optional(str): self.__create_entry_schema__(
+                self.__validate_chart_header__,
+                Schema({
+                    "name": str,
+                    "namespace": str,
+                    "chart": str,
+                    "set": {
+                        Optional(str): Or(str, int, float, bool, dict, list)
+                    },
+                    "values": dict,
+                    Optional("dependsOn"): [str],
+                }),
+            )
         })
 
     def __create_manifests_schema__(self) -> Schema:
+        return Schema({
+            Optional(str): self.__create_entry_schema__(
+                self.__validate_manifest_header__,
+                Schema({
+                    "apiVersion": str,
+                    "kind": str,
+                    "metadata": {
+                        "name": str,
+                        Optional("namespace"): str,
+                        Optional(str): Or(str, int, float, bool, dict, list, Schema(None)),
+                    },
+                    Optional(str): Or(str, int, float, bool, dict, list, Schema(None))
+                }),
+            )
+        })
+
+    def __create_sources_schema__(self) -> Schema:
         return Schema({
             Optional(str): Schema({
-                "apiVersion": str,
-                "kind": str,
-                "metadata": {
-                    "name": str,
-                    Optional("namespace"): str,
-                    Optional(str): Or(str, int, float, bool, dict, list, Schema(None)),
-                },
-                Optional(str): Or(str, int, float, bool, dict, list, Schema(None))
+                "key": str,
+                "manifests": [str],
             })
         })
 
+    def __create_checksums_schema__(self) -> Schema:
+        return Schema({
+            Optional("charts"): {
+                Optional(str): str
+            },
+            Optional("manifests"): {
+                Optional(str): str
+            },
+        })
+
     def validate(self, config: any) -> bool:
         try:
             self.schema.validate(config)
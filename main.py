@@ -8,9 +8,11 @@ from commands.new import CommandNew
 from commands.plan import CommandPlan
 from commands.standalone import CommandStandalone
 from commands.template import CommandTemplate
+from lib.helpers.cache import Cache
 from lib.helpers.commander import Commander, CommanderCommand, CommanderCommandForProject, CommanderCommandStandalone
-from lib.helpers.filesystem import resolve_path
+from lib.helpers.filesystem import join_path, resolve_path
 from lib.helpers.logging import Logger
+from lib.helpers.template import Template
 from lib.project import Project
 from version import VERSION
 
@@ -44,6 +46,7 @@ def create_commands(commands: typing.List[CommanderCommand]):
     args.project = resolve_path(args.project)
     args.config = resolve_path(args.config, cwd=args.project)
     args.state = resolve_path(args.state, cwd=args.project)
+    args.template_cache = resolve_path(args.template_cache, cwd=args.project) if args.template_cache else None
 
     # return arguments
     return args
@@ -69,10 +72,19 @@ def create_global_arguments(commander: Commander):
     commander.add_argument(
         "-s", "--state",
         dest="state",
-        help="Set an alternative project state file",
+        help="Set an alternative project state file (stored in a SQLite database, if it ends with .db, .sqlite or .sqlite3)",
         default=os.environ.get("KM_STATE", default="./.kubemize-state.json")
     )
 
+    # strict state validation
+    commander.add_argument(
+        "--strict-state",
+        dest="strict_state",
+        help="Validate the whole content of the state file instead of the names and types of the resources",
+        action="store_true",
+        default=os.environ.get("KM_STRICT_STATE", default=False)
+    )
+
     # set variable
     commander.add_argument(
         "--var",
@@ -100,6 +112,41 @@ def create_global_arguments(commander: Commander):
         default=os.environ.get("KM_DEBUG", default=False)
     )
 
+    # render jobs
+    commander.add_argument(
+        "-j", "--jobs",
+        dest="jobs",
+        help="Number of processes rendering manifest files concurrently",
+        type=int,
+        default=os.environ.get("KM_JOBS", default=1)
+    )
+
+    # template bytecode cache
+    commander.add_argument(
+        "--template-cache",
+        dest="template_cache",
+        help="Store compiled templates in the given directory to reuse them across runs",
+        default=os.environ.get("KM_TEMPLATE_CACHE", default=None)
+    )
+
+    # no render cache
+    commander.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        help="Do not use or update the cache of rendered manifests and values files",
+        action="store_true",
+        default=os.environ.get("KM_NO_CACHE", default=False)
+    )
+
+    # render cache size
+    commander.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        help="Maximum size of the cache of rendered manifests and values files in megabytes",
+        type=int,
+        default=os.environ.get("KM_CACHE_SIZE", default=256)
+    )
+
     # helm executable
     commander.add_argument(
         "--helm-executable",
@@ -116,6 +163,41 @@ def create_global_arguments(commander: Commander):
         default="kubectl"
     )
 
+    # shell execution
+    commander.add_argument(
+        "--shell",
+        dest="shell",
+        help="Run helm, kubectl and hook commands through the system shell, e.g. to use shell expansions in arguments",
+        action="store_true",
+        default=os.environ.get("KM_SHELL", default=False)
+    )
+
+    # temporary files
+    commander.add_argument(
+        "--temp-files",
+        dest="temp_files",
+        help="Pass manifests and values to kubectl and helm in temporary files instead of the standard input, e.g. for executables not forwarding it",
+        action="store_true",
+        default=os.environ.get("KM_TEMP_FILES", default=False)
+    )
+
+    # server-side apply
+    commander.add_argument(
+        "--server-side",
+        dest="server_side",
+        help="Apply and delete manifests with requests to the Kubernetes API through a single kubectl proxy instead of running kubectl for each manifest",
+        action="store_true",
+        default=os.environ.get("KM_SERVER_SIDE", default=False)
+    )
+
+    # api url
+    commander.add_argument(
+        "--api-url",
+        dest="api_url",
+        help="Set the URL of a running kubectl proxy to use with --server-side instead of starting one",
+        default=os.environ.get("KM_API_URL", default=None)
+    )
+
     # kubeconfig
     commander.add_argument(
         "--kube-config",
@@ -160,6 +242,10 @@ def main():
         # configure logger
         Logger.debug_enabled = arguments.debug
 
+        # configure templates
+        Template.bytecode_cache_dir = arguments.template_cache
+        Template.render_cache = None if arguments.no_cache else Cache(join_path(arguments.project, ".kubemize", "cache", "render"), int(arguments.cache_size) * 1024 * 1024)
+
         # run command
         for command in commands:
             if command.name == arguments.command:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# import the modules from the project root like main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
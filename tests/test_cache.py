@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+from lib.helpers.cache import Cache
+from lib.helpers.template import Template
+
+
+@pytest.fixture
+def render_cache(tmp_path):
+    cache = Cache(str(tmp_path / "cache"), 1024 * 1024)
+    previous = Template.render_cache
+    Template.render_cache = cache
+    yield cache
+    Template.render_cache = previous
+
+
+def test_entries_are_stored_as_json(tmp_path):
+    cache = Cache(str(tmp_path / "cache"), 1024 * 1024)
+    cache.set("entry", {"a": [1, None]})
+    assert cache.get("entry") == ({"a": [1, None]},)
+    assert cache.get("missing") is None
+    with open(tmp_path / "cache" / "entry.json") as f:
+        assert json.load(f) == {"name": "entry", "value": {"a": [1, None]}}
+    with open(tmp_path / "cache" / ".gitignore") as f:
+        assert f.read() == "*\n"
+
+
+def test_invalid_entries_are_ignored(tmp_path):
+    cache = Cache(str(tmp_path / "cache"), 1024 * 1024)
+    cache.set("entry", object())
+    assert cache.get("entry") is None
+    # entries of another name or content which is no json are never used
+    os.makedirs(tmp_path / "cache", exist_ok=True)
+    (tmp_path / "cache" / "other.json").write_text(json.dumps({"name": "entry", "value": 1}))
+    (tmp_path / "cache" / "broken.json").write_bytes(b"\x80\x04\x95")
+    assert cache.get("other") is None
+    assert cache.get("broken") is None
+
+
+def test_prune_keeps_gitignore(tmp_path):
+    cache = Cache(str(tmp_path / "cache"), 0)
+    cache.set("entry", "value")
+    cache.prune()
+    assert os.listdir(tmp_path / "cache") == [".gitignore"]
+
+
+def test_rendered_files_are_reused(tmp_path, render_cache):
+    file = tmp_path / "manifest.yaml"
+    file.write_text("kind: ConfigMap\ndata:\n  value: '{{ vars.value }}'\n")
+    first = Template.render_and_parse_all_yaml(str(file), {"vars": {"value": "a"}})
+    # cached entry holds the rendered content
+    key = Template.create_file_key(str(file), {"vars": {"value": "a"}})
+    assert render_cache.get(key) == ("kind: ConfigMap\ndata:\n  value: 'a'",)
+    # cached content is parsed again, changed variables are rendered again
+    Template._references = None
+    assert Template.render_and_parse_all_yaml(str(file), {"vars": {"value": "a"}}) == first
+    assert Template.render_and_parse_all_yaml(str(file), {"vars": {"value": "b"}}) == [{"kind": "ConfigMap", "data": {"value": "b"}}]
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+
+import pytest
+
+from lib.helpers.command_builder import CommandBuilder
+
+
+def _create_builder(shell: bool = False) -> CommandBuilder:
+    builder = CommandBuilder("helm", shell=shell).add_command("upgrade", "my release")
+    builder.add_argument("--version", "")
+    builder.add_argument("--install", True)
+    builder.add_argument("--atomic", False)
+    builder.add_argument("--description", "say \"hi\" to 'all'")
+    builder.add_argument("--set", "a=b c", True)
+    builder.add_argument("--set", "d=", True)
+    return builder
+
+
+def test_to_argv():
+    # empty values keep their argument, only true values are bare flags
+    assert _create_builder().to_argv() == [
+        "helm", "upgrade", "my release",
+        "--version=",
+        "--install",
+        "--atomic=false",
+        "--description=say \"hi\" to 'all'",
+        "--set=a=b c",
+        "--set=d=",
+    ]
+
+
+def test_to_string():
+    assert _create_builder().to_string() == "helm upgrade 'my release' --version= --install --atomic=false '--description=say \"hi\" to '\"'\"'all'\"'\"'' '--set=a=b c' --set=d="
+    # shell commands quote string values like before
+    assert _create_builder(shell=True).to_string() == "helm upgrade 'my release' --version=\"\" --install --atomic=false --description=\"say \"hi\" to 'all'\" --set=\"a=b c\" --set=\"d=\""
+
+
+def _create_python_builder(code: str) -> CommandBuilder:
+    return CommandBuilder(sys.executable).add_command("-c", code)
+
+
+def test_execute_interleaves_output():
+    # lines of both streams are forwarded in the order they are written
+    code = "\n".join([
+        "import sys, time",
+        "for index in range(4):",
+        "    stream = sys.stdout if index % 2 == 0 else sys.stderr",
+        "    stream.write('line {0}\\n'.format(index))",
+        "    stream.flush()",
+        "    time.sleep(0.1)",
+    ])
+    events = list(_create_python_builder(code).execute(timeout=20))
+    assert events[0]["type"] == "command"
+    assert events[1:] == [
+        {"type": "data", "data": "line 0"},
+        {"type": "error", "data": "line 1"},
+        {"type": "data", "data": "line 2"},
+        {"type": "error", "data": "line 3"},
+        {"type": "code", "data": 0},
+    ]
+
+
+def test_execute_drains_both_streams():
+    # more error output than fits into the pipe, before the first line of the output
+    code = "import sys; sys.stderr.write('error\\n' * 50000); sys.stderr.flush(); print('done')"
+    events = list(_create_python_builder(code).execute(timeout=20))
+    assert len([event for event in events if event["type"] == "error"]) == 50000
+    assert [event for event in events if event["type"] == "data"] == [{"type": "data", "data": "done"}]
+    assert events[-1] == {"type": "code", "data": 0}
+
+
+def test_execute_passes_input():
+    builder = _create_python_builder("import sys; data = sys.stdin.read(); print(len(data)); print(data.splitlines()[-1])")
+    content = "".join("line {0}\n".format(index) for index in range(100000))
+    events = list(builder.execute(input=content))
+    assert events[1:] == [
+        {"type": "data", "data": str(len(content))},
+        {"type": "data", "data": "line 99999"},
+        {"type": "code", "data": 0},
+    ]
+
+
+def test_execute_kills_process_after_timeout():
+    start = time.monotonic()
+    events = list(_create_python_builder("import time; print('started', flush=True); time.sleep(30)").execute(timeout=1))
+    assert time.monotonic() - start < 10
+    assert events[1:-1] == [
+        {"type": "data", "data": "started"},
+        {"type": "error", "data": "Command timed out after 1 seconds."},
+    ]
+    assert events[-1]["type"] == "code" and events[-1]["data"] != 0
+
+
+def test_execute_kills_process_when_closed():
+    # the child writes its pid and keeps running until it is killed
+    events = _create_python_builder("import os, time; print(os.getpid(), flush=True); time.sleep(30)").execute()
+    assert next(events)["type"] == "command"
+    pid = int(next(events)["data"])
+    events.close()
+    with pytest.raises(ChildProcessError):
+        # the process has been reaped, so it is no child of this process anymore
+        os.waitpid(pid, os.WNOHANG)
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
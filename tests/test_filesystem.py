@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from lib.helpers import filesystem
+from lib.helpers.filesystem import PathIndex, resolve_dirs, resolve_files, resolve_paths, write_file
+
+
+@pytest.fixture
+def project(tmp_path) -> str:
+    # project with nested, hidden, linked and upper case files and directories
+    for path in (
+        "kubemize.yaml", ".kubemize.yml", "values.yml", "README.md",
+        "manifests/deployment.yaml", "manifests/Service.YAML", "manifests/.hidden.yaml", "manifests/nested/job.yaml",
+        "manifests/skip/ignored.yaml", "charts/web/kubemize.yaml", "charts/web/values.yaml", "charts/db/values.yml",
+        ".config/secret.yaml", "../other/shared.yaml",
+    ):
+        write_file(str(tmp_path / "project" / path), "")
+    os.symlink(str(tmp_path / "project" / "charts" / "web"), str(tmp_path / "project" / "linked"))
+    return str(tmp_path / "project")
+
+
+@pytest.mark.parametrize("patterns", [
+    "kubemize.yaml",
+    "./manifests/*.yaml",
+    "manifests/**/*.yaml",
+    "**/*.yaml",
+    "**",
+    "**/*.{yaml,yml}",
+    "*.yml",
+    "**/KUBEMIZE.YAML",
+    "charts/*",
+    "charts/*/",
+    "../other/*.yaml",
+    "missing/*.yaml",
+    ["**/*.yaml", "!manifests/skip/**"],
+    ["manifests/*.yaml", "charts/**/values.*", "!**/db/**"],
+])
+def test_index_matches_glob(project, patterns):
+    index = PathIndex()
+    expected = resolve_paths(patterns, cwd=project)
+    assert resolve_paths(patterns, cwd=project, index=index) == expected
+    assert resolve_files(patterns, cwd=project, index=index) == resolve_files(patterns, cwd=project)
+    assert resolve_dirs(patterns, cwd=project, index=index) == resolve_dirs(patterns, cwd=project)
+    # resolved paths are cached by the index, but returned as new lists
+    resolved = resolve_paths(patterns, cwd=project, index=index)
+    resolved.append("changed")
+    assert resolve_paths(patterns, cwd=project, index=index) == expected
+
+
+def test_index_absolute_patterns(project):
+    pattern = "{0}/manifests/**/*.yaml".format(filesystem.resolve_path(project))
+    assert resolve_paths(pattern, cwd=os.path.dirname(project), index=PathIndex()) == resolve_paths(pattern, cwd=os.path.dirname(project))
+
+
+def test_index_reads_directories_once(project, monkeypatch):
+    index = PathIndex()
+    scanned = []
+    scan_dir = PathIndex.scan_dir
+    monkeypatch.setattr(PathIndex, "scan_dir", lambda self, path: scanned.append(path) or scan_dir(self, path))
+    resolve_paths("**/*.yaml", cwd=project, index=index)
+    resolve_paths("**/*.yml", cwd=project, index=index)
+    assert len(scanned) > len(set(scanned))
+    assert len(index.dir_entries) == len(set(scanned))
+
+
+def test_unsupported_wcmatch_falls_back_to_glob(project, monkeypatch):
+    monkeypatch.setattr(filesystem, "_scanned_glob_supported", False)
+    index = PathIndex()
+    assert resolve_paths("**/*.yaml", cwd=project, index=index) == resolve_paths("**/*.yaml", cwd=project)
+    assert index.dir_entries == {}
@@ -0,0 +1,189 @@
+import json
+import threading
+import typing
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lib.config.schemes.kubectl_arguments import ProjectConfigKubectlArguments
+from lib.helpers.kube_api import KubeApi
+from lib.state.schemes.manifest import ProjectStateManifest
+
+_RESOURCES = {
+    "/api/v1": [
+        {"name": "namespaces", "kind": "Namespace", "namespaced": False},
+        {"name": "configmaps", "kind": "ConfigMap", "namespaced": True},
+    ],
+    "/apis/apps/v1": [
+        {"name": "deployments", "kind": "Deployment", "namespaced": True},
+        {"name": "deployments/status", "kind": "Deployment", "namespaced": True},
+    ],
+}
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format: str, *args):
+        pass
+
+    def _send(self, status: int, content: dict):
+        data = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _record(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        request = {
+            "method": self.command,
+            "path": self.path,
+            "content_type": self.headers.get("Content-Type"),
+            "body": json.loads(self.rfile.read(length)) if length else None,
+        }
+        self.server.requests.append(request)
+        return request
+
+    def do_GET(self):
+        self._record()
+        if self.path in _RESOURCES:
+            self._send(200, {"kind": "APIResourceList", "resources": _RESOURCES[self.path]})
+        else:
+            self._send(404, {"kind": "Status", "reason": "NotFound", "message": "the server could not find the requested resource"})
+
+    def do_PATCH(self):
+        request = self._record()
+        name = request["body"]["metadata"]["name"]
+        if name.startswith("invalid"):
+            self._send(422, {"kind": "Status", "reason": "Invalid", "message": "{0} is invalid".format(name)})
+            return
+        self._send(200 if self.path.split("?")[0] in self.server.objects else 201, request["body"])
+        self.server.objects.add(self.path.split("?")[0])
+
+    def do_DELETE(self):
+        self._record()
+        path = self.path.split("?")[0]
+        if path not in self.server.objects:
+            self._send(404, {"kind": "Status", "reason": "NotFound", "message": "{0} not found".format(path.rsplit("/", 1)[-1])})
+            return
+        self.server.objects.remove(path)
+        self._send(200, {"kind": "Status", "status": "Success"})
+
+
+class _Config:
+    def __init__(self, ignore_not_found: bool = False):
+        self.arguments: Namespace = Namespace(ignore_not_found=ignore_not_found)
+
+    def ignore_not_found(self) -> bool:
+        return self.arguments.ignore_not_found
+
+    def get_kubectl_arguments(self) -> ProjectConfigKubectlArguments:
+        # default namespace is taken from the global arguments instead of the kubectl context
+        return ProjectConfigKubectlArguments({"global": {"namespace": "team"}}, self)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ApiHandler)
+    server.requests = []
+    server.objects = set()
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api(server):
+    api = KubeApi(url="http://127.0.0.1:{0}".format(server.server_address[1]))
+    yield api
+    api.close()
+
+
+def _manifest(kind: str, name: str, namespace: str = None, api_version: str = "v1", config: _Config = None) -> ProjectStateManifest:
+    metadata = {"name": name}
+    if namespace is not None:
+        metadata["namespace"] = namespace
+    return ProjectStateManifest({"apiVersion": api_version, "kind": kind, "metadata": metadata}, config or _Config())
+
+
+def _changes(server) -> typing.List[typing.Tuple[str, str]]:
+    return [(request["method"], request["path"]) for request in server.requests if request["method"] != "GET"]
+
+
+def test_apply(server, api):
+    events = list(api.apply(_manifest("ConfigMap", "settings")))
+    assert events == [
+        {"type": "command", "data": "PATCH /api/v1/namespaces/team/configmaps/settings?fieldManager=kubemize&force=true"},
+        {"type": "data", "data": "configmap/settings serverside-applied"},
+        {"type": "code", "data": 0},
+    ]
+    # objects without namespace are applied into the default namespace
+    request = server.requests[-1]
+    assert request["content_type"] == "application/apply-patch+yaml"
+    assert request["body"] == {"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": "settings", "namespace": "team"}}
+
+    events = list(api.apply(_manifest("Namespace", "team")))
+    assert events[0] == {"type": "command", "data": "PATCH /api/v1/namespaces/team?fieldManager=kubemize&force=true"}
+    assert events[-1] == {"type": "code", "data": 0}
+    assert server.requests[-1]["body"]["metadata"] == {"name": "team"}
+
+
+def test_apply_all(server, api):
+    manifests = [
+        _manifest("Deployment", "web", "apps", api_version="apps/v1"),
+        _manifest("Deployment", "worker", "apps", api_version="apps/v1"),
+        _manifest("ConfigMap", "invalid-settings", "apps"),
+    ]
+    events = list(api.apply_all(manifests))
+    assert [event for event in events if event["type"] != "command"] == [
+        {"type": "data", "data": "deployment.apps/web"},
+        {"type": "data", "data": "deployment.apps/worker"},
+        {"type": "error", "data": "Error from server (Invalid): invalid-settings is invalid"},
+        {"type": "code", "data": 1},
+    ]
+    assert _changes(server) == [
+        ("PATCH", "/apis/apps/v1/namespaces/apps/deployments/web?fieldManager=kubemize&force=true"),
+        ("PATCH", "/apis/apps/v1/namespaces/apps/deployments/worker?fieldManager=kubemize&force=true"),
+        ("PATCH", "/api/v1/namespaces/apps/configmaps/invalid-settings?fieldManager=kubemize&force=true"),
+    ]
+    # resources are discovered once per api version and all requests share one connection
+    assert [request["path"] for request in server.requests if request["method"] == "GET"] == ["/apis/apps/v1", "/api/v1"]
+    assert server.connections == 1
+
+
+def test_delete(server, api):
+    list(api.apply(_manifest("ConfigMap", "settings", "apps")))
+    events = list(api.delete(_manifest("ConfigMap", "settings", "apps")))
+    assert events == [
+        {"type": "command", "data": "DELETE /api/v1/namespaces/apps/configmaps/settings?propagationPolicy=Background"},
+        {"type": "data", "data": "configmap/settings deleted"},
+        {"type": "code", "data": 0},
+    ]
+    assert _changes(server)[-1] == ("DELETE", "/api/v1/namespaces/apps/configmaps/settings?propagationPolicy=Background")
+    assert server.objects == set()
+
+
+def test_delete_not_found(server, api):
+    events = list(api.delete(_manifest("ConfigMap", "missing", "apps")))
+    assert events[1:] == [
+        {"type": "error", "data": "Error from server (NotFound): missing not found"},
+        {"type": "code", "data": 1},
+    ]
+    # missing objects are skipped with ignore-not-found
+    events = list(api.delete(_manifest("ConfigMap", "missing", "apps", config=_Config(ignore_not_found=True))))
+    assert events[1:] == [{"type": "code", "data": 0}]
+    assert _changes(server) == [
+        ("DELETE", "/api/v1/namespaces/apps/configmaps/missing?propagationPolicy=Background"),
+        ("DELETE", "/api/v1/namespaces/apps/configmaps/missing?propagationPolicy=Background"),
+    ]
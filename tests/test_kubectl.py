@@ -0,0 +1,128 @@
+import json
+import os
+import stat
+import sys
+import typing
+from argparse import Namespace
+
+import pytest
+
+from lib.config.config import ProjectConfig
+from lib.config.schemes.helm_arguments import ProjectConfigHelmArguments
+from lib.config.schemes.kubectl_arguments import ProjectConfigKubectlArguments
+from lib.helpers.helm import Helm
+from lib.helpers.kubectl import Kubectl
+from lib.helpers.yamls import YAML
+from lib.state.schemes.chart import ProjectStateChart
+from lib.state.schemes.manifest import ProjectStateManifest
+
+# executable recording its arguments and the content of the file passed with -f (read from stdin for "-")
+_RECORDER = """
+import json, os, sys
+arguments = sys.argv[1:]
+file = next(argument[3:] for argument in arguments if argument.startswith("-f="))
+content = sys.stdin.read() if file == "-" else open(file).read()
+with open(os.environ["KM_TEST_RECORDS"], "a") as f:
+    f.write(json.dumps({"arguments": arguments, "file": file, "content": content}) + "\\n")
+"""
+
+
+class _Config:
+    def __init__(self, output: str):
+        self.arguments: Namespace = Namespace(output=output, ignore_not_found=True)
+
+    def get_output_dir(self) -> str:
+        return self.arguments.output
+
+    def ignore_not_found(self) -> bool:
+        return self.arguments.ignore_not_found
+
+    def get_kubectl(self) -> dict:
+        return {"arguments": {"global": {"context": "dev"}, "apply": {"server-side": True}, "destroy": {"wait": False}}}
+
+    def get_helm(self) -> dict:
+        return {"arguments": {"global": {"kube-context": "dev"}, "apply": {"atomic": True}}}
+
+    def get_kubectl_arguments(self) -> ProjectConfigKubectlArguments:
+        return ProjectConfig.get_kubectl_arguments(self)
+
+    def get_helm_arguments(self, release: dict = None) -> ProjectConfigHelmArguments:
+        return ProjectConfig.get_helm_arguments(self, release)
+
+
+@pytest.fixture
+def executable(tmp_path, monkeypatch) -> str:
+    path = tmp_path / "recorder"
+    path.write_text("#!{0}\n{1}".format(sys.executable, _RECORDER))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("KM_TEST_RECORDS", str(tmp_path / "records"))
+    return str(path)
+
+
+@pytest.fixture
+def config(tmp_path) -> _Config:
+    return _Config(str(tmp_path / "output"))
+
+
+def _read_records(tmp_path) -> typing.List[dict]:
+    with open(tmp_path / "records") as f:
+        records = [json.loads(line) for line in f]
+    os.remove(tmp_path / "records")
+    return records
+
+
+def _run(events: typing.Iterator[dict]) -> int:
+    return [event for event in events if event["type"] == "code"][0]["data"]
+
+
+def _manifest(config: _Config, name: str) -> ProjectStateManifest:
+    return ProjectStateManifest({"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": name, "namespace": "apps"}, "data": {"text": "a\nb", "quoted": "yes"}}, config)
+
+
+def _compare_modes(tmp_path, run: typing.Callable[[bool], int]) -> typing.Tuple[dict, dict]:
+    # run the same command through stdin and with temporary files
+    assert run(False) == 0
+    stdin_record = _read_records(tmp_path)[0]
+    assert run(True) == 0
+    file_record = _read_records(tmp_path)[0]
+    assert stdin_record["file"] == "-"
+    assert file_record["content"] == stdin_record["content"]
+    # temporary files are removed after the command
+    assert not os.path.exists(file_record["file"])
+    return stdin_record, file_record
+
+
+def test_kubectl_apply(tmp_path, executable, config):
+    manifest = _manifest(config, "settings")
+    stdin_record, file_record = _compare_modes(tmp_path, lambda temp_files: _run(Kubectl(executable, temp_files=temp_files).apply(manifest)))
+    # temporary files are written into the output directory like before passing manifests through stdin
+    assert file_record["arguments"] == ["apply", "--context=dev", "--server-side", "-f={0}/manifests/ConfigMap/apps_settings".format(config.get_output_dir())]
+    assert stdin_record["arguments"] == ["apply", "--context=dev", "--server-side", "-f=-"]
+    assert YAML.parse(stdin_record["content"]) == manifest.get_content()
+
+
+def test_kubectl_apply_all(tmp_path, executable, config):
+    manifests = [_manifest(config, "first"), _manifest(config, "second")]
+    stdin_record, file_record = _compare_modes(tmp_path, lambda temp_files: _run(Kubectl(executable, temp_files=temp_files).apply_all(manifests)))
+    assert stdin_record["arguments"] == ["apply", "--context=dev", "--server-side", "-f=-", "-o=name"]
+    assert file_record["arguments"] == ["apply", "--context=dev", "--server-side", "-f={0}".format(file_record["file"]), "-o=name"]
+    assert file_record["file"].startswith("{0}/manifests/batch-".format(config.get_output_dir()))
+    assert list(YAML.parse_all(stdin_record["content"])) == [manifest.get_content() for manifest in manifests]
+
+
+def test_kubectl_delete(tmp_path, executable, config):
+    manifest = _manifest(config, "settings")
+    stdin_record, file_record = _compare_modes(tmp_path, lambda temp_files: _run(Kubectl(executable, temp_files=temp_files).delete(manifest)))
+    assert file_record["arguments"] == ["delete", "--ignore-not-found", "--context=dev", "--wait=false", "-f={0}/manifests/ConfigMap/apps_settings".format(config.get_output_dir())]
+    assert stdin_record["arguments"] == file_record["arguments"][:-1] + ["-f=-"]
+
+
+def test_helm_apply(tmp_path, executable, config):
+    release = ProjectStateChart({"name": "web", "namespace": "apps", "chart": "example/web", "version": "1.0.0", "values": {"image": {"tag": "1.0"}, "text": "a\nb"}}, config)
+    stdin_record, file_record = _compare_modes(tmp_path, lambda temp_files: _run(Helm(executable, temp_files=temp_files).apply(release)))
+    assert file_record["arguments"] == [
+        "upgrade", "web", "example/web", "--version=1.0.0", "--install", "--namespace=apps", "--create-namespace",
+        "--kube-context=dev", "--atomic", "--pass-credentials=false", "-f={0}/chart-values/apps/web".format(config.get_output_dir()),
+    ]
+    assert stdin_record["arguments"] == file_record["arguments"][:-1] + ["-f=-"]
+    assert YAML.parse(stdin_record["content"]) == release.get_values()
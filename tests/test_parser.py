@@ -0,0 +1,121 @@
+import typing
+from argparse import Namespace
+
+import pytest
+
+from lib.config.parser.parser import ProjectConfigParser
+from lib.helpers.filesystem import join_path, write_file
+from lib.helpers.template import TemplateSyntaxException, TemplateUndefinedException
+from lib.helpers.yamls import YAML
+
+
+def _create_project(directory: str, files: int = 12) -> typing.List[str]:
+    # project with manifest files of several documents, rendered with the variables
+    YAML.to_file(join_path(directory, "kubemize.yaml"), {"kubectl": {"manifests": ["manifests/*.yaml"]}, "variables": {"env": "prod"}})
+    names = []
+    for file in range(files):
+        documents = []
+        for document in range(3):
+            name = "c{0:02d}-{1}".format(file, document)
+            documents.append("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: {0}\ndata:\n  env: \"{{{{ vars.env }}}}\"\n".format(name))
+            names.append(name)
+        write_file(join_path(directory, "manifests", "m{0:02d}.yaml".format(file)), "---\n".join(documents))
+    return names
+
+
+def _parse(directory: str, jobs: int) -> typing.List[dict]:
+    arguments = Namespace(jobs=jobs, variables=[])
+    return ProjectConfigParser(directory, "kubemize.yaml", arguments).parse()["kubectl"]["manifests"]
+
+
+@pytest.mark.parametrize("jobs", [2, 4])
+def test_jobs_keep_order(tmp_path, jobs):
+    names = _create_project(str(tmp_path))
+    manifests = _parse(str(tmp_path), 1)
+    # files are taken in the order of the glob, documents in the order of the file
+    assert sorted(manifest["metadata"]["name"] for manifest in manifests) == names
+    assert manifests[0]["data"] == {"env": "prod"}
+    assert _parse(str(tmp_path), jobs) == manifests
+
+
+@pytest.mark.parametrize("content, exception", [
+    ("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: \"{{ vars.env \"\n", TemplateSyntaxException),
+    ("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: \"{{ vars.missing }}\"\n", TemplateUndefinedException),
+])
+def test_jobs_report_failing_file(tmp_path, content, exception):
+    _create_project(str(tmp_path))
+    write_file(join_path(str(tmp_path), "manifests", "m07.yaml"), content)
+    write_file(join_path(str(tmp_path), "manifests", "m09.yaml"), content)
+    messages = []
+    for jobs in (1, 3):
+        with pytest.raises(exception) as info:
+            _parse(str(tmp_path), jobs)
+        messages.append(str(info.value))
+    # the first failing file in the order of the files is reported, like without worker processes
+    assert messages[0] == messages[1]
+    assert ("m07.yaml" in messages[0]) != ("m09.yaml" in messages[0])
+
+
+def _create_state(parser: ProjectConfigParser, marker: str) -> dict:
+    # state with the sources of the previous parse, whose manifests are marked to detect reuse
+    state = {"manifests": {}, "sources": {}}
+    for name, (key, manifests) in parser.sources.items():
+        state["sources"][name] = {"key": key, "manifests": []}
+        for manifest in manifests:
+            manifest_key = "configmap/{0}".format(manifest["metadata"]["name"])
+            state["manifests"][manifest_key] = dict(manifest, data=dict(manifest["data"], marker=marker))
+            state["sources"][name]["manifests"].append(manifest_key)
+    return state
+
+
+def _parse_with_state(directory: str, state: dict, variables: typing.List[str] = None) -> typing.Tuple[ProjectConfigParser, typing.List[dict]]:
+    parser = ProjectConfigParser(directory, "kubemize.yaml", Namespace(jobs=1, variables=variables or []), state=state)
+    return parser, parser.parse()["kubectl"]["manifests"]
+
+
+def test_sources_reused_if_unchanged(tmp_path):
+    _create_project(str(tmp_path), files=2)
+    parser, manifests = _parse_with_state(str(tmp_path), {})
+    state = _create_state(parser, "reused")
+    parser, reused = _parse_with_state(str(tmp_path), state)
+    assert [manifest["data"] for manifest in reused] == [{"env": "prod", "marker": "reused"}] * 6
+    # reused manifests are copies, so the state is not changed by later steps
+    reused[0]["data"]["env"] = "changed"
+    assert all(manifest["data"]["env"] == "prod" for manifest in state["manifests"].values())
+    # the sources are kept for the next state
+    assert sorted(parser.sources) == sorted(state["sources"])
+
+
+def test_sources_rendered_if_referenced_variable_changed(tmp_path):
+    _create_project(str(tmp_path), files=2)
+    parser, _ = _parse_with_state(str(tmp_path), {})
+    state = _create_state(parser, "reused")
+    # variables which are not referenced by the files do not change the key
+    _, manifests = _parse_with_state(str(tmp_path), state, variables=["unused=1"])
+    assert all(manifest["data"].get("marker") == "reused" for manifest in manifests)
+    _, manifests = _parse_with_state(str(tmp_path), state, variables=["env=dev"])
+    assert [manifest["data"] for manifest in manifests] == [{"env": "dev"}] * 6
+
+
+def test_sources_rendered_if_file_changed(tmp_path):
+    _create_project(str(tmp_path), files=2)
+    parser, _ = _parse_with_state(str(tmp_path), {})
+    state = _create_state(parser, "reused")
+    write_file(join_path(str(tmp_path), "manifests", "m01.yaml"), "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: changed\ndata:\n  env: \"{{ vars.env }}\"\n")
+    _, manifests = _parse_with_state(str(tmp_path), state)
+    assert sorted((manifest["metadata"]["name"], manifest["data"].get("marker")) for manifest in manifests) == [
+        ("c00-0", "reused"), ("c00-1", "reused"), ("c00-2", "reused"), ("changed", None),
+    ]
+
+
+def test_sources_not_reused_with_volatile_filter(tmp_path):
+    _create_project(str(tmp_path), files=2)
+    write_file(join_path(str(tmp_path), "manifests", "m01.yaml"), "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: random\ndata:\n  env: \"{{ vars.env }}\"\n  id: \"{{ [1, 2, 3] | random }}\"\n")
+    parser, _ = _parse_with_state(str(tmp_path), {})
+    # files using filters with results depending on more than the variables have no key
+    assert [name.split("/")[-1] for name in parser.sources] == ["m00.yaml"]
+    state = _create_state(parser, "reused")
+    _, manifests = _parse_with_state(str(tmp_path), state)
+    assert sorted((manifest["metadata"]["name"], manifest["data"].get("marker")) for manifest in manifests) == [
+        ("c00-0", "reused"), ("c00-1", "reused"), ("c00-2", "reused"), ("random", None),
+    ]
@@ -0,0 +1,115 @@
+import typing
+from argparse import Namespace
+
+import pytest
+
+from lib.config.schemes.helm_release import ProjectConfigHelmRelease
+from lib.plan.plan import ProjectPlan
+from lib.state.schemes.chart import ProjectStateChart
+
+
+class _Config:
+    def __init__(self):
+        self.arguments: Namespace = Namespace()
+
+
+class _State:
+    def __init__(self, charts: typing.List[ProjectConfigHelmRelease]):
+        self.charts: typing.List[ProjectConfigHelmRelease] = charts
+
+    def get_charts(self) -> typing.List[ProjectConfigHelmRelease]:
+        return self.charts
+
+    def has_chart(self, chart: ProjectConfigHelmRelease) -> bool:
+        return any(item.get_identifier() == chart.get_identifier() for item in self.charts)
+
+    def get_chart(self, chart: ProjectConfigHelmRelease) -> ProjectConfigHelmRelease:
+        return [item for item in self.charts if item.get_identifier() == chart.get_identifier()][0]
+
+
+def _create_plan(*releases: dict) -> ProjectPlan:
+    config = _Config()
+    charts = [ProjectConfigHelmRelease(dict(release, chart="example/chart"), config) for release in releases]
+    return ProjectPlan(config=config, state_current=_State([]), state_new=_State(charts))
+
+
+def test_dependencies_by_namespace_and_name():
+    plan = _create_plan(
+        {"name": "db", "namespace": "a"},
+        {"name": "db", "namespace": "b"},
+        {"name": "app", "namespace": "a", "dependsOn": ["a/db"]},
+    )
+    assert plan.get_chart_dependencies(plan.get_changed_charts()) == {"a/db": [], "b/db": [], "a/app": ["a/db"]}
+    assert plan.get_chart_dependencies(plan.get_changed_charts(), reverse=True) == {"a/db": ["a/app"], "b/db": [], "a/app": []}
+
+def test_dependencies_by_unique_name():
+    plan = _create_plan(
+        {"name": "db", "namespace": "a"},
+        {"name": "app", "namespace": "b", "dependsOn": ["DB"]},
+    )
+    assert plan.get_chart_dependencies(plan.get_changed_charts()) == {"a/db": [], "b/app": ["a/db"]}
+
+def test_dependencies_by_ambiguous_name():
+    plan = _create_plan(
+        {"name": "db", "namespace": "a"},
+        {"name": "db", "namespace": "b"},
+        {"name": "app", "namespace": "a", "dependsOn": ["db"]},
+    )
+    with pytest.raises(Exception, match="'a/app' depends on 'db', which matches the releases 'a/db', 'b/db'"):
+        plan.get_changed_charts()
+
+def test_unresolved_dependencies():
+    plan = _create_plan(
+        {"name": "db", "namespace": "a"},
+        {"name": "app", "namespace": "a", "dependsOn": ["a/dbb"]},
+    )
+    with pytest.raises(Exception, match="'a/app' depends on 'a/dbb', which is no release of the project"):
+        plan.count_processable_charts()
+
+def test_dependencies_outside_of_the_charts_are_skipped():
+    plan = _create_plan(
+        {"name": "db", "namespace": "a"},
+        {"name": "app", "namespace": "a", "dependsOn": ["a/db"]},
+    )
+    app = [item for item in plan.get_changed_charts() if item.get_chart().get_name() == "app"]
+    assert plan.get_chart_dependencies(app) == {"a/app": []}
+
+def _create_state_charts(config: _Config, *releases: dict) -> typing.List[ProjectStateChart]:
+    # charts of the current state, as written by a previous run
+    return [ProjectStateChart(ProjectConfigHelmRelease(dict(release, chart="example/chart"), config).to_state(), config) for release in releases]
+
+def test_dependencies_of_removed_charts_from_state():
+    config = _Config()
+    state_current = _State(_create_state_charts(
+        config,
+        {"name": "db", "namespace": "a"},
+        {"name": "app", "namespace": "a", "dependsOn": ["db"]},
+        {"name": "web", "namespace": "b", "dependsOn": ["a/app", "a/db"]},
+    ))
+    plan = ProjectPlan(config=config, state_current=state_current, state_new=_State([]))
+    # removed charts are uninstalled after the charts depending on them
+    assert plan.get_chart_dependencies(plan.get_removed_charts(), reverse=True) == {"b/web": [], "a/app": ["b/web"], "a/db": ["b/web", "a/app"]}
+
+def test_dependencies_of_removed_charts_on_kept_charts():
+    config = _Config()
+    state_current = _State(_create_state_charts(
+        config,
+        {"name": "db", "namespace": "a"},
+        {"name": "app", "namespace": "a", "dependsOn": ["a/db", "a/cache", "queue"]},
+    ))
+    state_new = _State([ProjectStateChart({"name": "db", "namespace": "a", "chart": "example/chart"}, config)])
+    plan = ProjectPlan(config=config, state_current=state_current, state_new=state_new)
+    # dependencies on charts which do not exist anymore are skipped instead of failing the plan
+    assert [item.get_action() for item in plan.get_charts()] == ["nothing", "delete"]
+    assert plan.get_chart_dependencies(plan.get_charts()) == {"a/db": [], "a/app": ["a/db"]}
+
+def test_dependencies_in_chart_state():
+    config = _Config()
+    release = ProjectConfigHelmRelease({"name": "app", "namespace": "a", "chart": "example/chart", "dependsOn": ["a/db"]}, config)
+    chart = ProjectStateChart(release.to_state(), config)
+    assert chart.get_depends_on() == ["a/db"]
+    assert chart.to_header() == {"name": "app", "namespace": "a", "chart": "example/chart", "dependsOn": ["a/db"]}
+    # charts without dependencies keep the state and checksum of previous versions
+    release = ProjectConfigHelmRelease({"name": "db", "namespace": "a", "chart": "example/chart"}, config)
+    assert "dependsOn" not in release.to_state()
+    assert ProjectStateChart(release.to_state(), config).to_header() == {"name": "db", "namespace": "a", "chart": "example/chart"}
@@ -0,0 +1,95 @@
+import random
+import typing
+from argparse import Namespace
+
+from lib.config.config import ProjectConfig
+from lib.plan.plan import ProjectPlan
+from lib.plan.schemes.manifest import ProjectPlanManifest
+from lib.state.schemes.manifest import ProjectStateManifest
+
+
+class _Config:
+    # configuration with only the kubectl order (defaults are added like in ProjectConfig)
+    def __init__(self, order: typing.List[str]):
+        self.order: typing.List[str] = order
+        self.arguments: Namespace = Namespace()
+
+    def get_kubectl(self) -> dict:
+        return {"order": self.order}
+
+    def get_kubectl_order(self) -> typing.List[str]:
+        return ProjectConfig.get_kubectl_order(self)
+
+
+def _sort_manifests_reference(config: _Config, manifests: typing.List[ProjectPlanManifest]) -> typing.List[ProjectPlanManifest]:
+    # ordering before the rank lookup (nested scans over the order and the manifests)
+    items: typing.List[ProjectPlanManifest] = []
+    for order in config.get_kubectl_order():
+        for item in manifests:
+            manifest = item.get_manifest()
+            if order == manifest.get_kind().strip().lower() or order == manifest.get_type().strip().lower():
+                if item not in items:
+                    items.append(item)
+    for item in manifests:
+        if item not in items:
+            items.append(item)
+    return items
+
+def _create_plan(order: typing.List[str]) -> ProjectPlan:
+    return ProjectPlan(config=_Config(order), state_current=None, state_new=None)
+
+def _create_item(config: _Config, api_version: str, kind: str, name: str, action: str = "create") -> ProjectPlanManifest:
+    return ProjectPlanManifest(action=action, manifest=ProjectStateManifest({"apiVersion": api_version, "kind": kind, "metadata": {"name": name}}, config))
+
+def _create_project(seed: int, size: int) -> typing.Tuple[typing.List[str], typing.List[typing.Tuple[str, str, str, str]]]:
+    # random order (kinds and types, with duplicates, different cases and unused entries) and manifests
+    rand = random.Random(seed)
+    api_versions = ["v1", "apps/v1", "batch/v1", "networking.k8s.io/v1", "example.com/v1alpha1"]
+    kinds = ["Namespace", "Service", "ConfigMap", "Secret", "Deployment", "StatefulSet", "Job", "Ingress", "Widget", " Role ", "SERVICEACCOUNT"]
+    order = []
+    for _ in range(rand.randint(0, 30)):
+        entry = rand.choice(kinds + ["Unused", "cronjob"])
+        if rand.random() < 0.5:
+            entry = "{0}/{1}".format(rand.choice(api_versions), entry)
+        order.append(entry.swapcase() if rand.random() < 0.3 else entry)
+    manifests = []
+    for index in range(size):
+        manifests.append((rand.choice(api_versions), rand.choice(kinds), "item-{0}".format(index), rand.choice(["create", "update", "nothing", "delete"])))
+    return order, manifests
+
+
+def test_sort_manifests_by_order():
+    plan = _create_plan(["apps/v1/deployment", "configmap"])
+    items = [
+        _create_item(plan.config, "apps/v1", "Deployment", "a"),
+        _create_item(plan.config, "v1", "ConfigMap", "b"),
+        _create_item(plan.config, "v1", "Service", "c"),
+        _create_item(plan.config, "v1", "Secret", "d"),
+        _create_item(plan.config, "v1", "Namespace", "e"),
+        _create_item(plan.config, "v1", "ConfigMap", "f"),
+    ]
+    names = [item.get_manifest().get_name() for item in plan._sort_manifests(items)]
+    assert names == ["e", "c", "a", "b", "f", "d"]
+
+def test_sort_manifests_matches_reference():
+    for seed in range(40):
+        order, manifests = _create_project(seed, 300)
+        plan = _create_plan(order)
+        items = [_create_item(plan.config, *manifest) for manifest in manifests]
+        assert plan._sort_manifests(items) == _sort_manifests_reference(plan.config, items), "seed {0}".format(seed)
+
+def test_sort_manifests_matches_reference_on_large_project():
+    order, manifests = _create_project(1000, 5000)
+    plan = _create_plan(order)
+    items = [_create_item(plan.config, *manifest) for manifest in manifests]
+    assert plan._sort_manifests(items) == _sort_manifests_reference(plan.config, items)
+
+def test_manifest_waves_group_sorted_manifests_by_rank():
+    order, manifests = _create_project(7, 500)
+    plan = _create_plan(order)
+    items = plan._sort_manifests([_create_item(plan.config, *manifest) for manifest in manifests])
+    waves = plan.get_manifest_waves(items)
+    assert [item for wave in waves for item in wave] == items
+    ranks = [set(plan.get_manifest_rank(item.get_manifest()) for item in wave) for wave in waves]
+    assert all(len(rank) == 1 for rank in ranks)
+    assert [rank.pop() for rank in ranks] == sorted(set(plan.get_manifest_rank(item.get_manifest()) for item in items))
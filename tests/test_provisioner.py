@@ -0,0 +1,130 @@
+import typing
+from argparse import Namespace
+
+from lib.helpers.kubectl import Kubectl
+from lib.plan.schemes.manifest import ProjectPlanManifest
+from lib.provisioner import ProjectProvisioner
+from lib.state.schemes.manifest import ProjectStateManifest
+
+
+class _Config:
+    def __init__(self):
+        self.arguments: Namespace = Namespace()
+
+
+class _Kubectl(Kubectl):
+    # kubectl printing the names of the applied objects, except for the objects which should fail
+    def __init__(self, failing: typing.List[str] = None, failing_single: typing.List[str] = None):
+        super().__init__()
+        self.failing: typing.List[str] = failing or []
+        self.failing_single: typing.List[str] = failing_single or []
+        self.batches: typing.List[typing.List[ProjectStateManifest]] = []
+        self.applied: typing.List[ProjectStateManifest] = []
+
+    def apply_all(self, manifests: typing.List[ProjectStateManifest], manifests_file: str = None):
+        self.batches.append(manifests)
+        yield {"type": "command", "data": "kubectl apply -f - -o name"}
+        for manifest in manifests:
+            if self.get_object_name(manifest) in self.failing:
+                yield {"type": "error", "data": "Error from server: {0}".format(manifest.get_name())}
+            else:
+                yield {"type": "data", "data": self.get_object_name(manifest)}
+        yield {"type": "code", "data": 1 if self.failing else 0}
+
+    def apply(self, manifest: ProjectStateManifest, manifest_file: str = None):
+        self.applied.append(manifest)
+        yield {"type": "command", "data": "kubectl apply -f -"}
+        yield {"type": "code", "data": 1 if self.get_object_name(manifest) in self.failing_single else 0}
+
+
+class _Project:
+    def __init__(self, kubectl: _Kubectl):
+        self.kubectl: _Kubectl = kubectl
+
+    def get_helm(self):
+        return None
+
+    def get_kubectl(self) -> _Kubectl:
+        return self.kubectl
+
+
+class _State:
+    def __init__(self):
+        self.manifests: typing.List[typing.Tuple[ProjectStateManifest, bool]] = []
+
+    def set_manifest(self, manifest: ProjectStateManifest, checkpoint: bool = False):
+        self.manifests.append((manifest, checkpoint))
+
+
+def _manifest(config: _Config, kind: str, name: str, namespace: str, api_version: str = "v1") -> ProjectStateManifest:
+    return ProjectStateManifest({"apiVersion": api_version, "kind": kind, "metadata": {"name": name, "namespace": namespace}}, config)
+
+
+def _create_items(config: _Config) -> typing.List[ProjectPlanManifest]:
+    return [
+        ProjectPlanManifest("create", _manifest(config, "ConfigMap", "settings", "a")),
+        ProjectPlanManifest("update", _manifest(config, "ConfigMap", "settings", "b"), _manifest(config, "ConfigMap", "settings", "b")),
+        ProjectPlanManifest("create", _manifest(config, "Deployment", "settings", "a", "apps/v1")),
+        ProjectPlanManifest("create", _manifest(config, "ConfigMap", "settings", "c")),
+        ProjectPlanManifest("update", _manifest(config, "Service", "web", "a"), _manifest(config, "Service", "web", "a")),
+    ]
+
+
+def _create_provisioner(kubectl: _Kubectl) -> typing.Tuple[ProjectProvisioner, _State]:
+    state = _State()
+    return ProjectProvisioner(_Project(kubectl), state), state
+
+
+def test_split_batch_unique_names():
+    config = _Config()
+    items = _create_items(config)
+    provisioner, _ = _create_provisioner(_Kubectl())
+    batches = provisioner._split_batch(items)
+    # objects with the same name in different namespaces are applied in separate batches, in the order of the plan
+    assert batches == [[items[0], items[2], items[4]], [items[1]], [items[3]]]
+    for batch in batches:
+        names = [provisioner.kubectl.get_object_name(item.get_manifest()) for item in batch]
+        assert len(names) == len(set(names))
+
+
+def test_apply_manifests_matches_output():
+    config = _Config()
+    items = _create_items(config)
+    kubectl = _Kubectl()
+    provisioner, state = _create_provisioner(kubectl)
+    assert provisioner.apply_manifests(items)
+    assert [[manifest.get_name() for manifest in batch] for batch in kubectl.batches] == [["settings", "settings", "web"], ["settings"], ["settings"]]
+    # every manifest is matched with its line of the output and checkpointed
+    assert sorted((id(manifest), checkpoint) for manifest, checkpoint in state.manifests) == sorted((id(item.get_manifest()), True) for item in items)
+    assert kubectl.applied == []
+    assert provisioner.get_resources_created() == 3
+    assert provisioner.get_resources_updated() == 2
+    assert provisioner.get_resources_failed() == 0
+
+
+def test_apply_manifests_falls_back_to_single_manifests():
+    config = _Config()
+    items = _create_items(config)
+    kubectl = _Kubectl(failing=["deployment.apps/settings", "service/web"])
+    provisioner, state = _create_provisioner(kubectl)
+    assert provisioner.apply_manifests(items)
+    # the failed manifests of the batch are created or updated one by one
+    assert kubectl.applied == [items[2].get_manifest(), items[4].get_manifest()]
+    assert [manifest for manifest, _ in state.manifests] == [
+        items[0].get_manifest(), items[2].get_manifest(), items[4].get_manifest(), items[1].get_manifest(), items[3].get_manifest(),
+    ]
+    assert provisioner.get_resources_created() == 3
+    assert provisioner.get_resources_updated() == 2
+
+
+def test_apply_manifests_stops_on_failed_fallback():
+    config = _Config()
+    items = _create_items(config)
+    kubectl = _Kubectl(failing=["service/web"], failing_single=["service/web"])
+    provisioner, state = _create_provisioner(kubectl)
+    assert not provisioner.apply_manifests(items)
+    # the update failed, so the current manifest is restored and the remaining batches are not applied
+    assert len(kubectl.batches) == 1
+    assert kubectl.applied == [items[4].get_manifest()]
+    assert state.manifests[-1] == (items[4].get_current_manifest(), False)
+    assert provisioner.get_resources_failed() == 1
@@ -0,0 +1,100 @@
+import copy
+import random
+import typing
+
+import pytest
+
+from lib.helpers.smart_merge import _find_similar_key, _is_mergeable, smart_merge
+
+
+def _smart_merge_reference(target: typing.Any, source: typing.Any) -> typing.Any:
+    # merge before the array index (every item is compared with all items of the output)
+    if not isinstance(target, (dict, list)) or not isinstance(source, (dict, list)):
+        return source if target is None else target
+    if isinstance(target, list) != isinstance(source, list):
+        return target
+    if isinstance(target, list):
+        output = []
+        for item_list in (target, source):
+            for item in item_list:
+                if not isinstance(item, (dict, list)):
+                    if item not in output:
+                        output.append(item)
+                    continue
+                similar_item_index = next((i for i, out_item in enumerate(output) if _find_similar_key(out_item, item)), -1)
+                if similar_item_index != -1:
+                    output[similar_item_index] = _smart_merge_reference(output[similar_item_index], item)
+                else:
+                    output.append(item)
+        return output
+    output = copy.deepcopy(target)
+    for key, value in source.items():
+        if not _is_mergeable(output.get(key), value) or value is None:
+            continue
+        if isinstance(output.get(key), (list, dict)):
+            output[key] = _smart_merge_reference(output[key], value)
+            continue
+        output[key] = value
+    return output
+
+
+def _merge_both(target: typing.Any, source: typing.Any) -> typing.Tuple[typing.Any, typing.Any]:
+    # results (or types of the raised errors) of the merge and the reference
+    results = []
+    for function in (smart_merge, lambda t, s: smart_merge(t, s, shared=True), _smart_merge_reference):
+        target_copy, source_copy = copy.deepcopy(target), copy.deepcopy(source)
+        try:
+            results.append(function(target_copy, source_copy))
+        except Exception as ex:
+            results.append(type(ex))
+        # the inputs are never changed
+        assert (target_copy, source_copy) == (target, source)
+    # compare representations, as equal values of other types (e.g. 1 and True) have to stay apart
+    assert repr(results[0]) == repr(results[1])
+    return repr(results[0]), repr(results[2])
+
+
+@pytest.mark.parametrize("target, source", [
+    # duplicates of primitives and objects
+    ([1, 1, "a", "a", None, None], [1, "a", "b", "b", None]),
+    ([{"name": "a", "v": 1}, {"name": "a", "v": 2}], [{"name": "a", "w": 3}, {"name": "a", "v": 4}, {"name": "b"}]),
+    ([{"name": "a", "namespace": "x"}, {"name": "a", "namespace": "y"}, {"name": "a"}], [{"name": "a", "namespace": "y", "v": 1}, {"name": "a", "v": 2}]),
+    # mixed types of equal values
+    ([1, True, 1.0, "1", 0, False, ""], [True, 1, "1", 0.0, None, "", [1], {"a": 1}]),
+    ([{"name": 1, "v": "int"}, {"name": "1", "v": "str"}], [{"name": True, "w": 1}, {"name": "1", "w": 2}, {"name": 1.0, "w": 3}]),
+    # unhashable identities and items
+    ([{"name": ["a"], "v": 1}, {"name": {"a": 1}, "v": 2}], [{"name": ["a"], "w": 1}, {"name": {"a": 1}, "w": 2}, {"name": ["b"]}]),
+    ([[1, 2], [1, 2], [3]], [[1, 2], [4]]),
+    ([{"kind": "Service", "metadata": {"name": "a", "namespace": "x"}, "spec": {"ports": [80]}}], [{"kind": "Service", "metadata": {"name": "a", "namespace": "x"}, "spec": {"ports": [443]}}]),
+    # items matched by the fallback heuristics and by the path key
+    ([{"image": "a", "tag": 1}, {"path": "/a", "v": 1}], [{"image": "a", "tag": 2}, {"path": "/a", "v": 2}, {"path": "/b"}]),
+    ({"env": [{"name": "A", "value": "1"}], "ports": [80]}, {"env": [{"name": "A", "value": "2"}, {"name": "B"}], "ports": [80, 443]}),
+])
+def test_array_index_matches_linear_merge(target, source):
+    merged, reference = _merge_both(target, source)
+    assert merged == reference
+
+
+def _create_item(rng: random.Random, objects: bool, depth: int = 0) -> typing.Any:
+    # random primitive or object with the same keys (the fallback heuristics expect the keys of the other object),
+    # few distinct values create duplicates and matches, lists and objects create unhashable identities
+    if not objects:
+        return rng.choice([0, 1, 2, True, False, 1.0, None, "a", "b", "1", ""])
+    item = {}
+    for key in ("name", "namespace", "path", "image"):
+        item[key] = rng.choice(["a", "b", 1, True, "", None, ["a"], {"a": 1}])
+    item["metadata"] = {"name": rng.choice(["a", "b", None]), "namespace": rng.choice(["x", "y"])}
+    item["kind"] = rng.choice(["Service", None])
+    item["value"] = [_create_item(rng, depth == 0, depth + 1) for _ in range(rng.randrange(3))] if depth < 2 else rng.choice([1, "a"])
+    return item
+
+
+def test_array_index_matches_linear_merge_random():
+    rng = random.Random(8)
+    for _ in range(500):
+        objects = rng.random() < 0.8
+        target = [_create_item(rng, objects) for _ in range(rng.randrange(8))]
+        source = [_create_item(rng, objects) for _ in range(rng.randrange(8))]
+        merged, reference = _merge_both(target, source)
+        assert not merged.startswith("<class"), (target, source)
+        assert merged == reference, (target, source)
@@ -0,0 +1,220 @@
+import json
+import os
+import typing
+from argparse import Namespace
+
+import pytest
+
+from lib.config.config import ProjectConfig
+from lib.plan.plan import ProjectPlan
+from lib.state.database import ProjectStateDatabase, ProjectStateDatabaseEntry
+from lib.state.journal import ProjectStateJournal
+from lib.state.schemes.chart import ProjectStateChart
+from lib.state.schemes.manifest import ProjectStateManifest
+from lib.state.state import ProjectState
+
+
+class _Config:
+    def __init__(self, sources: typing.Dict[str, typing.Tuple[str, typing.List[dict]]] = None):
+        self.arguments: Namespace = Namespace()
+        self.sources: typing.Dict[str, typing.Tuple[str, typing.List[dict]]] = sources or {}
+
+    def get_sources(self) -> typing.Dict[str, typing.Tuple[str, typing.List[dict]]]:
+        return self.sources
+
+    def get_kubectl(self) -> dict:
+        return {}
+
+    def get_kubectl_order(self) -> typing.List[str]:
+        return ProjectConfig.get_kubectl_order(self)
+
+
+def _manifest(name: str, value: str = "1") -> dict:
+    return {"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": name, "namespace": "apps"}, "data": {"value": value}}
+
+
+def _create_state() -> dict:
+    return {
+        "charts": {},
+        "manifests": {"configmap/apps_first": _manifest("first"), "configmap/apps_second": _manifest("second")},
+        "sources": {
+            "first.yaml": {"key": "k1", "manifests": ["configmap/apps_first"]},
+            "second.yaml": {"key": "k2", "manifests": ["configmap/apps_second"]},
+        },
+    }
+
+
+def _arguments(tmp_path, state: str = "state.json") -> Namespace:
+    return Namespace(project=str(tmp_path), state=state)
+
+
+def test_journal_replay(tmp_path):
+    journal = ProjectStateJournal("state.json", cwd=str(tmp_path))
+    journal.set("manifests", "configmap/apps_second", _manifest("second", "2"), "checksum")
+    journal.set("manifests", "configmap/apps_third", _manifest("third"), "checksum")
+    journal.remove("manifests", "configmap/apps_third")
+    journal.close()
+    state = ProjectStateJournal.replay(_create_state(), "state.json", cwd=str(tmp_path))
+    assert state["manifests"] == {"configmap/apps_first": _manifest("first"), "configmap/apps_second": _manifest("second", "2")}
+    assert state["checksums"] == {"manifests": {"configmap/apps_second": "checksum"}}
+    # sources of the journaled manifests are dropped, so their files are rendered again
+    assert state["sources"] == {"first.yaml": {"key": "k1", "manifests": ["configmap/apps_first"]}}
+
+
+def test_journal_replay_ignores_truncated_entry(tmp_path):
+    journal = ProjectStateJournal("state.json", cwd=str(tmp_path))
+    journal.set("manifests", "configmap/apps_second", _manifest("second", "2"), "checksum")
+    journal.close()
+    # last entry written partially before a crash
+    entry = json.dumps({"action": "remove", "kind": "manifests", "key": "configmap/apps_first"})
+    with open(journal.file, "a", encoding="utf-8") as f:
+        f.write(entry[:-10])
+    state = ProjectStateJournal.replay(_create_state(), "state.json", cwd=str(tmp_path))
+    assert state["manifests"] == {"configmap/apps_first": _manifest("first"), "configmap/apps_second": _manifest("second", "2")}
+    assert list(state["sources"]) == ["first.yaml"]
+
+
+def test_journal_replay_without_state(tmp_path):
+    assert ProjectStateJournal.replay(None, "state.json", cwd=str(tmp_path)) is None
+    journal = ProjectStateJournal("state.json", cwd=str(tmp_path))
+    journal.set("manifests", "configmap/apps_first", _manifest("first"), "checksum")
+    journal.close()
+    assert ProjectStateJournal.replay(None, "state.json", cwd=str(tmp_path)) == {
+        "charts": {},
+        "manifests": {"configmap/apps_first": _manifest("first")},
+        "checksums": {"manifests": {"configmap/apps_first": "checksum"}},
+    }
+
+
+def test_state_checkpoints_until_written(tmp_path):
+    config = _Config()
+    arguments = _arguments(tmp_path)
+    state = ProjectState.from_dict(_create_state(), arguments, config)
+    state.to_file()
+    # applied changes are journaled and replayed by the next run
+    state.set_manifest(ProjectStateManifest(_manifest("second", "2"), config), checkpoint=True)
+    state.remove_manifest(ProjectStateManifest(_manifest("first"), config), checkpoint=True)
+    state.journal.close()
+    journal_file = ProjectStateJournal.get_file("state.json", cwd=str(tmp_path))
+    assert os.path.exists(journal_file)
+    replayed = ProjectState.read_file("state.json", cwd=str(tmp_path))
+    assert replayed["manifests"] == {"configmap/apps_second": _manifest("second", "2")}
+    # writing the state file deletes the journal
+    state.to_file()
+    assert not os.path.exists(journal_file)
+    assert ProjectState.read_file("state.json", cwd=str(tmp_path))["manifests"] == {"configmap/apps_second": _manifest("second", "2")}
+
+
+def _chart() -> dict:
+    return {"name": "web", "namespace": "apps", "chart": "example/web", "set": {"replicas": 2}, "values": {"image": {"tag": "1.0"}}}
+
+
+def _create_database_state(tmp_path, config: _Config) -> ProjectState:
+    state = ProjectState.from_dict({"charts": {"apps/web": _chart()}, "manifests": _create_state()["manifests"]}, _arguments(tmp_path, "state.db"), config)
+    state.to_file()
+    return state
+
+
+def test_database_round_trip(tmp_path):
+    config = _Config({"first.yaml": ("k1", [_manifest("first")])})
+    _create_database_state(tmp_path, config)
+    state = ProjectState.read_file("state.db", cwd=str(tmp_path))
+    assert list(state["charts"]) == ["apps/web"]
+    assert list(state["manifests"]) == ["configmap/apps_first", "configmap/apps_second"]
+    assert state["charts"]["apps/web"].load() == _chart()
+    assert state["manifests"]["configmap/apps_second"].load() == _manifest("second")
+    assert state["checksums"]["manifests"]["configmap/apps_first"] == ProjectStateManifest(_manifest("first"), config).get_checksum()
+    assert state["sources"] == {"first.yaml": {"key": "k1", "manifests": ["configmap/apps_first"]}}
+    # the state is written like a json state
+    loaded = ProjectState.from_dict(state, _arguments(tmp_path, "state.db"), config)
+    assert loaded.to_state() == ProjectState.from_dict({"charts": {"apps/web": _chart()}, "manifests": _create_state()["manifests"]}, _arguments(tmp_path), config).to_state()
+
+
+def test_database_migration(tmp_path):
+    config = _Config()
+    state = ProjectState.from_dict(_create_state(), _arguments(tmp_path), config)
+    state.to_file()
+    # the json state with the same name is read until the database has been written
+    migrated = ProjectState.read_file("state.db", cwd=str(tmp_path))
+    assert migrated["manifests"] == _create_state()["manifests"]
+    ProjectState.from_dict(migrated, _arguments(tmp_path, "state.db"), config).to_file()
+    assert os.path.exists(os.path.join(str(tmp_path), "state.db"))
+    state = ProjectState.read_file("state.db", cwd=str(tmp_path))
+    assert {key: entry.load() for key, entry in state["manifests"].items()} == _create_state()["manifests"]
+
+
+def test_database_loads_content_lazily(tmp_path, monkeypatch):
+    config = _Config()
+    _create_database_state(tmp_path, config)
+    loaded = []
+    read_content = ProjectStateDatabase.read_content
+    monkeypatch.setattr(ProjectStateDatabase, "read_content", lambda database, kind, key: loaded.append(key) or read_content(database, kind, key))
+    state = ProjectState.from_file("state.db", _arguments(tmp_path, "state.db"), config, cwd=str(tmp_path))
+    (chart,), (first, second) = state.get_charts(), state.get_manifests()
+    assert isinstance(first.entry, ProjectStateDatabaseEntry)
+    # headers and stored checksums are available without the content
+    assert (chart.get_identifier(), chart.get_chart(), chart.get_checksum()) == ("apps/web", "example/web", ProjectStateChart(_chart(), config).get_checksum())
+    assert (first.get_kind(), first.get_name(), first.get_namespace()) == ("ConfigMap", "first", "apps")
+    assert first.to_header() == {"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": "first", "namespace": "apps"}}
+    assert loaded == []
+    # the content is loaded once on first use
+    assert second.get_content() == _manifest("second")
+    assert second.get_content() == _manifest("second")
+    assert loaded == ["configmap/apps_second"]
+    # unchanged resources are written without loading their content
+    state.set_manifest(ProjectStateManifest(_manifest("first", "2"), config))
+    state.to_file()
+    assert loaded == ["configmap/apps_second"]
+    assert ProjectState.read_file("state.db", cwd=str(tmp_path))["manifests"]["configmap/apps_first"].load() == _manifest("first", "2")
+
+
+def _reverse_keys(obj: typing.Any) -> typing.Any:
+    # same content with the keys of all objects in reverse order
+    if isinstance(obj, dict):
+        return {key: _reverse_keys(obj[key]) for key in reversed(list(obj))}
+    if isinstance(obj, list):
+        return [_reverse_keys(item) for item in obj]
+    return obj
+
+
+def test_checksum_ignores_key_order():
+    config = _Config()
+    manifest = dict(_manifest("first"), spec={"ports": [{"name": "http", "port": 80}], "selector": {"a": "1", "b": "2"}})
+    assert list(_reverse_keys(manifest)) != list(manifest)
+    assert ProjectStateManifest(_reverse_keys(manifest), config).get_checksum() == ProjectStateManifest(manifest, config).get_checksum()
+    assert ProjectStateChart(_reverse_keys(_chart()), config).get_checksum() == ProjectStateChart(_chart(), config).get_checksum()
+    # changed values and the order of lists still change the checksum
+    assert ProjectStateManifest(_manifest("first", "2"), config).get_checksum() != ProjectStateManifest(_manifest("first"), config).get_checksum()
+    assert ProjectStateManifest(dict(manifest, spec=dict(manifest["spec"], ports=[{"port": 80}, {"name": "http"}])), config).get_checksum() != ProjectStateManifest(manifest, config).get_checksum()
+
+
+def test_old_state_without_checksums_unchanged(tmp_path):
+    config = _Config()
+    # state written before checksums were stored, with the keys in another order than the rendered resources
+    old_state = {"charts": {"apps/web": _reverse_keys(_chart())}, "manifests": {key: _reverse_keys(manifest) for key, manifest in _create_state()["manifests"].items()}}
+    state_file = os.path.join(str(tmp_path), "state.json")
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump(old_state, f)
+    state_current = ProjectState.from_file("state.json", _arguments(tmp_path), config, cwd=str(tmp_path))
+    state_new = ProjectState.from_dict({"charts": {"apps/web": _chart()}, "manifests": _create_state()["manifests"]}, _arguments(tmp_path), config)
+    plan = ProjectPlan(config=config, state_current=state_current, state_new=state_new)
+    assert [item.get_action() for item in plan.get_manifests()] == ["nothing", "nothing"]
+    assert [item.get_action() for item in plan.get_charts()] == ["nothing"]
+    # the stored checksums of the written state are the ones computed from the content
+    state_current.to_file()
+    with open(state_file, "r", encoding="utf-8") as f:
+        checksums = json.load(f)["checksums"]
+    assert checksums == {
+        "charts": {"apps/web": ProjectStateChart(_chart(), config).get_checksum()},
+        "manifests": {key: ProjectStateManifest(manifest, config).get_checksum() for key, manifest in _create_state()["manifests"].items()},
+    }
+
+
+def test_database_chart_dependencies_without_content(tmp_path, monkeypatch):
+    config = _Config()
+    charts = {"apps/db": dict(_chart(), name="db"), "apps/web": dict(_chart(), dependsOn=["db"])}
+    ProjectState.from_dict({"charts": charts, "manifests": {}}, _arguments(tmp_path, "state.db"), config).to_file()
+    monkeypatch.setattr(ProjectStateDatabase, "read_content", lambda database, kind, key: pytest.fail("content of '{0}' loaded".format(key)))
+    state = ProjectState.from_file("state.db", _arguments(tmp_path, "state.db"), config, cwd=str(tmp_path))
+    # dependencies of removed charts are read from the headers
+    assert [chart.get_depends_on() for chart in state.get_charts()] == [[], ["db"]]
@@ -0,0 +1,101 @@
+import copy
+import typing
+
+import pytest
+import yaml
+
+from lib.helpers.object import is_primitive, object_format_each_primitive
+from lib.helpers.yamls import YAML, YAMLBaseFastDumper, YAMLMultiline, YAMLMultilineRepresenter, YAMLQuoted, YAMLQuotedRepresenter
+
+
+class _ReferenceDumper(yaml.Dumper): pass
+class _ReferenceFastDumper(YAMLBaseFastDumper): pass
+
+for _dumper in (_ReferenceDumper, _ReferenceFastDumper):
+    _dumper.add_representer(YAMLQuoted, YAMLQuotedRepresenter)
+    _dumper.add_representer(YAMLMultiline, YAMLMultilineRepresenter)
+
+
+def _stringify_reference(obj: typing.Any, fast: bool = False) -> str:
+    # stringify before the quoting representer (strings are replaced in the object before dumping it)
+    def formatter(value: typing.Any):
+        if isinstance(value, str) and not isinstance(value, YAMLQuoted) and not isinstance(value, YAMLMultiline):
+            return YAMLMultiline(value) if len(value.split("\n")) > 1 else YAMLQuoted(value)
+        return value
+    documents = obj if isinstance(obj, list) else [obj]
+    dumper = _ReferenceFastDumper if fast and all(isinstance(document, (dict, list)) for document in documents) else _ReferenceDumper
+    prepared = obj if is_primitive(obj) else object_format_each_primitive(obj, formatter)
+    if isinstance(obj, list):
+        return yaml.dump_all(documents=prepared, Dumper=dumper, sort_keys=False, default_flow_style=False)
+    return yaml.dump(data=prepared, Dumper=dumper, sort_keys=False, default_flow_style=False)
+
+
+def _create_manifest() -> dict:
+    labels = {"app": "web", "version": "1.0", "enabled": "true", "empty": ""}
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": "web", "namespace": "apps", "labels": labels, "annotations": {"note": "say \"hi\" to 'all'", "unicode": "grüße ✓"}},
+        "spec": {
+            "replicas": 3,
+            "paused": False,
+            "minReadySeconds": None,
+            "ratio": 0.5,
+            "selector": {"matchLabels": labels},
+            "template": {"spec": {
+                "containers": [{
+                    "name": "web",
+                    "args": ["--port", "8080", "yes", "null", "~", "0x10", "1e3", "-", "a: b", "# comment"],
+                    "env": [{"name": "SCRIPT", "value": "line 1\nline 2\n"}, {"name": "TRAILING", "value": "text\n"}, {"name": "LONG", "value": "word " * 40}],
+                    "ports": [80, 443],
+                    "resources": {},
+                    "volumeMounts": [],
+                }],
+                "matrix": [[1, "a"], ["b", [2, "c"]], []],
+                "quoted": YAMLQuoted("quoted"),
+                "multiline": YAMLMultiline("single line"),
+            }},
+        },
+        1: "numeric key",
+        "key with spaces": "value",
+    }
+
+
+def _get_string_types(obj: typing.Any) -> typing.List[type]:
+    if isinstance(obj, dict):
+        return [item for key in obj for item in _get_string_types(obj[key])]
+    if isinstance(obj, list):
+        return [item for value in obj for item in _get_string_types(value)]
+    return [type(obj)] if isinstance(obj, str) else []
+
+
+@pytest.mark.parametrize("obj", [
+    _create_manifest(),
+    [_create_manifest(), {"kind": "ConfigMap", "data": {"a": "1", "b": "two\nlines"}}],
+    [_create_manifest(), "text document", "multiline\ndocument", 1, None],
+    ["a", "b\nc", 1, True],
+    {},
+    [],
+    "plain string",
+    "multiline\nstring",
+    1,
+    None,
+])
+@pytest.mark.parametrize("fast", [False, True])
+def test_stringify_matches_reference(obj, fast):
+    expected = _stringify_reference(copy.deepcopy(obj), fast)
+    original = copy.deepcopy(obj)
+    assert YAML.stringify(obj, fast) == expected
+    # the object is not changed (the strings keep their type)
+    assert repr(obj) == repr(original)
+    assert _get_string_types(obj) == _get_string_types(original)
+
+
+def test_stringify_shared_objects():
+    # objects referenced several times are written with aliases like before
+    labels = {"app": "web"}
+    obj = {"a": labels, "b": labels, "c": [labels]}
+    assert YAML.stringify(obj) == _stringify_reference(copy.deepcopy(obj))
+    assert YAML.stringify(obj, fast=True) == _stringify_reference(copy.deepcopy(obj), fast=True)
+    assert type(labels["app"]) is str
+